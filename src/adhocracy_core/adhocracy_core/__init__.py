@@ -108,6 +108,7 @@ def includeme(config):
     config.include('.renderers')
     config.include('.evolution')
     config.include('.events')
+    config.include('.events.dispatch')
     config.include('.content')
     config.include('.changelog')
     config.include('.graph')
@@ -10,6 +10,7 @@ from pyramid.response import Response
 from substanced.util import find_service
 from logging import getLogger
 from adhocracy_core.auditing import add_to_auditlog
+from adhocracy_core.changelog import get_changelog
 from adhocracy_core.events import ActivitiesGenerated
 from adhocracy_core.sheets.metadata import IMetadata
 from adhocracy_core.sheets.principal import IUserBasic
@@ -52,7 +53,7 @@ def update_activity_callback(request: Request, response: Response) -> None:
 
 
 def _filter_trival_changes(request: Request) -> []:
-    changes = request.registry.changelog.values()
+    changes = get_changelog(request.registry).values()
     return [x for x in changes if
             _is_activity(x)
             and not x.autoupdated
@@ -1,18 +1,33 @@
 """Adapter and helper functions to set the http response caching headers."""
+from hashlib import sha1
 import logging
 
 from pyramid.httpexceptions import HTTPNotModified
 from pyramid.interfaces import IRequest
 from pyramid.registry import Registry
+from pyramid.renderers import render
+from pyramid.response import Response
+from pyramid.traversal import lineage
 from pyramid.traversal import resource_path
 from zope.interface import implementer
 from zope.interface.interfaces import IInterface
 from requests.exceptions import RequestException
 import requests
 
+from adhocracy_core.authentication import UserPathHeader
+from adhocracy_core.authentication import UserTokenHeader
+from adhocracy_core.authentication import get_anonymized_creator
+from adhocracy_core.authorization import get_local_roles
+from adhocracy_core.changelog import get_changelog
+from adhocracy_core.changelog.counters import get_changed_backrefs_count
+from adhocracy_core.changelog.counters import get_changed_descendants_count
+from adhocracy_core.interfaces import HTTPCacheKeyMode
 from adhocracy_core.interfaces import HTTPCacheMode
 from adhocracy_core.interfaces import IHTTPCacheStrategy
+from adhocracy_core.interfaces import IPool
 from adhocracy_core.interfaces import IResource
+from adhocracy_core.caching.response import ResponseCache
+from adhocracy_core.caching.response import get_response_cache
 from adhocracy_core.exceptions import ConfigurationError
 from adhocracy_core.resources.asset import IAssetDownload
 from adhocracy_core.utils import get_reason_if_blocked
@@ -22,24 +37,89 @@ from adhocracy_core.utils import extract_events_from_changelog_metadata
 
 DISABLED_VIEWS_OR_METHODS = ['PATCH', 'POST', 'PUT']
 
+PrincipalsKeyHeader = 'X-Principals-Key'
+"""The request header a caching proxy sets to the principals key of the user.
+
+The key is returned by the `principals_key` view, see
+:func:`get_principals_key`.
+"""
+
+USER_HEADERS = (UserPathHeader, UserTokenHeader)
+
 logger = logging.getLogger(__name__)
 
 
 def set_cache_header(view: callable):
-    """Decorator for :term:`view` to set http cache headers of the response."""
+    """Decorator for :term:`view` to set http cache headers of the response.
+
+    If the response cache is enabled (see
+    :mod:`adhocracy_core.caching.response`) the rendered json responses are
+    cached in memory. The :term:`view` is not called if the cache has a
+    response with the same ETag.
+    """
     def wrapped_view(context: IResource, request: IRequest):
-        _set_cache_header(context, request)
-        return view(context, request)
+        strategy = _set_cache_header(context, request)
+        cache = get_response_cache(request.registry)
+        if strategy is None or cache is None:
+            return view(context, request)
+        return _get_cached_response(view, context, request, strategy, cache)
     return wrapped_view
 
 
-def _set_cache_header(context: IResource, request: IRequest):
+def _set_cache_header(context: IResource,
+                      request: IRequest) -> IHTTPCacheStrategy:
     mode = _get_cache_mode(request.registry)
     strategy = _get_cache_strategy(context, request)
     if strategy is None:
         return
     strategy.check_conditional_request()
     strategy.set_cache_headers_for_mode(mode)
+    return strategy
+
+
+def _get_cached_response(view: callable,
+                         context: IResource,
+                         request: IRequest,
+                         strategy: IHTTPCacheStrategy,
+                         cache: ResponseCache):
+    key = get_response_cache_key(context, request, strategy)
+    if key is None:
+        return view(context, request)
+    body = cache.get(key, registry=request.registry)
+    if body is None:
+        result = view(context, request)
+        if isinstance(result, Response):
+            return result
+        body = render('json', result, request=request).encode()
+        cache.set(key, body)
+    response = request.response
+    response.content_type = 'application/json'
+    response.body = body
+    return response
+
+
+def get_response_cache_key(context: IResource,
+                           request: IRequest,
+                           strategy: IHTTPCacheStrategy) -> tuple:
+    """Return the response cache key for `context` and `request`.
+
+    The key contains the request method, application url, resource path,
+    query string, principals key (:term:`userid` if user specific) and ETag.
+    Return None if the `strategy` has no ETag.
+    """
+    etag = strategy.get_etag()
+    if etag is None:
+        return None
+    if is_user_specific(context, request):
+        user_key = str(request.authenticated_userid)
+    else:
+        user_key = get_principals_key(request)
+    return (request.method,
+            request.application_url,
+            resource_path(context),
+            request.query_string,
+            user_key,
+            etag)
 
 
 def _get_cache_mode(registry) -> HTTPCacheMode:
@@ -48,6 +128,73 @@ def _get_cache_mode(registry) -> HTTPCacheMode:
     return mode
 
 
+def _get_cache_key_mode(registry) -> HTTPCacheKeyMode:
+    mode_name = registry['config'].adhocracy.caching_key_mode
+    mode = HTTPCacheKeyMode[mode_name]
+    return mode
+
+
+def get_principals_key(request: IRequest) -> str:
+    """Return a stable hash of the effective principals of the current user.
+
+    The :term:`userid` is ignored, so users with the same groups and roles
+    get the same key.
+    """
+    principals = request.effective_principals
+    userid = request.authenticated_userid
+    return hash_principals(principals, userid)
+
+
+def hash_principals(principals: [str], userid: str=None) -> str:
+    """Return a stable hash of `principals` without `userid`."""
+    shared = sorted(set(p for p in principals if p != userid))
+    return sha1('\n'.join(shared).encode()).hexdigest()
+
+
+def is_user_specific(context: IResource, request: IRequest) -> bool:
+    """Check if the response for `context` depends on the current user.
+
+    See :func:`is_user_specific_for`.
+    """
+    return is_user_specific_for(context, request.authenticated_userid,
+                                request.registry)
+
+
+def is_user_specific_for(context: IResource, userid: str,
+                         registry: Registry) -> bool:
+    """Check if the response for `context` depends on `userid`.
+
+    This is the case if the user has :term:`local roles` for `context` or
+    its parents or if `context` is a pool and its elements are filtered by
+    the view permission (`adhocracy.filter_by_view_permission` setting).
+    Local roles of the elements add view permissions for the
+    :term:`userid`, so the listing may differ for users with the same
+    principals. Anonymous responses are never user specific.
+    """
+    if userid is None:
+        return False
+    if _is_filtered_by_view_permission(context, registry):
+        return True
+    return has_user_local_roles(context, userid)
+
+
+def _is_filtered_by_view_permission(context: IResource,
+                                    registry: Registry) -> bool:
+    settings = registry['config']
+    return bool(settings.adhocracy.filter_by_view_permission) \
+        and IPool.providedBy(context)
+
+
+def has_user_local_roles(context: IResource, userid: str) -> bool:
+    """Check if `userid` has local roles for `context` or its parents."""
+    for location in lineage(context):
+        if userid in get_local_roles(location):
+            return True
+        if get_anonymized_creator(location) == userid:
+            return True
+    return False
+
+
 def _get_cache_strategy(context: IResource,
                         request: IRequest) -> IHTTPCacheStrategy:
     view_or_method = request.view_name or request.method
@@ -188,34 +335,52 @@ class HTTPCacheStrategyBaseAdapter:
         date = getattr(self.context, 'modification_date', None)
         self.request.response.last_modified = date
 
-    def set_etag(self):
-        """Set etag."""
+    def get_etag(self) -> str:
+        """Return etag or None if :attr:`etags` is empty."""
         if not self.etags:
-            return
+            return None
         tags = [t(self.context, self.request) for t in self.etags]
         etag = '|'.join(tags)
+        return etag
+
+    def set_etag(self):
+        """Set etag."""
+        etag = self.get_etag()
+        if etag is None:
+            return
         self.request.response.etag = etag
 
     def set_vary(self):
-        """Set vary attribute."""
-        self.request.response.vary = self.vary
+        """Set vary attribute.
+
+        With :class:`HTTPCacheKeyMode.principals` the user authentication
+        headers are replaced with the `X-Principals-Key` header, unless the
+        response is user specific.
+        """
+        vary = self.vary
+        mode = _get_cache_key_mode(self.request.registry)
+        if mode == HTTPCacheKeyMode.principals and self._vary_on_user():
+            vary = self._get_principals_vary()
+        self.request.response.vary = vary
+
+    def _vary_on_user(self) -> bool:
+        return any(header in USER_HEADERS for header in self.vary)
+
+    def _get_principals_vary(self) -> tuple:
+        if is_user_specific(self.context, self.request):
+            return self.vary
+        vary = tuple(x for x in self.vary if x not in USER_HEADERS)
+        return vary + (PrincipalsKeyHeader,)
 
 
 def etag_backrefs(context: IResource, request: IRequest) -> str:
     """Return changed backrefs counter value."""
-    changed_backrefs = getattr(context, '__changed_backrefs_counter__', None)
-    if changed_backrefs is not None:
-        return str(changed_backrefs())
-    return str(None)
+    return str(get_changed_backrefs_count(context))
 
 
 def etag_descendants(context: IResource, request: IRequest) -> str:
     """Return changed descendants counter value."""
-    changed_descendants = getattr(context, '__changed_descendants_counter__',
-                                  None)
-    if changed_descendants is not None:
-        return str(changed_descendants())
-    return str(None)
+    return str(get_changed_descendants_count(context))
 
 
 def etag_modified(context: IResource, request: IRequest) -> str:
@@ -230,6 +395,18 @@ def etag_userid(context: IResource, request: IRequest) -> str:
     return str(userid)
 
 
+def etag_principals(context: IResource, request: IRequest) -> str:
+    """Return :term:`userid` or the principals key of the current user.
+
+    The principals key is only used with :class:`HTTPCacheKeyMode.principals`
+    and if the response is not user specific.
+    """
+    mode = _get_cache_key_mode(request.registry)
+    if mode == HTTPCacheKeyMode.userid or is_user_specific(context, request):
+        return etag_userid(context, request)
+    return get_principals_key(request)
+
+
 def etag_blocked(context: IResource, request: IRequest) -> str:
     """Return `resource` blocked status."""
     reason = get_reason_if_blocked(context)
@@ -249,7 +426,7 @@ class HTTPCacheStrategyWeakAdapter(HTTPCacheStrategyBaseAdapter):
     browser_max_age = 0
     proxy_max_age = 60 * 60 * 24 * 30 * 12
     vary = ('Accept-Encoding', 'X-User-Path', 'X-User-Token')
-    etags = (etag_backrefs, etag_descendants, etag_modified, etag_userid,
+    etags = (etag_backrefs, etag_descendants, etag_modified, etag_principals,
              etag_blocked)
 
 
@@ -266,7 +443,7 @@ class HTTPCacheStrategyStrongAdapter(HTTPCacheStrategyBaseAdapter):
     browser_max_age = 60 * 60 * 24 * 30 * 12
     proxy_max_age = 60 * 60 * 24 * 30 * 12
     vary = ('Accept-Encoding', 'X-User-Path', 'X-User-Token')
-    etags = (etag_modified, etag_userid, etag_blocked)
+    etags = (etag_modified, etag_principals, etag_blocked)
 
 
 def purge_caching_proxy_after_commit_hook(success: bool, registry: Registry,
@@ -276,7 +453,7 @@ def purge_caching_proxy_after_commit_hook(success: bool, registry: Registry,
     proxy_url = settings.adhocracy.caching_proxy
     if not (success and proxy_url):
         return
-    changelog_metadata = registry.changelog.values()
+    changelog_metadata = get_changelog(registry).values()
     errcount = 0
     for meta in changelog_metadata:
         events = extract_events_from_changelog_metadata(meta)
@@ -304,7 +481,8 @@ def purge_caching_proxy_after_commit_hook(success: bool, registry: Registry,
 
 
 def includeme(config):
-    """Register cache strategies."""
+    """Register cache strategies and add the response cache."""
+    config.include('.response')
     register_cache_strategy(HTTPCacheStrategyWeakAdapter,
                             IResource,
                             config.registry,
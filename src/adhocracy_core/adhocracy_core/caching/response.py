@@ -0,0 +1,102 @@
+"""Process wide cache for rendered GET responses."""
+from collections import OrderedDict
+from threading import Lock
+
+from pyramid.registry import Registry
+from substanced.stats import statsd_incr
+
+
+class ResponseCache:
+    """Least recently used cache mapping response keys to rendered bodies.
+
+    The keys are created by
+    :func:`adhocracy_core.caching.get_response_cache_key`, they include
+    the ETag of the response. So old entries are never invalidated but
+    dropped when the cache is full.
+
+    :param max_size: maximal size (in bytes) of all cached bodies
+    :param max_entry_size: maximal size (in bytes) of one cached body,
+                           bigger bodies are not cached.
+    """
+
+    def __init__(self, max_size: int=50000000, max_entry_size: int=1000000):
+        """Initialize self."""
+        self.max_size = max_size
+        self.max_entry_size = max_entry_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Return the ratio of cache hits to all lookups."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: tuple, registry: Registry=None) -> bytes:
+        """Return cached body for `key` or None.
+
+        Send `caching.response.hits` / `caching.response.misses` metrics
+        to statsd.
+        """
+        with self._lock:
+            body = self._entries.get(key, None)
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+        metric = 'caching.response.misses' if body is None\
+            else 'caching.response.hits'
+        statsd_incr(metric, rate=.1, registry=registry)
+        return body
+
+    def set(self, key: tuple, body: bytes):
+        """Cache `body` for `key`, drop the least recently used entries."""
+        if len(body) > self.max_entry_size:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_size:
+                _, dropped = self._entries.popitem(last=False)
+                self.size -= len(dropped)
+
+    def clear(self):
+        """Remove all entries and reset hit/miss counts."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+
+def get_response_cache(registry: Registry) -> ResponseCache:
+    """Return the response cache or None if not enabled."""
+    return getattr(registry, 'response_cache', None)
+
+
+def includeme(config):
+    """Add the response cache (`response_cache`) to the registry.
+
+    You need to enable the cache in your settings to make this work::
+
+        adhocracy.response_cache.enabled = True
+
+    """
+    settings = config.registry['config']
+    response_cache = settings.adhocracy.response_cache
+    if response_cache.enabled:
+        config.registry.response_cache = ResponseCache(
+            max_size=response_cache.max_size,
+            max_entry_size=response_cache.max_entry_size)
+    else:
+        config.registry.response_cache = None
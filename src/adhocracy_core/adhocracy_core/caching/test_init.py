@@ -41,6 +41,93 @@ def test_get_cache_mode_raise_if_wrong_mode_in_settings(registry):
         _get_cache_mode(registry)
 
 
+def test_get_cache_key_mode_return_default_mode(registry):
+    from adhocracy_core.interfaces import HTTPCacheKeyMode
+    from . import _get_cache_key_mode
+    assert _get_cache_key_mode(registry) == HTTPCacheKeyMode.userid
+
+
+def test_get_cache_key_mode_return_mode_in_settings(registry):
+    from adhocracy_core.interfaces import HTTPCacheKeyMode
+    from . import _get_cache_key_mode
+    registry['config'].adhocracy.caching_key_mode = 'principals'
+    assert _get_cache_key_mode(registry) == HTTPCacheKeyMode.principals
+
+
+class TestHashPrincipals:
+
+    def call_fut(self, *args):
+        from . import hash_principals
+        return hash_principals(*args)
+
+    def test_same_key_for_same_principals(self):
+        assert self.call_fut(['group:a', 'role:b']) ==\
+            self.call_fut(['role:b', 'group:a', 'role:b'])
+
+    def test_different_key_for_different_principals(self):
+        assert self.call_fut(['group:a']) != self.call_fut(['group:b'])
+
+    def test_ignore_userid(self):
+        assert self.call_fut(['/user1', 'group:a'], '/user1') ==\
+            self.call_fut(['/user2', 'group:a'], '/user2')
+
+
+def test_get_principals_key(config, request_):
+    from . import get_principals_key
+    from . import hash_principals
+    config.testing_securitypolicy(userid='/user', groupids=['group:a'])
+    request_.authenticated_userid = '/user'
+    assert get_principals_key(request_) ==\
+        hash_principals(['system.Everyone', 'system.Authenticated',
+                         'group:a'])
+
+
+class TestIsUserSpecific:
+
+    @fixture
+    def request_(self, request_):
+        request_.authenticated_userid = '/user'
+        return request_
+
+    def call_fut(self, *args):
+        from . import is_user_specific
+        return is_user_specific(*args)
+
+    def test_not_user_specific(self, context, request_):
+        assert not self.call_fut(context, request_)
+
+    def test_pool_filtered_by_view_permission(self, pool, request_):
+        assert self.call_fut(pool, request_)
+
+    def test_pool_not_filtered_by_view_permission(self, pool, request_,
+                                                  registry):
+        registry['config'].adhocracy.filter_by_view_permission = False
+        assert not self.call_fut(pool, request_)
+
+    def test_pool_not_user_specific_if_anonymous(self, pool, request_):
+        request_.authenticated_userid = None
+        assert not self.call_fut(pool, request_)
+
+    def test_not_user_specific_if_anonymous(self, context, request_):
+        context.__local_roles__ = {None: {'role:creator'}}
+        request_.authenticated_userid = None
+        assert not self.call_fut(context, request_)
+
+    def test_user_has_local_roles(self, context, request_):
+        context.__local_roles__ = {'/user': {'role:creator'}}
+        assert self.call_fut(context, request_)
+
+    def test_user_has_local_roles_in_parent(self, pool, context, request_):
+        pool.__local_roles__ = {'/user': {'role:participant'}}
+        pool['child'] = context
+        assert self.call_fut(context, request_)
+
+    def test_user_is_anonymized_creator(self, context, request_):
+        from adhocracy_core.authentication import set_anonymized_creator
+        set_anonymized_creator(context, '/user')
+        assert self.call_fut(context, request_)
+
+
 def test_get_cache_strategy_for_viewname(registry, context, request_):
     from . import _get_cache_strategy
     mock_strategy = _create_and_register_mock_strategy(registry, 'view_name')
@@ -175,11 +262,56 @@ class TestHTTPCacheStrategyBaseAdapter:
         inst.set_etag()
         assert request_.response.headers['etag'] == '"tag|tag"'
 
+    def test_get_etag_etags_are_empty(self, inst):
+        inst.etags = tuple()
+        assert inst.get_etag() is None
+
+    def test_get_etag_etags_lists_functions(self, inst, request_):
+        inst.etags = (lambda context, request: 'tag',)
+        assert inst.get_etag() == 'tag'
+        assert request_.response.etag is None
+
     def test_set_vary(self, inst, request_):
         inst.vary = ('XX', 'BB')
         inst.set_vary()
         assert request_.response.headers['Vary'] == 'XX, BB'
 
+    @fixture
+    def mode_principals(self, registry, request_):
+        registry['config'].adhocracy.caching_key_mode = 'principals'
+        request_.authenticated_userid = '/user'
+
+    @mark.usefixtures('mode_principals')
+    def test_set_vary_mode_principals(self, inst, request_):
+        inst.vary = ('XX', 'X-User-Path', 'X-User-Token')
+        inst.set_vary()
+        assert request_.response.headers['Vary'] == 'XX, X-Principals-Key'
+
+    @mark.usefixtures('mode_principals')
+    def test_set_vary_mode_principals_without_user_headers(self, inst,
+                                                          request_):
+        inst.vary = ('XX',)
+        inst.set_vary()
+        assert request_.response.headers['Vary'] == 'XX'
+
+    @mark.usefixtures('mode_principals')
+    def test_set_vary_mode_principals_filtered_pool(self, inst, request_,
+                                                    pool):
+        inst.context = pool
+        inst.vary = ('XX', 'X-User-Path', 'X-User-Token')
+        inst.set_vary()
+        assert request_.response.headers['Vary'] ==\
+            'XX, X-User-Path, X-User-Token'
+
+    @mark.usefixtures('mode_principals')
+    def test_set_vary_mode_principals_user_has_local_roles(self, inst,
+                                                          request_):
+        inst.context.__local_roles__ = {'/user': {'role:creator'}}
+        inst.vary = ('XX', 'X-User-Path', 'X-User-Token')
+        inst.set_vary()
+        assert request_.response.headers['Vary'] ==\
+            'XX, X-User-Path, X-User-Token'
+
     def test_set_cache_headers_for_mode_no_cache(self, dummyinst):
         from adhocracy_core.interfaces import HTTPCacheMode
         fut = self.get_class().set_cache_headers_for_mode
@@ -236,6 +368,72 @@ def test_etag_userid_with_authenticated_user(context):
     assert etag_userid(context, request) == 'userid'
 
 
+class TestEtagPrincipals:
+
+    @fixture
+    def request_(self, config, request_):
+        config.testing_securitypolicy(userid='/user', groupids=['group:a'])
+        request_.authenticated_userid = '/user'
+        return request_
+
+    def call_fut(self, *args):
+        from . import etag_principals
+        return etag_principals(*args)
+
+    def test_mode_userid(self, context, request_):
+        assert self.call_fut(context, request_) == '/user'
+
+    def test_mode_principals(self, context, request_, registry):
+        from . import get_principals_key
+        registry['config'].adhocracy.caching_key_mode = 'principals'
+        assert self.call_fut(context, request_) ==\
+            get_principals_key(request_)
+
+    def test_mode_principals_user_specific(self, pool, request_,
+                                           registry):
+        registry['config'].adhocracy.caching_key_mode = 'principals'
+        assert self.call_fut(pool, request_) == '/user'
+
+
+class TestGetResponseCacheKey:
+
+    @fixture
+    def strategy(self):
+        strategy = mock.Mock()
+        strategy.get_etag.return_value = 'etag'
+        return strategy
+
+    @fixture
+    def request_(self, config, request_):
+        config.testing_securitypolicy(userid='/user', groupids=['group:a'])
+        request_.authenticated_userid = '/user'
+        request_.query_string = 'elements=content'
+        return request_
+
+    def call_fut(self, *args):
+        from . import get_response_cache_key
+        return get_response_cache_key(*args)
+
+    def test_key(self, context, request_, strategy):
+        from . import get_principals_key
+        assert self.call_fut(context, request_, strategy) ==\
+            ('GET', request_.application_url, '/', 'elements=content',
+             get_principals_key(request_), 'etag')
+
+    def test_key_contains_method(self, context, request_, strategy):
+        get_key = self.call_fut(context, request_, strategy)
+        request_.method = 'HEAD'
+        assert self.call_fut(context, request_, strategy) != get_key
+
+    def test_key_user_specific(self, pool, request_, strategy):
+        key = self.call_fut(pool, request_, strategy)
+        assert key[4] == '/user'
+
+    def test_none_if_no_etag(self, context, request_, strategy):
+        strategy.get_etag.return_value = None
+        assert self.call_fut(context, request_, strategy) is None
+
+
 @fixture
 def context_with_counters(context):
     from BTrees.Length import Length
@@ -277,13 +475,13 @@ class TestHTTPCacheStrategyWeakAdapter:
         from zope.interface.verify import verifyObject
         from adhocracy_core.interfaces import IHTTPCacheStrategy
         from . import etag_backrefs, etag_descendants, etag_modified, \
-            etag_userid, etag_blocked
+            etag_principals, etag_blocked
         assert verifyObject(IHTTPCacheStrategy, inst)
         assert inst.browser_max_age == 0
         assert inst.proxy_max_age == 31104000
         assert inst.vary == ('Accept-Encoding', 'X-User-Path', 'X-User-Token')
         assert inst.etags == (etag_backrefs, etag_descendants, etag_modified,
-                              etag_userid, etag_blocked)
+                              etag_principals, etag_blocked)
 
 
 class TestHTTPCacheStrategyStrongAdapter:
@@ -296,10 +494,10 @@ class TestHTTPCacheStrategyStrongAdapter:
     def test_create(self, inst):
         from zope.interface.verify import verifyObject
         from adhocracy_core.interfaces import IHTTPCacheStrategy
-        from . import etag_modified, etag_userid, etag_blocked
+        from . import etag_modified, etag_principals, etag_blocked
         assert verifyObject(IHTTPCacheStrategy, inst)
         assert inst.browser_max_age == inst.proxy_max_age == 31104000
-        assert inst.etags == (etag_modified, etag_userid, etag_blocked)
+        assert inst.etags == (etag_modified, etag_principals, etag_blocked)
 
 
 @fixture
@@ -393,6 +591,18 @@ class TestIntegrationCaching:
         assert resp.headers['Vary'] == 'Accept-Encoding, X-User-Path, X-User-Token'
         assert resp.headers['etag'] == '"None|None|None|None|None"'
 
+    def test_strategy_with_mode_proxy_cache_and_key_mode_principals_get(
+            self, app_user, registry):
+        from adhocracy_core.interfaces import HTTPCacheMode
+        from . import hash_principals
+        registry['config'].adhocracy.caching_mode =\
+            HTTPCacheMode.with_proxy_cache.name
+        registry['config'].adhocracy.caching_key_mode = 'principals'
+        resp = app_user.get('/', status=200)
+        assert resp.headers['Vary'] == 'Accept-Encoding, X-Principals-Key'
+        key = hash_principals(['system.Everyone'])
+        assert resp.headers['etag'] == '"None|None|None|{}|None"'.format(key)
+
     def test_strategy_modified_if_modified_since_request(self, app_user,
                                                          context):
         from datetime import datetime
@@ -426,14 +636,73 @@ class TestIntegrationCaching:
         resp = error.value
         assert resp.status == '304 Not Modified'
 
-    def test_strategy_ok_if_none_match_request_without_etag(self, app_user):
+    def test_strategy_ok_if_none_match_request_without_etag(self, app_user,
+                                                             monkeypatch):
         from adhocracy_core.caching import HTTPCacheStrategyWeakAdapter
-        HTTPCacheStrategyWeakAdapter.etags = tuple()  # braking test isolation
+        monkeypatch.setattr(HTTPCacheStrategyWeakAdapter, 'etags', tuple())
         resp = app_user.get('/', status=200, headers={'If-None-Match':
                                                       'None|None|None|None|None'})
         assert resp.status == '200 OK'
 
 
+@mark.usefixtures('integration')
+class TestIntegrationResponseCache:
+
+    @fixture
+    def config(self, config):
+        from adhocracy_core.interfaces import IResource
+        from . import set_cache_header
+        calls = []
+
+        @set_cache_header
+        def view(context, request):
+            calls.append(request)
+            return {'calls': len(calls)}
+
+        config.add_view(view, renderer='json', request_method='GET',
+                        context=IResource)
+        return config
+
+    @fixture
+    def response_cache(self, integration, registry):
+        from .response import ResponseCache
+        registry.response_cache = ResponseCache()
+        return registry.response_cache
+
+    @fixture
+    def app_user(self, config, context):
+        from webtest import TestApp
+        app = config.make_wsgi_app()
+        app.root_factory = lambda x: context
+        return TestApp(app)
+
+    def test_view_called_without_cache(self, app_user):
+        app_user.get('/', status=200)
+        resp = app_user.get('/', status=200)
+        assert resp.json == {'calls': 2}
+
+    def test_skip_view_if_cached(self, app_user, response_cache):
+        app_user.get('/', status=200)
+        resp = app_user.get('/', status=200)
+        assert resp.json == {'calls': 1}
+        assert resp.content_type == 'application/json'
+        assert 'X-Caching-Strategy' in resp.headers
+        assert response_cache.hits == 1
+
+    def test_call_view_if_etag_changed(self, app_user, response_cache,
+                                       context):
+        from datetime import datetime
+        app_user.get('/', status=200)
+        context.modification_date = datetime(2015, 1, 1)
+        resp = app_user.get('/', status=200)
+        assert resp.json == {'calls': 2}
+
+    def test_call_view_if_query_changed(self, app_user, response_cache):
+        app_user.get('/', status=200)
+        resp = app_user.get('/?elements=content', status=200)
+        assert resp.json == {'calls': 2}
+
+
 class TestPurgeVarnishAfterCommitHook:
 
     def call_fut(self, *args):
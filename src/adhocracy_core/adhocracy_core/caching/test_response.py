@@ -0,0 +1,91 @@
+from unittest.mock import Mock
+from pytest import fixture
+
+
+class TestResponseCache:
+
+    @fixture
+    def inst(self):
+        from .response import ResponseCache
+        return ResponseCache(max_size=10, max_entry_size=5)
+
+    def test_create(self, inst):
+        assert inst.max_size == 10
+        assert inst.max_entry_size == 5
+        assert inst.size == 0
+        assert inst.hits == 0
+        assert inst.misses == 0
+        assert inst.hit_ratio == 0
+        assert len(inst) == 0
+
+    def test_get_missing(self, inst):
+        assert inst.get(('key',)) is None
+        assert inst.misses == 1
+
+    def test_set_and_get(self, inst):
+        inst.set(('key',), b'body')
+        assert inst.get(('key',)) == b'body'
+        assert inst.hits == 1
+        assert inst.size == 4
+        assert inst.hit_ratio == 1
+
+    def test_set_override_existing(self, inst):
+        inst.set(('key',), b'body')
+        inst.set(('key',), b'new')
+        assert inst.get(('key',)) == b'new'
+        assert inst.size == 3
+
+    def test_set_ignore_body_bigger_than_max_entry_size(self, inst):
+        inst.set(('key',), b'123456')
+        assert len(inst) == 0
+        assert inst.size == 0
+
+    def test_set_drop_least_recently_used_if_max_size(self, inst):
+        inst.set(('a',), b'aaaa')
+        inst.set(('b',), b'bbbb')
+        inst.get(('a',))
+        inst.set(('c',), b'cccc')
+        assert inst.get(('b',)) is None
+        assert inst.get(('a',)) == b'aaaa'
+        assert inst.size == 8
+
+    def test_clear(self, inst):
+        inst.set(('key',), b'body')
+        inst.get(('key',))
+        inst.clear()
+        assert len(inst) == 0
+        assert inst.size == 0
+        assert inst.hits == 0
+
+    def test_get_send_statsd_metrics(self, inst, monkeypatch):
+        from . import response
+        mock = Mock()
+        monkeypatch.setattr(response, 'statsd_incr', mock)
+        inst.get(('key',))
+        mock.assert_called_with('caching.response.misses', rate=.1,
+                                registry=None)
+        inst.set(('key',), b'body')
+        inst.get(('key',))
+        mock.assert_called_with('caching.response.hits', rate=.1,
+                                registry=None)
+
+
+class TestIncludeme:
+
+    def test_cache_disabled(self, config):
+        from .response import includeme
+        from .response import get_response_cache
+        includeme(config)
+        assert get_response_cache(config.registry) is None
+
+    def test_cache_enabled(self, config):
+        from .response import ResponseCache
+        from .response import includeme
+        from .response import get_response_cache
+        settings = config.registry['config'].adhocracy.response_cache
+        settings.enabled = True
+        settings.max_size = 100
+        includeme(config)
+        cache = get_response_cache(config.registry)
+        assert isinstance(cache, ResponseCache)
+        assert cache.max_size == 100
@@ -1,18 +1,31 @@
 """Configure search catalogs."""
 from itertools import chain
+import sys
+import time
 
 from zope.interface import Interface
+from zope.interface.interface import InterfaceClass
+from BTrees.Length import Length
 from pyramid.registry import Registry
+from pyramid.threadlocal import get_current_registry
 from itertools import islice
 from collections.abc import Iterable
 from substanced import catalog
 from substanced.interfaces import IIndexingActionProcessor
 from substanced.catalog import CatalogsService
 from substanced.catalog.indexes import AllowsComparator
+from substanced.catalog.indexes import PathIndex
+from substanced.stats import statsd_timer
 from substanced.util import find_objectmap
 from substanced.util import get_oid
+from hypatia import RangeValue
+from hypatia.field import FieldIndex
 from hypatia.interfaces import IIndex
 from hypatia.interfaces import IResultSet
+from hypatia.keyword import KeywordIndex
+from hypatia.query import All
+from hypatia.query import Any
+from hypatia.query import Eq
 from hypatia.query import Query
 from hypatia.util import ResultSet
 from adhocracy_core.interfaces import IServicePool
@@ -27,6 +40,8 @@ from adhocracy_core.interfaces import search_result
 from adhocracy_core.interfaces import IResource
 from adhocracy_core.resources.service import service_meta
 from adhocracy_core.resources import add_resource_type_to_registry
+from adhocracy_core.catalog.index import ChildrenIndex
+from adhocracy_core.catalog.index import ReferenceIndex
 from adhocracy_core.utils import normalize_to_tuple
 
 
@@ -36,8 +51,32 @@ class ICatalogsService(IServicePool):
 
 class CatalogsServiceAdhocracy(CatalogsService):
 
+    probe_ratio = 4
+    """Filter the intermediate search result docid by docid instead of
+    applying the next query if the estimated query result is `probe_ratio`
+    times bigger.
+    """
+
+    _modification_counter = None
+
+    @property
+    def modification_count(self) -> int:
+        """Return the number of index modifications, used as cache key."""
+        counter = self._modification_counter
+        return 0 if counter is None else counter()
+
+    def increment_modification_count(self):
+        """Increment :attr:`modification_count` to invalidate cached results.
+
+        This is called for every resource (re/un)index.
+        """
+        if self._modification_counter is None:
+            self._modification_counter = Length()
+        self._modification_counter.change(1)
+
     def reindex_all(self, resource: IResource):
         """Reindex `resource` with all indexes."""
+        self.increment_modification_count()
         for value in self.values():
             value.reindex_resource(resource)
 
@@ -50,6 +89,7 @@ class CatalogsServiceAdhocracy(CatalogsService):
         if index is None:
             msg = 'catalog index {0} does not exist.'.format(index_name)
             raise KeyError(msg)
+        self.increment_modification_count()
         index.reindex_resource(resource)
 
     def search(self, query: SearchQuery) -> SearchResult:
@@ -67,6 +107,76 @@ class CatalogsServiceAdhocracy(CatalogsService):
                                         frequency_of=frequency_of)
         return result
 
+    def search_references(self, queries: [SearchQuery]) -> [SearchResult]:
+        """Search multiple reference queries at once.
+
+        Return one search result for every query in `queries`.
+
+        If the queries only differ by their single reference and `sort_by`
+        ('' or 'reference') they are executed together: the reference
+        targets or sources are read from the reference index and the
+        remaining query filters are applied once to all of them.
+        Otherwise every query is executed with :meth:`search`.
+        """
+        if not self._can_search_references_at_once(queries):
+            return [self.search(query) for query in queries]
+        if not self.values():  # child catalogs/indexes are not created yet
+            return [search_result._replace(elements=[]) for query in queries]
+        self._flush_reindex_queue(get_current_registry())
+        references_index = self.get_index('reference')
+        oids_per_query = []
+        for query in queries:
+            reference = query.references[0]
+            oids = references_index.search_with_order(reference).ids
+            oids_per_query.append(oids)
+        oids = self.family.IF.Set(chain.from_iterable(oids_per_query))
+        filter_query = queries[0]._replace(references=())
+        indexes = self._get_query_indexes(filter_query)
+        matching = self._filter_docids(indexes, oids)
+        resolved = self._resolve_oids(matching)
+        results = []
+        for query, oids in zip(queries, oids_per_query):
+            source = query.references[0][0]
+            if query.sort_by == 'reference' and source is not None:
+                elements = [resolved[x] for x in oids if x in matching]
+            else:
+                elements = [resolved[x] for x in sorted(set(oids))
+                            if x in matching]
+            results.append(search_result._replace(elements=elements,
+                                                  count=len(elements)))
+        return results
+
+    def _can_search_references_at_once(self, queries: [SearchQuery]) -> bool:
+        filter_queries = []
+        for query in queries:
+            is_single_reference = len(query.references) == 1\
+                and not self._is_tuple_starting_with_comparator(
+                    query.references[0])
+            is_simple = query.sort_by in ('', 'reference')\
+                and query.resolve\
+                and not (query.reverse or query.limit or query.frequency_of
+                         or query.group_by)
+            if not (is_single_reference and is_simple):
+                return False
+            filter_query = query._replace(references=(), sort_by='')
+            if filter_queries and filter_query != filter_queries[0]:
+                return False
+            filter_queries.append(filter_query)
+        return len(filter_queries) > 0
+
+    def _filter_docids(self, indexes: [Query], docids) -> IResultSet:
+        """Return all `docids` matching all queries `indexes`."""
+        with statsd_timer('catalog.query'):
+            for idx in indexes:
+                idx.flush()
+                if len(docids) == 0:
+                    break
+                if self._can_probe(idx):
+                    docids = self._probe(idx, docids)
+                else:
+                    docids = idx.intersect(docids, {})
+        return docids
+
     def _get_interfaces_index_query(self, query) -> Query:
         interfaces_value = self._get_query_value(query.interfaces)
         if not interfaces_value:
@@ -81,6 +191,26 @@ class CatalogsServiceAdhocracy(CatalogsService):
             index_query = index_comparator(interfaces_value)
         return index_query
 
+    def _get_structure_index_query(self, query) -> [Query]:
+        """Return path and interfaces query or the children index query.
+
+        The `children` index is used for descendants with limited depth
+        and interfaces without comparator.
+        """
+        comparator = self._get_query_comparator(query.interfaces)
+        children_index = None
+        if query.root is not None and query.depth and comparator is None:
+            children_index = self.get_index('children')
+        if children_index is None:
+            return [self._get_path_index_query(query),
+                    self._get_interfaces_index_query(query)]
+        interfaces = self._get_query_value(query.interfaces) or ()
+        children_query = children_index.eq(
+            {'parent': query.root,
+             'depth': query.depth,
+             'interfaces': normalize_to_tuple(interfaces)})
+        return [children_query]
+
     def _get_path_index_query(self, query) -> Query:
         if query.root is None:
             return None
@@ -107,6 +237,8 @@ class CatalogsServiceAdhocracy(CatalogsService):
 
     def _get_references_index_query(self, query) -> [Query]:
         indexes = []
+        if not query.references:
+            return indexes
         index = self.get_index('reference')
         for value in query.references:
             index_comparator = self._get_query_comparator(value)
@@ -136,38 +268,305 @@ class CatalogsServiceAdhocracy(CatalogsService):
         indexes = [idx for idx in maybes_indexes if idx is not None]
         return indexes
 
-    def _execute_query(self, indexes) -> IResultSet:
-        """Combine all query `indexes` with `&` and execute the query.
+    def _execute_query(self, indexes, explain: list=None) -> IResultSet:
+        """Execute the query `indexes`, start with the most selective one.
 
         If `indexes` is empty or it starts with a query from the `allows`
         index an empty result is returned. The allows index can only be used
         as a filter so you need a query that returns a search result first.
+
+        :param explain: list to append the executed plan steps to,
+            see :meth:`explain`.
         """
         has_indexes = len(indexes) > 0
         is_starting_with_allows = has_indexes and isinstance(indexes[0],
                                                              AllowsComparator)
         if has_indexes and not is_starting_with_allows:
-            index_query = indexes[0]
-            for idx in indexes[1:]:
-                index_query &= idx
-            elements = index_query.execute(resolver=lambda x: x)
+            with statsd_timer('catalog.query'):
+                for idx in indexes:
+                    idx.flush()
+                plan = self._plan_query(indexes)
+                docids = self._execute_plan(plan, explain)
+            elements = ResultSet(docids, len(docids), lambda x: x)
         else:
             elements = ResultSet(set(), 0, None)
         return elements
 
+    def _plan_query(self, indexes: [Query]) -> [tuple]:
+        """Return list of (estimated cardinality, query), smallest first.
+
+        Queries from the `allows` index are moved to the end.
+        """
+        estimated = []
+        for position, idx in enumerate(indexes):
+            is_allows = isinstance(idx, AllowsComparator)
+            estimate = self._estimate_cardinality(idx)
+            estimated.append((is_allows, estimate, position, idx))
+        estimated.sort(key=lambda x: x[:3])
+        plan = [(estimate, idx) for _, estimate, _, idx in estimated]
+        return plan
+
+    def _estimate_cardinality(self, idx: Query) -> int:
+        """Estimate the result size of `idx` based on index statistics.
+
+        Return `sys.maxsize` if no estimation is possible.
+        """
+        index = getattr(idx, 'index', None)
+        value = getattr(idx, '_value', None)
+        if isinstance(idx, AllowsComparator):
+            return sys.maxsize
+        elif isinstance(index, (ReferenceIndex, ChildrenIndex))\
+                and type(idx) is Eq:
+            return index.estimate(value)
+        elif isinstance(index, PathIndex) and type(idx) is Eq:
+            return self._estimate_path_cardinality(value)
+        elif isinstance(index, (FieldIndex, KeywordIndex)):
+            return self._estimate_values_cardinality(idx, index, value)
+        else:
+            return sys.maxsize
+
+    def _estimate_path_cardinality(self, value: dict) -> int:
+        objectmap = find_objectmap(self)
+        path_index = self.get_index('path')
+        path_tuple = path_index._parse_path(value['path'])[0]
+        depth = value.get('depth', None)
+        include_origin = value.get('include_origin', True)
+        levels = objectmap.pathindex.get(path_tuple, {})
+        estimate = 0
+        for level, oids in levels.items():
+            if level == 0 and not include_origin:
+                continue
+            if depth is not None and level > depth:
+                break
+            estimate += len(oids)
+        return estimate
+
+    def _estimate_values_cardinality(self, idx: Query, index: IIndex,
+                                     value: object) -> int:
+        values = self._get_probe_values(idx, index, value)
+        if values is None:  # negations, ranges,..
+            return index.indexed_count() + index.not_indexed_count()
+        counts = [len(index._fwd_index.get(v, ())) for v in values]
+        if isinstance(index, KeywordIndex) and type(idx) is not Any:
+            return min(counts, default=0)  # keyword values are combined 'and'
+        return sum(counts)
+
+    def _get_probe_values(self, idx: Query, index: IIndex,
+                          value: object) -> tuple:
+        """Return the values to look up for `idx` or None if not possible."""
+        if type(idx) not in (Eq, Any, All):
+            return None
+        if type(idx) is All and isinstance(index, FieldIndex):
+            return None
+        if type(idx) is Eq or not isinstance(value, (list, tuple)):
+            values = (value,)
+        else:
+            values = tuple(value)
+        if not all(self._is_scalar(v) for v in values):
+            return None
+        if isinstance(index, KeywordIndex):
+            values = tuple(index.normalize(values))
+        return values
+
+    def _is_scalar(self, value: object) -> bool:
+        return not isinstance(value, (list, tuple, set, dict, RangeValue))
+
+    def _execute_plan(self, plan: [tuple], explain: list=None):
+        """Apply the first query of `plan` and intersect the following ones.
+
+        Instead of applying a following query the intermediate result
+        is filtered docid by docid, if the query estimation is bigger
+        (see :attr:`probe_ratio`).
+        """
+        names = {}
+        result = None
+        for estimate, idx in plan:
+            start = time.perf_counter()
+            if result is None:
+                strategy = 'apply'
+                result = idx._apply(names)
+            elif len(result) * self.probe_ratio < estimate \
+                    and self._can_probe(idx):
+                strategy = 'probe'
+                result = self._probe(idx, result)
+            else:
+                strategy = 'intersect'
+                result = idx.intersect(result, names)
+            if explain is not None:
+                explain.append({'query': str(idx),
+                                'estimate': estimate,
+                                'strategy': strategy,
+                                'count': len(result),
+                                'time': time.perf_counter() - start,
+                                })
+            if len(result) == 0:
+                break
+        return result
+
+    def _can_probe(self, idx: Query) -> bool:
+        index = getattr(idx, 'index', None)
+        if isinstance(index, PathIndex):
+            return type(idx) is Eq
+        elif isinstance(index, (FieldIndex, KeywordIndex)):
+            value = getattr(idx, '_value', None)
+            return self._get_probe_values(idx, index, value) is not None
+        return False
+
+    def _probe(self, idx: Query, docids) -> IResultSet:
+        """Return all `docids` matching the query `idx`.
+
+        Only docids are looked up, the query result is never computed.
+        """
+        index = idx.index
+        value = idx._value
+        if isinstance(index, PathIndex):
+            is_matching = self._get_path_matcher(value)
+        else:
+            values = self._get_probe_values(idx, index, value)
+            is_matching = self._get_values_matcher(idx, index, values)
+        matching = [docid for docid in docids if is_matching(docid)]
+        return idx.family.IF.Set(matching)
+
+    def _get_path_matcher(self, value: dict) -> callable:
+        objectmap = find_objectmap(self)
+        path_index = self.get_index('path')
+        path_tuple = path_index._parse_path(value['path'])[0]
+        depth = value.get('depth', None)
+        include_origin = value.get('include_origin', True)
+        root_length = len(path_tuple)
+
+        def is_matching(docid: int) -> bool:
+            path = objectmap.objectid_to_path.get(docid)
+            if path is None or path[:root_length] != path_tuple:
+                return False
+            level = len(path) - root_length
+            if level == 0:
+                return include_origin
+            return depth is None or level <= depth
+        return is_matching
+
+    def _get_values_matcher(self, idx: Query, index: IIndex,
+                            values: tuple) -> callable:
+        rev_index = index._rev_index
+        if isinstance(index, FieldIndex):
+            def is_matching(docid: int) -> bool:
+                return docid in rev_index and rev_index[docid] in values
+        elif type(idx) is Any:
+            def is_matching(docid: int) -> bool:
+                words = rev_index.get(docid, ())
+                return any(v in words for v in values)
+        else:
+            def is_matching(docid: int) -> bool:
+                words = rev_index.get(docid, ())
+                return all(v in words for v in values)
+        return is_matching
+
+    def explain(self, query: SearchQuery) -> [dict]:
+        """Search `query` and return the executed query plan with timings.
+
+        Every plan step is a dictionary with the query representation
+        (`query`), the estimated result size (`estimate`), the execution
+        strategy (`apply`, `intersect` or `probe`), the result size after
+        this step (`count`) and the execution time in seconds (`time`).
+        """
+        if not self.values():  # child catalogs/indexes are not created yet
+            return []
+        steps = []
+        indexes = self._get_query_indexes(query)
+        self._execute_query(indexes, explain=steps)
+        return steps
+
     def _search_elements(self, query) -> IResultSet:
         if not self.values():  # child catalogs/indexes are not created yet
             return ResultSet(set(), 0, None)
+        registry = get_current_registry()
+        self._flush_reindex_queue(registry)
+        cache = getattr(registry, 'search_cache', None)
+        if cache is None:
+            indexes = self._get_query_indexes(query)
+            elements = self._execute_query(indexes)
+        else:
+            elements = self._search_cached_elements(query, cache, registry)
+        return elements
+
+    def _flush_reindex_queue(self, registry: Registry):
+        """Apply queued reindex operations to search up to date indexes."""
+        reindex_queue = getattr(registry, 'reindex_queue', None)
+        if reindex_queue is not None:
+            reindex_queue.flush()
+
+    def _search_cached_elements(self, query, cache, registry) -> IResultSet:
+        """Search elements without `allows` filter, use cached results.
+
+        The principal dependent `allows` filter is applied to the (cached)
+        result afterwards.
+        """
+        base_query = query._replace(allows=())
+        key = self._get_cache_key(base_query)
+        docids = None if key is None else cache.get(key, registry=registry)
+        if docids is None:
+            indexes = self._get_query_indexes(base_query)
+            elements = self._execute_query(indexes)
+            docids = self.family.IF.Set(elements.all(resolve=False))
+            if key is not None:
+                cache.set(key, docids)
+        allows_query = self._get_allowed_index_query(query)
+        if allows_query is not None and docids:
+            docids = allows_query.intersect(docids, {})
+        return ResultSet(docids, len(docids), lambda x: x)
+
+    def _get_cache_key(self, query: SearchQuery) -> tuple:
+        """Return hashable cache key for `query` or None if not cacheable.
+
+        Nothing is cacheable if the current transaction modified indexes.
+        """
+        counter = self._modification_counter
+        if self._p_changed or (counter is not None and counter._p_changed):
+            return None
+        try:
+            frozen = self._freeze((query.interfaces,
+                                   query.indexes,
+                                   query.references,
+                                   query.root,
+                                   query.depth,
+                                   query.only_visible,
+                                   ))
+        except (TypeError, ValueError):
+            return None
+        return (get_oid(self, None), self.modification_count, frozen)
+
+    def _freeze(self, value: object) -> object:
+        """Convert `value` to hashable, replace resources with their oid.
+
+        :raises ValueError: if a resource has no oid.
+        :raises TypeError: if `value` is not hashable.
+        """
+        if isinstance(value, InterfaceClass):
+            return value
+        elif hasattr(value, '__parent__'):
+            oid = get_oid(value, None)
+            if oid is None:
+                raise ValueError('Resource has no oid')
+            return ('oid', oid)
+        elif isinstance(value, dict):
+            return tuple(sorted((k, self._freeze(v))
+                                for k, v in value.items()))
+        elif isinstance(value, (list, tuple)):
+            return tuple(self._freeze(v) for v in value)
+        elif isinstance(value, (set, frozenset)):
+            return frozenset(self._freeze(v) for v in value)
+        hash(value)
+        return value
+
+    def _get_query_indexes(self, query) -> [Query]:
         indexes = self._combine_indexes(
             query,
             self._get_references_index_query(query),
-            [self._get_path_index_query(query)],
-            [self._get_interfaces_index_query(query)],
+            self._get_structure_index_query(query),
             self._get_indexes_index_query(query),
             [self._get_private_visibility_index_query(query)],
             [self._get_allowed_index_query(query)],)
-        elements = self._execute_query(indexes)
-        return elements
+        return indexes
 
     def _get_frequency_of(self, elements: IResultSet,
                           query: SearchQuery) -> dict:
@@ -249,8 +648,29 @@ class CatalogsServiceAdhocracy(CatalogsService):
         elements = (objectmap.object_for(e) for e in elements)
         if query.resolve:
             elements = [x for x in elements]
+            self._prefetch(elements)
         return elements
 
+    def _resolve_oids(self, oids: [int]) -> dict:
+        """Return mapping oid to resource for all `oids`."""
+        objectmap = find_objectmap(self)
+        resources = {oid: objectmap.object_for(oid) for oid in oids}
+        self._prefetch(resources.values())
+        return resources
+
+    def _prefetch(self, resources: Iterable):
+        """Load the state of `resources` with one storage request.
+
+        This is a noop if the storage does not support prefetching.
+        """
+        jar = self._p_jar
+        prefetch = getattr(jar, 'prefetch', None)
+        if prefetch is None:
+            return
+        resources = [x for x in resources if getattr(x, '_p_oid', None)]
+        if resources:
+            prefetch(*resources)
+
     def get_index(self, name) -> IIndex:
         system = self.get('system', {})
         adhocracy = self.get('adhocracy', {})
@@ -281,6 +701,7 @@ class CatalogsServiceAdhocracy(CatalogsService):
 
     def get_index_value(self, context: IResource, index_name: str):
         """Get value of index."""
+        self._flush_reindex_queue(get_current_registry())
         index = self.get_index(index_name)
         oid = get_oid(context)
         return index.document_repr(oid)
@@ -325,3 +746,5 @@ def includeme(config):
     config.include('.system')
     config.include('.adhocracy')
     config.include('.subscriber')
+    config.include('.cache')
+    config.include('.deferred')
@@ -7,6 +7,7 @@ from pyramid.traversal import get_current_registry
 from substanced import catalog
 from substanced.catalog import IndexFactory
 from substanced.util import find_service
+from adhocracy_core.catalog.index import ChildrenIndex
 from adhocracy_core.catalog.index import ReferenceIndex
 from adhocracy_core.exceptions import RuntimeConfigurationError
 from adhocracy_core.utils import is_hidden
@@ -35,6 +36,12 @@ class Reference(IndexFactory):
     index_type = ReferenceIndex
 
 
+class Children(IndexFactory):
+    """Index direct children, see :class:`ChildrenIndex`."""
+
+    index_type = ChildrenIndex
+
+
 class AdhocracyCatalogIndexes:
     """Default indexes for the adhocracy catalog.
 
@@ -55,9 +62,11 @@ class AdhocracyCatalogIndexes:
     item_creation_date = catalog.Field()
     workflow_state = catalog.Field()
     reference = Reference()
+    children = Children()
     user_name = catalog.Field()
     private_user_email = catalog.Field()
     private_user_activation_path = catalog.Field()
+    private_user_active = catalog.Field()
     private_service_konto_userid = catalog.Field()
 
 
@@ -259,6 +268,11 @@ def index_user_activation_path(resource, default) -> str:
     return path
 
 
+def index_user_active(resource, default) -> bool:
+    """Return value for the private_user_active index."""
+    return getattr(resource, 'active', default)
+
+
 def index_service_konto_userid(resource, default) -> str:
     """Return value for the service konto index."""
     registry = get_current_registry(resource)
@@ -347,6 +361,11 @@ def includeme(config):
                          index_name='private_user_activation_path',
                          context=IUserBasic,
                          )
+    config.add_indexview(index_user_active,
+                         catalog_name='adhocracy',
+                         index_name='private_user_active',
+                         context=IUserBasic,
+                         )
     config.add_indexview(index_service_konto_userid,
                          catalog_name='adhocracy',
                          index_name='private_service_konto_userid',
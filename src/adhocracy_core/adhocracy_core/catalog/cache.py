@@ -0,0 +1,84 @@
+"""Process wide cache for catalog search results."""
+from collections import OrderedDict
+from threading import Lock
+
+from pyramid.registry import Registry
+from substanced.stats import statsd_incr
+
+
+class SearchResultCache:
+    """Least recently used cache mapping search query keys to docid sets.
+
+    The keys are created by
+    :meth:`adhocracy_core.catalog.CatalogsServiceAdhocracy._get_cache_key`,
+    they include the catalogs modification count. So old entries are
+    never invalidated but dropped when the cache is full.
+
+    :param size: maximal number of cached search results
+    """
+
+    def __init__(self, size: int=1000):
+        """Initialize self."""
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Return the ratio of cache hits to all lookups."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: tuple, registry: Registry=None):
+        """Return cached docids for `key` or None.
+
+        Send `catalog.cache.hits` / `catalog.cache.misses` metrics to statsd.
+        """
+        with self._lock:
+            docids = self._entries.get(key, None)
+            if docids is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+        metric = 'catalog.cache.misses' if docids is None\
+            else 'catalog.cache.hits'
+        statsd_incr(metric, rate=.1, registry=registry)
+        return docids
+
+    def set(self, key: tuple, docids):
+        """Cache `docids` for `key`, drop the least recently used entries."""
+        with self._lock:
+            self._entries[key] = docids
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries and reset hit/miss counts."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def includeme(config):
+    """Add the search result cache (`search_cache`) to the registry.
+
+    You need to enable the cache in your settings to make this work::
+
+        adhocracy.search_cache.enabled = True
+
+    """
+    settings = config.registry['config']
+    search_cache = settings.adhocracy.search_cache
+    if search_cache.enabled:
+        config.registry.search_cache = SearchResultCache(
+            size=search_cache.size)
+    else:
+        config.registry.search_cache = None
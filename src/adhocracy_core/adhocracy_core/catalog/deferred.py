@@ -0,0 +1,101 @@
+"""Deferred reindexing, coalesced per transaction."""
+from threading import Lock
+from threading import local
+
+from pyramid.registry import Registry
+from substanced.stats import statsd_incr
+from substanced.util import find_objectmap
+from substanced.util import get_oid
+import transaction
+
+from adhocracy_core.interfaces import IResource
+
+
+class ReindexQueue:
+    """Collect reindex jobs and run them once before the transaction commits.
+
+    Subscribers often reindex the same resource with the same index
+    multiple times in one transaction (e.g. the `comments` index of a
+    commentable if many comments are added in one batch request).
+    Jobs are stored per thread and transaction, duplicates
+    (same docid and index name) are ignored.
+
+    :attr:`added`, :attr:`executed` and :attr:`saved` count the reindex
+    jobs of all threads.
+    """
+
+    def __init__(self, registry: Registry=None):
+        """Initialize self."""
+        self.registry = registry
+        self.added = 0
+        self.executed = 0
+        self._lock = Lock()
+        self._local = local()
+
+    @property
+    def saved(self) -> int:
+        """Return the number of reindex jobs skipped as duplicates."""
+        return self.added - self.executed
+
+    def add(self, catalogs, resource: IResource, index_name: str):
+        """Reindex `resource` with index `index_name` before commit.
+
+        If `resource` has no oid it is reindexed immediately.
+        """
+        oid = get_oid(resource, None)
+        if oid is None:
+            catalogs.reindex_index(resource, index_name)
+            return
+        jobs = self._get_jobs()
+        jobs.setdefault((oid, index_name), (catalogs, resource))
+        self._local.added += 1
+        with self._lock:
+            self.added += 1
+
+    def _get_jobs(self) -> dict:
+        current = transaction.get()
+        if getattr(self._local, 'transaction', None) is not current:
+            self._local.transaction = current
+            self._local.jobs = {}
+            self._local.added = 0
+            current.addBeforeCommitHook(self.flush)
+        return self._local.jobs
+
+    def __len__(self):
+        if getattr(self._local, 'transaction', None) is not transaction.get():
+            return 0
+        return len(self._local.jobs)
+
+    def flush(self):
+        """Run all reindex jobs of the current transaction.
+
+        Resources removed from the objectmap in the meantime (e.g. because
+        of a savepoint rollback) are ignored.
+        """
+        while len(self):
+            jobs = self._local.jobs
+            added = self._local.added
+            self._local.jobs = {}
+            self._local.added = 0
+            self._execute(jobs, added)
+
+    def _execute(self, jobs: dict, added: int):
+        executed = 0
+        for (oid, index_name), (catalogs, resource) in jobs.items():
+            objectmap = find_objectmap(catalogs)
+            if objectmap is not None and objectmap.object_for(oid) is None:
+                continue
+            catalogs.reindex_index(resource, index_name)
+            executed += 1
+        with self._lock:
+            self.executed += executed
+            self.added -= len(jobs) - executed
+        statsd_incr('catalog.reindex.executed', executed,
+                    registry=self.registry)
+        statsd_incr('catalog.reindex.saved', added - len(jobs),
+                    registry=self.registry)
+
+
+def includeme(config):
+    """Add the reindex queue (`reindex_queue`) to the registry."""
+    config.registry.reindex_queue = ReindexQueue(registry=config.registry)
@@ -7,7 +7,11 @@ from pyramid.decorator import reify
 from substanced.catalog.indexes import SDIndex
 from substanced.content import content
 from substanced.util import find_objectmap
+from substanced.util import get_oid
 from zope.interface import implementer
+from zope.interface import providedBy
+from zope.interface.interfaces import IInterface
+from BTrees.OOBTree import OOBTree
 import BTrees
 import hypatia.query
 
@@ -123,6 +127,23 @@ class ReferenceIndex(SDIndex, BaseIndexMixin, Persistent):
         result = ResultSet(oids, len(oids), None)
         return result
 
+    def estimate(self, query: dict) -> int:
+        """Estimate the result size of reference `query` without executing it.
+
+        The number of direct references is returned, traversal is ignored.
+        """
+        source, isheet, isheet_field, target = query['reference']
+        if source is None:
+            resource, get_ids = target, self._objectmap.sourceids
+        else:
+            resource, get_ids = source, self._objectmap.targetids
+        estimate = 0
+        for isheet, field, reftype in self._graph.get_reftypes(isheet):
+            if isheet_field and field != isheet_field:
+                continue
+            estimate += len(get_ids(resource, reftype))
+        return estimate
+
     def _search(self, query: dict) -> BTrees.LFBTree.TreeSet:
         """"Search target or source resources of `reference` without order."""
         oids = self._search_target_or_source_ids(query)
@@ -163,3 +184,192 @@ class ReferenceIndex(SDIndex, BaseIndexMixin, Persistent):
                                                   orientation=orientation,
                                                   traverse=traverse)
                 yield oid
+
+
+@content('Children Index',
+         is_index=True,
+         )
+@implementer(IIndex)
+class ChildrenIndex(SDIndex, BaseIndexMixin, Persistent):
+    """Map parent docids to child docids, bucketed by provided interfaces.
+
+    Only the interfaces declared for the child (resource type, sheets and
+    class interfaces) are stored, queries for base interfaces are resolved
+    with :meth:`zope.interface.interface.InterfaceClass.isOrExtends`.
+    Listing descendants with limited depth is done with BTree set operations
+    only, see :meth:`apply`.
+    """
+
+    family = BTrees.family64
+    __parent__ = None
+    __name__ = None
+
+    def __init__(self, discriminator=None):
+        """Initialize self."""
+        self.reset()
+
+    @reify
+    def _objectmap(self):
+        return find_objectmap(self)
+
+    def reset(self):
+        """Read interface."""
+        self._not_indexed = self.family.IF.TreeSet()
+        self._parents = self.family.II.BTree()
+        self._children = self.family.IO.BTree()
+        self._buckets = self.family.IO.BTree()
+
+    def document_repr(self, docid: int, default=None) -> str:
+        """Read interface."""
+        path = self._objectmap.path_for(docid)
+        if path is None:
+            return default
+        return path
+
+    def index_doc(self, docid: int, obj):
+        """Read interface."""
+        parent_oid = get_oid(getattr(obj, '__parent__', None), None)
+        if parent_oid is None:
+            self._not_indexed.add(docid)
+            return
+        self._parents[docid] = parent_oid
+        self._get_children(parent_oid, create=True).insert(docid)
+        buckets = self._buckets.get(parent_oid)
+        if buckets is None:
+            buckets = self._buckets[parent_oid] = OOBTree()
+        for iface in providedBy(obj):
+            bucket = buckets.get(iface)
+            if bucket is None:
+                bucket = buckets[iface] = self.family.IF.TreeSet()
+            bucket.insert(docid)
+
+    def _get_children(self, parent_oid: int, create=False):
+        children = self._children.get(parent_oid)
+        if children is None and create:
+            children = self._children[parent_oid] = self.family.IF.TreeSet()
+        return children
+
+    def unindex_doc(self, docid: int):
+        """Read interface."""
+        if docid in self._not_indexed:
+            self._not_indexed.remove(docid)
+        parent_oid = self._parents.pop(docid, None)
+        if parent_oid is None:
+            return
+        children = self._get_children(parent_oid)
+        children.remove(docid)
+        if not children:
+            del self._children[parent_oid]
+        buckets = self._buckets.get(parent_oid, {})
+        for iface, bucket in list(buckets.items()):
+            if docid not in bucket:
+                continue
+            bucket.remove(docid)
+            if not bucket:
+                del buckets[iface]
+        if not buckets and parent_oid in self._buckets:
+            del self._buckets[parent_oid]
+
+    def reindex_doc(self, docid: int, obj):
+        """Read interface."""
+        self.unindex_doc(docid)
+        self.index_doc(docid, obj)
+
+    def docids(self):
+        """Read interface."""
+        return self.family.IF.union(self.family.IF.Set(self._parents.keys()),
+                                    self._not_indexed)
+
+    def indexed(self):
+        """Read interface."""
+        return self._parents.keys()
+
+    def not_indexed(self):
+        """Read interface."""
+        return self._not_indexed
+
+    def eq(self, query: dict) -> hypatia.query.Eq:
+        """Query descendants.
+
+        :param query:
+
+            parent (IResource or int):
+                parent resource or docid
+            depth (int):
+                maximal depth of descendants, None to not limit depth.
+                Defaults to 1 (direct children).
+            interfaces (IInterface or [IInterface]):
+                filter descendants providing all interfaces.
+        """
+        return hypatia.query.Eq(self, query)
+
+    def apply(self, query: dict) -> BTrees.family64.IF.TreeSet:
+        """Apply descendants `query`, see :meth:`eq`."""
+        parent_oid = self._get_parent_oid(query)
+        depth = query.get('depth', 1)
+        interfaces = self._get_interfaces(query)
+        level = 0
+        parents = [parent_oid]
+        results = []
+        while parents and (depth is None or level < depth):
+            level += 1
+            children = [self._children.get(x) for x in parents]
+            children = [x for x in children if x is not None]
+            if interfaces:
+                results.extend(self._filter_children(x, interfaces)
+                               for x in parents)
+            else:
+                results.extend(children)
+            if depth is not None and level >= depth:
+                break
+            parents = list(self.family.IF.multiunion(children))
+        return self.family.IF.multiunion(results)
+
+    applyEq = apply
+    """Read apply docstring."""
+
+    def count(self, query: dict) -> int:
+        """Return the number of direct children matching `query`."""
+        return len(self.apply(dict(query, depth=1)))
+
+    def estimate(self, query: dict) -> int:
+        """Estimate the result size of `query` without executing it.
+
+        Only direct children are counted, interfaces are ignored.
+        """
+        parent_oid = self._get_parent_oid(query)
+        if query.get('depth', 1) == 1:
+            return len(self._children.get(parent_oid, ()))
+        levels = self._objectmap.pathindex.get(
+            self._objectmap.objectid_to_path.get(parent_oid), {})
+        depth = query.get('depth', 1)
+        return sum(len(oids) for level, oids in levels.items()
+                   if 0 < level and (depth is None or level <= depth))
+
+    def _get_parent_oid(self, query: dict) -> int:
+        parent = query['parent']
+        if isinstance(parent, int):
+            return parent
+        return get_oid(parent)
+
+    def _get_interfaces(self, query: dict) -> [IInterface]:
+        interfaces = query.get('interfaces', ())
+        if IInterface.providedBy(interfaces):
+            interfaces = (interfaces,)
+        return interfaces
+
+    def _filter_children(self, parent_oid: int,
+                         interfaces: [IInterface]) -> BTrees.family64.IF.Set:
+        buckets = self._buckets.get(parent_oid)
+        if buckets is None:
+            return self.family.IF.Set()
+        result = None
+        for iface in interfaces:
+            matching = [bucket for provided, bucket in buckets.items()
+                        if provided.isOrExtends(iface)]
+            docids = self.family.IF.multiunion(matching)
+            result = docids if result is None\
+                else self.family.IF.intersection(result, docids)
+            if not result:
+                break
+        return result
@@ -4,8 +4,12 @@ Read :mod:`substanced.catalog.subscribers` for default reindex subscribers.
 """
 
 from pyramid.traversal import get_current_registry
+from zope.interface import Interface
+from substanced.interfaces import IObjectAdded
+from substanced.interfaces import IObjectWillBeRemoved
 from substanced.util import find_service
 
+from adhocracy_core.catalog import ICatalogsService
 from adhocracy_core.utils import get_visibility_change
 from adhocracy_core.interfaces import VisibilityChange
 from adhocracy_core.interfaces import IResource
@@ -28,46 +32,65 @@ from adhocracy_core.sheets.workflow import IWorkflowAssignment
 from adhocracy_core.utils import list_resource_with_descendants
 
 
+def _reindex_index(catalogs, resource: IResource, index_name: str):
+    """Reindex `resource` before commit, or now if there is no reindex queue.
+
+    See :class:`adhocracy_core.catalog.deferred.ReindexQueue`.
+    """
+    registry = get_current_registry(resource)
+    queue = getattr(registry, 'reindex_queue', None)
+    if queue is None:
+        catalogs.reindex_index(resource, index_name)
+    else:
+        queue.add(catalogs, resource, index_name)
+
+
 def reindex_tag(event):
     """Reindex tag index if a tag backreference is modified."""
     catalogs = find_service(event.object, 'catalogs')
-    catalogs.reindex_index(event.object, 'tag')
+    _reindex_index(catalogs, event.object, 'tag')
 
 
 def reindex_rates(event):
     """Reindex the rates index if a rate backreference is modified."""
     catalogs = find_service(event.object, 'catalogs')
-    catalogs.reindex_index(event.object, 'rates')
+    _reindex_index(catalogs, event.object, 'rates')
 
 
 def reindex_controversiality(event):
     """Reindex the controversiality index if backreference is modified."""
     catalogs = find_service(event.object, 'catalogs')
-    catalogs.reindex_index(event.object, 'controversiality')
+    _reindex_index(catalogs, event.object, 'controversiality')
 
 
 def reindex_user_name(event):
     """Reindex indexes `user_name`."""
     catalogs = find_service(event.object, 'catalogs')
-    catalogs.reindex_index(event.object, 'user_name')
+    _reindex_index(catalogs, event.object, 'user_name')
 
 
 def reindex_user_email(event):
     """Reindex indexes `private_user_email`."""
     catalogs = find_service(event.object, 'catalogs')
-    catalogs.reindex_index(event.object, 'private_user_email')
+    _reindex_index(catalogs, event.object, 'private_user_email')
 
 
 def reindex_user_activation_path(event):
     """Reindex indexes `private_user_activation_path`."""
     catalogs = find_service(event.object, 'catalogs')
-    catalogs.reindex_index(event.object, 'private_user_activation_path')
+    _reindex_index(catalogs, event.object, 'private_user_activation_path')
+
+
+def reindex_user_active(event):
+    """Reindex indexes `private_user_active`."""
+    catalogs = find_service(event.object, 'catalogs')
+    _reindex_index(catalogs, event.object, 'private_user_active')
 
 
 def reindex_badge(event):
     """Reindex badge index if a backreference is modified/created."""
     catalogs = find_service(event.object, 'catalogs')
-    catalogs.reindex_index(event.object, 'badge')
+    _reindex_index(catalogs, event.object, 'badge')
 
 
 def reindex_visibility(event):
@@ -83,7 +106,7 @@ def _reindex_resource_and_descendants(resource: IResource):
         return
     resource_and_descendants = list_resource_with_descendants(resource)
     for res in resource_and_descendants:
-        catalogs.reindex_index(res, 'private_visibility')
+        _reindex_index(catalogs, res, 'private_visibility')
 
 
 def reindex_item_badge(event):
@@ -92,17 +115,17 @@ def reindex_item_badge(event):
     children = event.object.values()
     versionables = (c for c in children if IVersionable.providedBy(c))
     for versionable in versionables:
-        catalogs.reindex_index(versionable, 'item_badge')
+        _reindex_index(catalogs, versionable, 'item_badge')
 
 
 def reindex_workflow_state(event):
     """Reindex the workflow_state index for item and its versions."""
     catalogs = find_service(event.object, 'catalogs')
-    catalogs.reindex_index(event.object, 'workflow_state')
+    _reindex_index(catalogs, event.object, 'workflow_state')
     children = event.object.values()
     versionables = (c for c in children if IVersionable.providedBy(c))
     for versionable in versionables:
-        catalogs.reindex_index(versionable, 'workflow_state')
+        _reindex_index(catalogs, versionable, 'workflow_state')
 
 
 def reindex_comments(event):
@@ -110,7 +133,7 @@ def reindex_comments(event):
     catalogs = find_service(event.object, 'catalogs')
     commentables = _get_affected_commentables(event.object)
     for commentable in commentables:
-        catalogs.reindex_index(commentable, 'comments')
+        _reindex_index(catalogs, commentable, 'comments')
 
 
 def _get_affected_commentables(commentable):
@@ -127,17 +150,33 @@ def _get_affected_commentables(commentable):
 def reindex_user_text(event):
     """Reindex indexes `text`."""
     catalogs = find_service(event.object, 'catalogs')
-    catalogs.reindex_index(event.object, 'text')
+    _reindex_index(catalogs, event.object, 'text')
 
 
 def reindex_service_konto_userid(event):
     """Reindex indexes `private_service_konto_userid`."""
     catalogs = find_service(event.object, 'catalogs')
-    catalogs.reindex_index(event.object, 'private_service_konto_userid')
+    _reindex_index(catalogs, event.object, 'private_service_konto_userid')
+
+
+def increment_modification_count(event):
+    """Increment the catalogs modification count to outdate cached searches."""
+    catalogs = find_service(event.object, 'catalogs')
+    if not ICatalogsService.providedBy(catalogs):  # ease testing
+        return
+    catalogs.increment_modification_count()
 
 
 def includeme(config):
     """Register index subscribers."""
+    config.add_content_subscriber(increment_modification_count,
+                                  [IObjectAdded, Interface, Interface])
+    config.add_content_subscriber(increment_modification_count,
+                                  [IObjectWillBeRemoved, Interface, Interface])
+    config.add_subscriber(increment_modification_count,
+                          IResourceSheetModified)
+    config.add_subscriber(increment_modification_count,
+                          ISheetBackReferenceModified)
     config.add_subscriber(reindex_tag,
                           ISheetBackReferenceModified,
                           object_iface=IVersionable)
@@ -178,6 +217,10 @@ def includeme(config):
     config.add_subscriber(reindex_user_activation_path,
                           IResourceSheetModified,
                           event_isheet=IEmailNew)
+    config.add_subscriber(reindex_user_active,
+                          IResourceSheetModified,
+                          object_iface=IUserBasic,
+                          event_isheet=IMetadata)
     config.add_subscriber(reindex_comments,
                           ISheetBackReferenceModified,
                           event_isheet=ICommentable)
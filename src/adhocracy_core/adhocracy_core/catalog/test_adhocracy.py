@@ -38,6 +38,7 @@ def test_create_adhocracy_catalog(pool_graph, registry):
     assert 'user_name' in catalogs['adhocracy']
     assert 'private_user_email' in catalogs['adhocracy']
     assert 'private_user_activation_path' in catalogs['adhocracy']
+    assert 'private_user_active' in catalogs['adhocracy']
 
 
 class TestIndexMetadata:
@@ -586,6 +587,27 @@ class TestIndexUserActivationPath:
         assert registry.adapters.lookup((IUserBasic,), IIndexView,
                                         name='adhocracy|private_user_activation_path')
 
+class TestIndexUserActive:
+
+    def call_fut(self, *args):
+        from .adhocracy import index_user_active
+        return index_user_active(*args)
+
+    def test_return_user_active(self, context):
+        context.active = False
+        assert self.call_fut(context, 'default') is False
+
+    def test_return_default_if_no_active_attribute(self, context):
+        assert self.call_fut(context, 'default') == 'default'
+
+    @mark.usefixtures('integration')
+    def test_register(self, registry):
+        from adhocracy_core.sheets.principal import IUserBasic
+        from substanced.interfaces import IIndexView
+        assert registry.adapters.lookup((IUserBasic,), IIndexView,
+                                        name='adhocracy|private_user_active')
+
+
 class TestIndexServiceKontoUserid:
 
     @fixture
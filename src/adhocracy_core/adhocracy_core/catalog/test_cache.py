@@ -0,0 +1,76 @@
+from pytest import fixture
+from pytest import mark
+
+
+class TestSearchResultCache:
+
+    @fixture
+    def mock_statsd_incr(self, mocker):
+        return mocker.patch('adhocracy_core.catalog.cache.statsd_incr')
+
+    def make_one(self, **kwargs):
+        from .cache import SearchResultCache
+        return SearchResultCache(**kwargs)
+
+    def test_create(self):
+        inst = self.make_one()
+        assert inst.size == 1000
+        assert len(inst) == 0
+        assert inst.hit_ratio == 0
+
+    def test_get_missing(self, mock_statsd_incr):
+        inst = self.make_one()
+        assert inst.get(('key',)) is None
+        assert inst.misses == 1
+        mock_statsd_incr.assert_called_with('catalog.cache.misses', rate=.1,
+                                            registry=None)
+
+    def test_get_existing(self, mock_statsd_incr):
+        inst = self.make_one()
+        inst.set(('key',), {1})
+        assert inst.get(('key',)) == {1}
+        assert inst.hits == 1
+        mock_statsd_incr.assert_called_with('catalog.cache.hits', rate=.1,
+                                            registry=None)
+
+    def test_hit_ratio(self, mock_statsd_incr):
+        inst = self.make_one()
+        inst.set(('key',), {1})
+        inst.get(('key',))
+        inst.get(('other',))
+        assert inst.hit_ratio == 0.5
+
+    def test_set_drop_least_recently_used(self, mock_statsd_incr):
+        inst = self.make_one(size=2)
+        inst.set(('a',), {1})
+        inst.set(('b',), {2})
+        inst.get(('a',))
+        inst.set(('c',), {3})
+        assert len(inst) == 2
+        assert inst.get(('b',)) is None
+        assert inst.get(('a',)) == {1}
+
+    def test_clear(self):
+        inst = self.make_one()
+        inst.set(('a',), {1})
+        inst.hits = 1
+        inst.clear()
+        assert len(inst) == 0
+        assert inst.hits == 0
+
+
+@mark.usefixtures('integration')
+class TestIncludeme:
+
+    def test_cache_disabled(self, registry):
+        assert registry.search_cache is None
+
+    def test_cache_enabled(self, config):
+        from .cache import SearchResultCache
+        from .cache import includeme
+        settings = config.registry['config'].adhocracy.search_cache
+        settings.enabled = True
+        settings.size = 10
+        includeme(config)
+        assert isinstance(config.registry.search_cache, SearchResultCache)
+        assert config.registry.search_cache.size == 10
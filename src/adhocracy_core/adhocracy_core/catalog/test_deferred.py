@@ -0,0 +1,97 @@
+from unittest.mock import Mock
+from pyramid import testing
+from pytest import fixture
+
+
+class TestReindexQueue:
+
+    @fixture
+    def catalogs(self):
+        return Mock()
+
+    @fixture
+    def resource(self):
+        return testing.DummyResource(__oid__=1)
+
+    @fixture
+    def inst(self):
+        import transaction
+        from .deferred import ReindexQueue
+        transaction.begin()
+        yield ReindexQueue()
+        transaction.abort()
+
+    def test_create(self, inst):
+        assert inst.added == 0
+        assert inst.executed == 0
+        assert inst.saved == 0
+        assert len(inst) == 0
+
+    def test_add(self, inst, catalogs, resource):
+        inst.add(catalogs, resource, 'index')
+        assert len(inst) == 1
+        assert not catalogs.reindex_index.called
+
+    def test_add_reindex_now_if_resource_without_oid(self, inst, catalogs):
+        resource = testing.DummyResource()
+        inst.add(catalogs, resource, 'index')
+        catalogs.reindex_index.assert_called_with(resource, 'index')
+        assert len(inst) == 0
+
+    def test_add_ignore_duplicates(self, inst, catalogs, resource):
+        inst.add(catalogs, resource, 'index')
+        inst.add(catalogs, resource, 'index')
+        inst.add(catalogs, resource, 'other')
+        assert len(inst) == 2
+        assert inst.added == 3
+
+    def test_flush(self, inst, catalogs, resource):
+        inst.add(catalogs, resource, 'index')
+        inst.add(catalogs, resource, 'index')
+        inst.flush()
+        catalogs.reindex_index.assert_called_once_with(resource, 'index')
+        assert len(inst) == 0
+        assert inst.executed == 1
+        assert inst.saved == 1
+
+    def test_flush_ignore_resources_removed_from_objectmap(
+            self, inst, catalogs, resource, mock_objectmap):
+        catalogs.__objectmap__ = mock_objectmap
+        mock_objectmap.object_for.return_value = None
+        inst.add(catalogs, resource, 'index')
+        inst.flush()
+        assert not catalogs.reindex_index.called
+        assert inst.executed == 0
+        assert inst.saved == 0
+
+    def test_flush_before_commit(self, inst, catalogs, resource):
+        import transaction
+        inst.add(catalogs, resource, 'index')
+        transaction.commit()
+        catalogs.reindex_index.assert_called_once_with(resource, 'index')
+
+    def test_drop_jobs_of_aborted_transaction(self, inst, catalogs, resource):
+        import transaction
+        inst.add(catalogs, resource, 'index')
+        transaction.abort()
+        assert len(inst) == 0
+        inst.flush()
+        assert not catalogs.reindex_index.called
+
+    def test_flush_send_statsd_metrics(self, inst, catalogs, resource,
+                                       monkeypatch):
+        from . import deferred
+        mock = Mock()
+        monkeypatch.setattr(deferred, 'statsd_incr', mock)
+        inst.add(catalogs, resource, 'index')
+        inst.add(catalogs, resource, 'index')
+        inst.flush()
+        mock.assert_any_call('catalog.reindex.executed', 1, registry=None)
+        mock.assert_any_call('catalog.reindex.saved', 1, registry=None)
+
+
+def test_includeme(config):
+    from .deferred import ReindexQueue
+    from .deferred import includeme
+    includeme(config)
+    assert isinstance(config.registry.reindex_queue, ReindexQueue)
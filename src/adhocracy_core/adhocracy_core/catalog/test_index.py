@@ -268,3 +268,152 @@ class TestReference:
         inst._search = Mock(side_effect=[result_query, result_query2])
         result = inst.applyAll([query, query2])
         assert list(result) == [2, 3]
+
+    def test_estimate_sources(self, mock_graph, mock_objectmap):
+        from adhocracy_core.interfaces import ISheet
+        from adhocracy_core.interfaces import Reference
+        from adhocracy_core.interfaces import SheetToSheet
+        mock_objectmap.sourceids.return_value = {1, 2}
+        inst = self.make_one()
+        inst._objectmap = mock_objectmap
+        mock_graph.get_reftypes.return_value = [(ISheet, '', SheetToSheet),
+                                                (ISheet, 'x', SheetToSheet)]
+        inst.__graph__ = mock_graph
+        target = testing.DummyResource()
+        query = {'reference': Reference(None, ISheet, '', target)}
+        assert inst.estimate(query) == 4
+        mock_objectmap.sourceids.assert_called_with(target, SheetToSheet)
+
+    def test_estimate_targets_with_field(self, mock_graph, mock_objectmap):
+        from adhocracy_core.interfaces import ISheet
+        from adhocracy_core.interfaces import Reference
+        from adhocracy_core.interfaces import SheetToSheet
+        mock_objectmap.targetids.return_value = {1, 2}
+        inst = self.make_one()
+        inst._objectmap = mock_objectmap
+        mock_graph.get_reftypes.return_value = [(ISheet, '', SheetToSheet),
+                                                (ISheet, 'x', SheetToSheet)]
+        inst.__graph__ = mock_graph
+        source = testing.DummyResource()
+        query = {'reference': Reference(source, ISheet, 'x', None)}
+        assert inst.estimate(query) == 2
+
+
+class TestChildren:
+
+    @fixture
+    def inst(self):
+        from .index import ChildrenIndex
+        return ChildrenIndex()
+
+    @fixture
+    def parent(self):
+        return testing.DummyResource(__oid__=1)
+
+    def _make_child(self, parent, oid, *ifaces):
+        from zope.interface import alsoProvides
+        child = testing.DummyResource(__oid__=oid, __parent__=parent)
+        for iface in ifaces:
+            alsoProvides(child, iface)
+        return child
+
+    def test_create(self, inst):
+        from zope.interface.verify import verifyObject
+        from hypatia.interfaces import IIndex
+        assert IIndex.providedBy(inst)
+        assert verifyObject(IIndex, inst)
+
+    def test_index_doc(self, inst, parent):
+        child = self._make_child(parent, 2)
+        inst.index_doc(2, child)
+        assert list(inst.apply({'parent': parent})) == [2]
+        assert list(inst.indexed()) == [2]
+
+    def test_index_doc_without_parent(self, inst):
+        child = testing.DummyResource()
+        inst.index_doc(2, child)
+        assert list(inst.not_indexed()) == [2]
+        assert list(inst.docids()) == [2]
+
+    def test_unindex_doc(self, inst, parent):
+        from adhocracy_core.interfaces import ISheet
+        child = self._make_child(parent, 2, ISheet)
+        inst.index_doc(2, child)
+        inst.unindex_doc(2)
+        assert list(inst.apply({'parent': parent})) == []
+        assert len(inst._children) == 0
+        assert len(inst._buckets) == 0
+
+    def test_unindex_doc_not_indexed(self, inst):
+        inst.unindex_doc(2)
+
+    def test_reindex_twice_and_unindex_doc(self, inst, parent):
+        child = self._make_child(parent, 2)
+        inst.index_doc(2, child)
+        inst.reindex_doc(2, child)
+        inst.reindex_doc(2, child)
+        inst.unindex_doc(2)
+        assert list(inst.docids()) == []
+        assert len(inst._children) == 0
+
+    def test_reindex_doc_changed_parent(self, inst, parent):
+        other = testing.DummyResource(__oid__=3)
+        child = self._make_child(parent, 2)
+        inst.index_doc(2, child)
+        child.__parent__ = other
+        inst.reindex_doc(2, child)
+        assert list(inst.apply({'parent': parent})) == []
+        assert list(inst.apply({'parent': 3})) == [2]
+
+    def test_apply_with_interfaces(self, inst, parent):
+        from adhocracy_core.interfaces import IPool
+        from adhocracy_core.interfaces import ISimple
+        inst.index_doc(2, self._make_child(parent, 2, IPool))
+        inst.index_doc(3, self._make_child(parent, 3, ISimple))
+        inst.index_doc(4, self._make_child(parent, 4, IPool, ISimple))
+        assert list(inst.apply({'parent': parent,
+                                'interfaces': IPool})) == [2, 4]
+        assert list(inst.apply({'parent': parent,
+                                'interfaces': (IPool, ISimple)})) == [4]
+
+    def test_apply_with_base_interface(self, inst, parent):
+        from adhocracy_core.interfaces import IPool
+        from adhocracy_core.interfaces import IResource
+        inst.index_doc(2, self._make_child(parent, 2, IPool))
+        assert list(inst.apply({'parent': parent,
+                                'interfaces': IResource})) == [2]
+
+    def test_apply_with_depth(self, inst, parent):
+        from adhocracy_core.interfaces import IPool
+        child = self._make_child(parent, 2, IPool)
+        grandchild = self._make_child(child, 3)
+        inst.index_doc(2, child)
+        inst.index_doc(3, grandchild)
+        assert list(inst.apply({'parent': parent, 'depth': 1})) == [2]
+        assert list(inst.apply({'parent': parent, 'depth': 2})) == [2, 3]
+        assert list(inst.apply({'parent': parent, 'depth': None})) == [2, 3]
+        assert list(inst.apply({'parent': parent, 'depth': 2,
+                                'interfaces': IPool})) == [2]
+
+    def test_count(self, inst, parent):
+        child = self._make_child(parent, 2)
+        inst.index_doc(2, child)
+        inst.index_doc(3, self._make_child(child, 3))
+        assert inst.count({'parent': parent, 'depth': 2}) == 1
+
+    def test_estimate_depth1(self, inst, parent):
+        inst.index_doc(2, self._make_child(parent, 2))
+        assert inst.estimate({'parent': parent}) == 1
+
+    def test_estimate_depth1_without_apply(self, inst, parent, monkeypatch):
+        inst.index_doc(2, self._make_child(parent, 2))
+        monkeypatch.setattr(inst, 'apply', None)
+        assert inst.estimate({'parent': parent}) == 1
+        assert inst.estimate({'parent': 5}) == 0
+
+    def test_eq(self, inst, parent):
+        from hypatia.query import Eq
+        query = {'parent': parent}
+        result = inst.eq(query)
+        assert isinstance(result, Eq)
+        assert result._value == query
@@ -12,9 +12,11 @@ def test_create_adhocracy_catalog_indexes():
     from substanced.catalog import Keyword
     from adhocracy_core.catalog.adhocracy import AdhocracyCatalogIndexes
     from adhocracy_core.catalog.adhocracy import Reference
+    from adhocracy_core.catalog.adhocracy import Children
     inst = AdhocracyCatalogIndexes()
     assert isinstance(inst.tag, Keyword)
     assert isinstance(inst.reference, Reference)
+    assert isinstance(inst.children, Children)
 
 
 @mark.usefixtures('integration')
@@ -90,6 +92,19 @@ class TestCatalogsServiceAdhocracy:
                                        parent=parent,
                                        appstructs=appstructs)
 
+    def test_get_index_value_flush_reindex_queue(self, registry, inst,
+                                                 pool):
+        from adhocracy_core.sheets.comment import \
+            deferred_default_comment_count
+        from .deferred import ReindexQueue
+        registry.reindex_queue = ReindexQueue()
+        resource = self._make_resource(registry, parent=pool)
+        index = inst['adhocracy']['comments']
+        index.discriminator = lambda resource, default: 2
+        registry.reindex_queue.add(inst, resource, 'comments')
+        assert deferred_default_comment_count(None, {'context': resource}) == '2'
+        assert len(registry.reindex_queue) == 0
+
     def test_meta(self, meta):
         from substanced.catalog import CatalogsService
         from . import ICatalogsService
@@ -204,6 +219,27 @@ class TestCatalogsServiceAdhocracy:
         assert child in elements
         assert grandchild not in elements
 
+    def test_search_with_root_and_depth_use_children_index(
+            self, registry, pool, inst, query):
+        from adhocracy_core.interfaces import IItemVersion
+        child = self._make_resource(registry, parent=pool)
+        self._make_resource(registry, parent=pool, iresource=IItemVersion)
+        query = query._replace(root=pool, depth=1, interfaces=IPool)
+        steps = inst.explain(query)
+        assert len(steps) == 1
+        assert steps[0]['query'].startswith('children')
+        assert list(inst.search(query).elements) == [child]
+
+    def test_search_with_root_and_depth_and_interfaces_comparator(
+            self, registry, pool, inst, query):
+        from adhocracy_core.interfaces import IItemVersion
+        child = self._make_resource(registry, parent=pool)
+        self._make_resource(registry, parent=pool, iresource=IItemVersion)
+        query = query._replace(root=pool, depth=1,
+                               interfaces=('noteq', IItemVersion))
+        assert len(inst.explain(query)) == 2
+        assert child in inst.search(query).elements
+
     def test_search_with_root_and_depth2(self, registry, pool, inst, query):
         child = self._make_resource(registry, parent=pool)
         grandchild = self._make_resource(registry, parent=child)
@@ -485,6 +521,71 @@ class TestCatalogsServiceAdhocracy:
                                        sort_by='reference',
                                        limit=10))
 
+    def test_search_references(self, registry, pool, inst, query):
+        from adhocracy_core.interfaces import IItem
+        from adhocracy_core.interfaces import Reference
+        from adhocracy_core import sheets
+        referenced1 = self._make_resource(registry, parent=pool)
+        referenced2 = self._make_resource(registry, parent=pool)
+        referencing = self._make_resource(registry, parent=pool,
+                                          iresource=IItem)
+        sheet = registry.content.get_sheet(referencing, sheets.tags.ITags)
+        sheet.set({'FIRST': referenced1,
+                   'LAST': [referenced2, referenced1]})
+        query = query._replace(resolve=True)
+        first = query._replace(references=[
+            Reference(referencing, sheets.tags.ITags, 'FIRST', None)])
+        last = query._replace(references=[
+            Reference(referencing, sheets.tags.ITags, 'LAST', None)],
+            sort_by='reference')
+        back = query._replace(references=[
+            Reference(None, sheets.tags.ITags, 'LAST', referenced1)])
+        inst.search = Mock(spec=inst.search)
+        results = inst.search_references([first, last, back])
+        assert not inst.search.called
+        assert results[0].elements == [referenced1]
+        assert results[1].elements == [referenced2, referenced1]
+        assert results[1].count == 2
+        assert results[2].elements == [referencing]
+
+    def test_search_references_with_filter(self, registry, pool, inst,
+                                           query):
+        from adhocracy_core.interfaces import IItem
+        from adhocracy_core.interfaces import Reference
+        from adhocracy_core import sheets
+        referenced1 = self._make_resource(registry, parent=pool)
+        referenced2 = self._make_resource(registry, parent=pool,
+                                          iresource=IItem)
+        referencing = self._make_resource(registry, parent=pool,
+                                          iresource=IItem)
+        sheet = registry.content.get_sheet(referencing, sheets.tags.ITags)
+        sheet.set({'LAST': [referenced2, referenced1]})
+        reference = Reference(referencing, sheets.tags.ITags, 'LAST', None)
+        query = query._replace(resolve=True, interfaces=IItem,
+                               references=[reference])
+        results = inst.search_references([query])
+        assert results[0].elements == [referenced2]
+
+    def test_search_references_search_if_not_batchable(self, inst, query):
+        from adhocracy_core.interfaces import Reference
+        from adhocracy_core.interfaces import ISheet
+        inst.search = Mock(spec=inst.search)
+        reference = Reference(inst, ISheet, 'field', None)
+        query = query._replace(resolve=True, references=[reference])
+        other = query._replace(only_visible=True)
+        results = inst.search_references([query, other])
+        assert inst.search.call_count == 2
+        assert len(results) == 2
+
+    def test_search_prefetch_resolved_elements(self, registry, pool, inst,
+                                               query):
+        from adhocracy_core.interfaces import IPool
+        child = self._make_resource(registry, parent=pool)
+        child._p_oid = b'1'
+        inst._p_jar = Mock()
+        inst.search(query._replace(interfaces=IPool, resolve=True))
+        inst._p_jar.prefetch.assert_called_with(child)
+
     def test_search_with_group_by(self, registry, pool, inst, query):
         from adhocracy_core.interfaces import IPool
         child = self._make_resource(registry, parent=pool)
@@ -545,6 +646,180 @@ class TestCatalogsServiceAdhocracy:
                                             sort_by='name'))
         assert result.count == 2
 
+    def test_plan_query_most_selective_first(self, registry, pool, inst,
+                                             query):
+        from adhocracy_core.interfaces import IPool
+        from adhocracy_core.interfaces import IItem
+        self._make_resource(registry, parent=pool)
+        self._make_resource(registry, parent=pool)
+        self._make_resource(registry, parent=pool, iresource=IItem)
+        broad = inst.get_index('interfaces').all((IPool,))
+        selective = inst.get_index('interfaces').all((IItem,))
+        plan = inst._plan_query([broad, selective])
+        assert [idx for _, idx in plan] == [selective, broad]
+        assert plan[0][0] < plan[1][0]
+
+    def test_plan_query_allows_last(self, registry, pool, inst, query):
+        from adhocracy_core.interfaces import IPool
+        allows = inst.get_index('allowed').allows(['principal'], 'view')
+        interfaces = inst.get_index('interfaces').all((IPool,))
+        plan = inst._plan_query([allows, interfaces])
+        assert [idx for _, idx in plan] == [interfaces, allows]
+
+    def test_estimate_cardinality_path(self, registry, pool, inst, query):
+        child = self._make_resource(registry, parent=pool)
+        self._make_resource(registry, parent=child)
+        path = inst.get_index('path')
+        depth1 = path.eq(pool, depth=1, include_origin=False)
+        depth_all = path.eq(pool, include_origin=False)
+        # the catalogs service is a child of pool too
+        assert inst._estimate_cardinality(depth1) < \
+            inst._estimate_cardinality(depth_all)
+
+    def test_estimate_cardinality_negation(self, registry, pool, inst, query):
+        from adhocracy_core.interfaces import IPool
+        self._make_resource(registry, parent=pool)
+        index = inst.get_index('interfaces')
+        noteq = index.noteq(IPool)
+        expected = index.indexed_count() + index.not_indexed_count()
+        assert inst._estimate_cardinality(noteq) == expected
+
+    def test_search_probe_broad_queries(self, registry, pool, inst, query):
+        from adhocracy_core.interfaces import IItem
+        from adhocracy_core.interfaces import IResource
+        child = self._make_resource(registry, parent=pool)
+        for x in range(10):
+            self._make_resource(registry, parent=child)
+        item = self._make_resource(registry, parent=pool, iresource=IItem)
+        inst.probe_ratio = 1
+        query = query._replace(root=pool,
+                               interfaces=IResource,
+                               indexes={'tag': 'FIRST'})
+        result = inst.search(query)
+        assert list(result.elements) == [item['VERSION_0000000']]
+        steps = inst.explain(query)
+        assert [s['strategy'] for s in steps] == ['apply', 'probe', 'probe']
+
+    def test_search_probe_respects_depth(self, registry, pool, inst, query):
+        child = self._make_resource(registry, parent=pool)
+        grandchild = self._make_resource(registry, parent=child)
+        inst.probe_ratio = 0
+        query = query._replace(root=pool, depth=1,
+                               indexes={'name': grandchild.__name__})
+        assert list(inst.search(query).elements) == []
+        query = query._replace(depth=2)
+        assert list(inst.search(query).elements) == [grandchild]
+
+    def test_explain(self, registry, pool, inst, query):
+        from adhocracy_core.interfaces import IPool
+        child = self._make_resource(registry, parent=pool)
+        query = query._replace(root=pool, interfaces=IPool)
+        steps = inst.explain(query)
+        assert len(steps) == 2
+        assert steps[0]['strategy'] == 'apply'
+        assert steps[-1]['count'] == 1
+        assert set(steps[0]) == {'query', 'estimate', 'strategy', 'count',
+                                 'time'}
+
+    def test_explain_empty_query(self, registry, pool, inst, query):
+        assert inst.explain(query) == []
+
+    def test_increment_modification_count(self, inst):
+        count = inst.modification_count
+        inst.increment_modification_count()
+        assert inst.modification_count == count + 1
+
+    def test_increment_modification_count_if_resource_added(
+            self, registry, pool, inst):
+        count = inst.modification_count
+        self._make_resource(registry, parent=pool)
+        assert inst.modification_count > count
+
+    def test_reindex_index_increment_modification_count(self, registry, pool,
+                                                         inst):
+        child = self._make_resource(registry, parent=pool)
+        count = inst.modification_count
+        inst.reindex_index(child, 'rate')
+        assert inst.modification_count == count + 1
+
+    @fixture
+    def search_cache(self, registry):
+        from .cache import SearchResultCache
+        registry.search_cache = SearchResultCache()
+        return registry.search_cache
+
+    def test_search_flush_reindex_queue(self, registry, pool, inst, query):
+        registry.reindex_queue = Mock()
+        inst.search(query)
+        assert registry.reindex_queue.flush.called
+
+    def test_search_with_cache(self, registry, pool, inst, query,
+                               search_cache):
+        from adhocracy_core.interfaces import IPool
+        child = self._make_resource(registry, parent=pool)
+        search_cache.clear()
+        query = query._replace(interfaces=IPool)
+        assert list(inst.search(query).elements) == [child]
+        inst._execute_query = Mock()
+        assert list(inst.search(query).elements) == [child]
+        assert not inst._execute_query.called
+        assert search_cache.hits == 1
+
+    def test_search_with_cache_outdated_by_modification(
+            self, registry, pool, inst, query, search_cache):
+        from adhocracy_core.interfaces import IPool
+        child = self._make_resource(registry, parent=pool)
+        query = query._replace(interfaces=IPool)
+        inst.search(query)
+        child2 = self._make_resource(registry, parent=pool)
+        assert list(inst.search(query).elements) == [child, child2]
+
+    def test_search_with_cache_ignore_if_uncommitted_modifications(
+            self, registry, pool, inst, query, search_cache):
+        from adhocracy_core.interfaces import IPool
+        self._make_resource(registry, parent=pool)
+        search_cache.clear()
+        query = query._replace(interfaces=IPool)
+        inst._p_jar = Mock()  # fake persistent object with changes
+        inst._p_changed = True
+        inst.search(query)
+        inst.search(query)
+        assert len(search_cache) == 0
+
+    def test_search_with_cache_apply_allows_after_cache(
+            self, registry, pool, inst, query, search_cache):
+        from adhocracy_core.interfaces import IPool
+        from pyramid.authorization import Allow
+        from adhocracy_core.authorization import set_acl
+        child = self._make_resource(registry, parent=pool)
+        set_acl(pool, [(Allow, 'principal', 'view')], registry)
+        inst['system']['allowed'].reindex_resource(child)
+        search_cache.clear()
+        query = query._replace(interfaces=IPool)
+        result = inst.search(query._replace(allows=(['principal'], 'view')))
+        assert list(result.elements) == [child]
+        result = inst.search(query._replace(allows=(['other'], 'view')))
+        assert list(result.elements) == []
+        assert search_cache.hits == 1
+
+    def test_get_cache_key_replace_resources_with_oid(self, registry, pool,
+                                                      inst, query):
+        from adhocracy_core.interfaces import IPool
+        from adhocracy_core.interfaces import Reference
+        from adhocracy_core.interfaces import ISheet
+        child = self._make_resource(registry, parent=pool)
+        reference = Reference(None, ISheet, 'field', child)
+        key = inst._get_cache_key(query._replace(interfaces=IPool,
+                                                 indexes={'tag': ['LAST']},
+                                                 references=[reference],
+                                                 root=pool))
+        assert hash(key)
+        assert ('oid', child.__oid__) in key[2][2][0]
+
+    def test_get_cache_key_none_if_resource_without_oid(self, inst, query):
+        root = testing.DummyResource()
+        assert inst._get_cache_key(query._replace(root=root)) is None
+
     def test_get_index_value(selfs, registry, inst, mocker):
         context = Mock()
         index = Mock()
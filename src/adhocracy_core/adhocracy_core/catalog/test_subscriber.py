@@ -27,6 +27,30 @@ def event(context):
     return testing.DummyResource(object=context)
 
 
+def test_increment_modification_count(event, catalog):
+    from zope.interface import alsoProvides
+    from . import ICatalogsService
+    from .subscriber import increment_modification_count
+    alsoProvides(catalog, ICatalogsService)
+    catalog.increment_modification_count = Mock()
+    increment_modification_count(event)
+    assert catalog.increment_modification_count.called
+
+
+def test_increment_modification_count_ignore_without_catalogs(pool):
+    from .subscriber import increment_modification_count
+    event = testing.DummyResource(object=pool)
+    increment_modification_count(event)
+
+
+def test_reindex_index_deferred_if_reindex_queue(event, catalog, registry):
+    from .subscriber import reindex_tag
+    registry.reindex_queue = Mock()
+    reindex_tag(event)
+    registry.reindex_queue.add.assert_called_with(catalog, event.object, 'tag')
+    assert not catalog.reindex_index.called
+
+
 def test_reindex_tagged_with_removed_and_added_elements(event, catalog):
     from .subscriber import reindex_tag
     reindex_tag(event)
@@ -64,6 +88,13 @@ def test_reindex_user_activation_path(event, catalog):
                                              'private_user_activation_path')
 
 
+def test_reindex_user_active(event, catalog):
+    from .subscriber import reindex_user_active
+    reindex_user_active(event)
+    catalog.reindex_index.assert_called_with(event.object,
+                                             'private_user_active')
+
+
 def test_reindex_badge_index(event, catalog, mock_sheet, registry_with_content):
     from .subscriber import reindex_badge
     reindex_badge(event)
@@ -228,5 +259,7 @@ def test_register_subscriber(registry):
     assert subscriber.reindex_workflow_state.__name__ in handlers
     assert subscriber.reindex_user_name.__name__ in handlers
     assert subscriber.reindex_user_email.__name__ in handlers
+    assert subscriber.reindex_user_active.__name__ in handlers
     assert subscriber.reindex_comments.__name__ in handlers
 
+    assert subscriber.increment_modification_count.__name__ in handlers
@@ -1,19 +1,84 @@
 """Transaction changelog for resources."""
 from collections import defaultdict
+from collections.abc import MutableMapping
+from threading import Lock
+from threading import local
+
+from pyramid.registry import Registry
 
 from adhocracy_core.interfaces import changelog_meta
 
 
-class Changelog(defaultdict):
+_lock = Lock()
+
+
+class Changelog(MutableMapping):
     """Transaction changelog for resources.
 
     Dictionary with resource path as key and default value
     :class:`ChangelogMetadata`.
+
+    The entries are stored per thread. So one process can handle
+    concurrent requests with multiple threads, every request (and its
+    transaction) has its own changelog.
     """
 
     def __init__(self, default_factory=lambda: changelog_meta):
         """Initialize self."""
-        super().__init__(default_factory)
+        self.default_factory = default_factory
+        self._local = local()
+
+    @property
+    def _entries(self) -> defaultdict:
+        entries = getattr(self._local, 'entries', None)
+        if entries is None:
+            entries = defaultdict(self.default_factory)
+            self._local.entries = entries
+        return entries
+
+    def __getitem__(self, key):
+        return self._entries[key]
+
+    def __setitem__(self, key, value):
+        self._entries[key] = value
+
+    def __delitem__(self, key):
+        del self._entries[key]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Delete all entries of the current thread."""
+        self._entries.clear()
+
+
+class ModificationDate(local):
+    """Shared modification date, stored per thread like :class:`Changelog`.
+
+    See :func:`adhocracy_core.utils.get_modification_date`.
+    """
+
+    value = None
+
+
+def get_changelog(registry: Registry) -> Changelog:
+    """Return the transaction changelog of the current request."""
+    return registry.changelog
+
+
+def get_modification_date_storage(registry: Registry) -> ModificationDate:
+    """Return the shared modification date storage, create if missing."""
+    storage = getattr(registry, 'modification_date', None)
+    if storage is None:
+        with _lock:
+            storage = getattr(registry, 'modification_date', None)
+            if storage is None:
+                storage = registry.modification_date = ModificationDate()
+    return storage
 
 
 def clear_changelog_callback(request):
@@ -33,13 +98,12 @@ def clear_modification_date_callback(request):
 
     The date is set by :func:`adhocracy_utils.get_modification_date`.
     """
-    registry = request.registry
-    if getattr(registry, '__modification_date__',  # pragma: no branch
-               None) is not None:
-        del registry.__modification_date__
+    storage = get_modification_date_storage(request.registry)
+    storage.value = None
 
 
 def includeme(config):
     """Add transaction changelog to the registry and register subscribers."""
     config.registry.changelog = Changelog()
+    config.registry.modification_date = ModificationDate()
     config.include('.subscriber')
@@ -0,0 +1,130 @@
+"""Counters for changed descendants and backreferences of resources.
+
+The counters are used to generate http cache ETags, see
+:func:`adhocracy_core.caching.etag_descendants`.
+Every sheet modification increments the changed descendants counter of
+all parent pools, once per transaction. To not dirty and invalidate the
+parent pools the counters are stored in :class:`ChangeCounters` tables,
+mapping pool oid to :class:`BTrees.Length.Length` counters. Every subtree
+has its own table: the root stores the counters of the pools outside of
+participation processes, every process stores the counters of itself and
+its pools. So new counters of one process do not conflict with other
+processes.
+
+Pools created before have their own `__changed_descendants_counter__`.
+The table counter starts with its value and the maximum of both is
+returned, so the count never decreases.
+"""
+from BTrees.Length import Length
+from persistent import Persistent
+from pyramid.traversal import lineage
+from substanced.util import get_oid
+import BTrees
+
+from adhocracy_core.interfaces import IPool
+from adhocracy_core.interfaces import IResource
+from adhocracy_core.resources.process import IProcess
+
+
+_DESCENDANTS = '__changed_descendants_counter__'
+_BACKREFS = '__changed_backrefs_counter__'
+_TABLE = '__change_counters__'
+
+
+class ChangeCounters(Persistent):
+    """Table with the changed descendants counters of one subtree."""
+
+    family = BTrees.family64
+
+    def __init__(self):
+        """Initialize self."""
+        self.descendants = self.family.IO.BTree()
+
+
+def get_changed_descendants_count(resource: IResource) -> int:
+    """Return the changed descendants count of pool `resource`.
+
+    Return None if `resource` is not a pool.
+    """
+    if not _is_pool(resource):
+        return None
+    counter = _get_counter(resource)
+    count = 0 if counter is None else counter()
+    return max(count, _get_legacy_count(resource))
+
+
+def get_changed_backrefs_count(resource: IResource) -> int:
+    """Return the changed backreferences count of `resource` or None."""
+    counter = getattr(resource, _BACKREFS, None)
+    return None if counter is None else counter()
+
+
+def increment_changed_descendants_count(resource: IResource):
+    """Increment the changed descendants counter of pool `resource`."""
+    if not _is_pool(resource):
+        return
+    counter = _get_counter(resource, create=True)
+    if counter is not None:
+        counter.change(1)
+
+
+def increment_changed_backrefs_count(resource: IResource):
+    """Increment the changed backreferences counter of `resource`."""
+    counter = getattr(resource, _BACKREFS, None)
+    if counter is not None:
+        counter.change(1)
+
+
+def raise_changed_descendants_count(resource: IResource, count: int):
+    """Raise the changed descendants count of pool `resource` to `count`.
+
+    The count is never decreased, this is used to migrate old counters.
+    """
+    counter = _get_counter(resource, create=True)
+    if counter is not None and counter() < count:
+        counter.set(count)
+
+
+def _is_pool(resource) -> bool:
+    return IPool.providedBy(resource) or hasattr(resource, _DESCENDANTS)
+
+
+def _get_legacy_count(resource: IResource) -> int:
+    counter = getattr(resource, _DESCENDANTS, None)
+    return 0 if counter is None else counter()
+
+
+def _get_counter(resource: IResource, create=False) -> Length:
+    """Return the table counter of `resource`.
+
+    Resources without oid are not persistent yet, the legacy counter is
+    used instead.
+    """
+    oid = get_oid(resource, None)
+    if oid is None:
+        return getattr(resource, _DESCENDANTS, None)
+    table = _get_table(resource, create=create)
+    if table is None:
+        return None
+    counter = table.get(oid)
+    if counter is None and create:
+        counter = table[oid] = Length(_get_legacy_count(resource))
+    return counter
+
+
+def _get_table(resource: IResource, create=False):
+    subtree = _get_subtree(resource)
+    counters = getattr(subtree, _TABLE, None)
+    if counters is None:
+        if not create:
+            return None
+        counters = ChangeCounters()
+        setattr(subtree, _TABLE, counters)
+    return counters.descendants
+
+
+def _get_subtree(resource: IResource) -> IResource:
+    for location in lineage(resource):
+        is_root = getattr(location, '__parent__', None) is None
+        if is_root or IProcess.providedBy(location):
+            return location
@@ -5,6 +5,11 @@ from pyramid.traversal import find_interface, resource_path
 from pyramid.threadlocal import get_current_registry
 from substanced.event import ACLModified
 
+from adhocracy_core.changelog import get_changelog
+from adhocracy_core.changelog.counters import \
+    increment_changed_backrefs_count
+from adhocracy_core.changelog.counters import \
+    increment_changed_descendants_count
 from adhocracy_core.interfaces import IItem
 from adhocracy_core.interfaces import IResource
 from adhocracy_core.interfaces import IResourceWillBeDeleted
@@ -54,17 +59,11 @@ def _add_changed_descendants_to_all_parents(registry, resource):
         changed_descendants_is_changed = _add_changelog(
             registry, parent, key='changed_descendants', value=True)
         if changed_descendants_is_changed:
-            _increment_changed_descendants_counter(parent)
+            increment_changed_descendants_count(parent)
         else:
             break
 
 
-def _increment_changed_descendants_counter(context):
-    counter = getattr(context, '__changed_descendants_counter__', None)
-    if counter is not None:  # pragma: no branch
-        counter.change(1)
-
-
 def add_changelog_backrefs(event):
     """Add changed_backrefs message to the transaction_changelog."""
     _add_changelog_backrefs_for_resource(event.object, event.registry)
@@ -76,16 +75,10 @@ def _add_changelog_backrefs_for_resource(resource: IResource,
                                                   key='changed_backrefs',
                                                   value=True)
     if changed_backrefs_is_modified:
-        _increment_changed_backrefs_counter(resource)
+        increment_changed_backrefs_count(resource)
     _add_changed_descendants_to_all_parents(registry, resource)
 
 
-def _increment_changed_backrefs_counter(context):
-    counter = getattr(context, '__changed_backrefs_counter__', None)
-    if counter is not None:  # pragma: no branch
-        counter.change(1)
-
-
 def add_changelog_followed(event):
     """Add new `followed_by` and `last_version` to transaction_changelog."""
     if event.new_version is None:
@@ -103,7 +96,7 @@ def _add_changelog(registry: Registry, resource: IResource, key: str,
 
     Return: True if new metadata value was added else False (no value change)
     """
-    changelog = registry.changelog
+    changelog = get_changelog(registry)
     path = resource_path(resource)
     metadata = changelog[path]
     old_value = getattr(metadata, key)
@@ -0,0 +1,131 @@
+from pyramid import testing
+from pytest import fixture
+
+
+@fixture
+def root(pool):
+    pool.__oid__ = 1
+    return pool
+
+
+@fixture
+def process(root):
+    from adhocracy_core.resources.process import IProcess
+    process = testing.DummyResource(__provides__=IProcess, __oid__=2)
+    root['process'] = process
+    return process
+
+
+@fixture
+def child(process):
+    from adhocracy_core.interfaces import IPool
+    child = testing.DummyResource(__provides__=IPool, __oid__=3)
+    process['child'] = child
+    return child
+
+
+@fixture
+def resource(root, context):
+    context.__oid__ = 4
+    root['resource'] = context
+    return context
+
+
+class TestChangedDescendantsCount:
+
+    def test_get_count_default(self, child):
+        from .counters import get_changed_descendants_count
+        assert get_changed_descendants_count(child) == 0
+
+    def test_get_count_none_if_not_pool(self, resource):
+        from .counters import get_changed_descendants_count
+        assert get_changed_descendants_count(resource) is None
+
+    def test_increment(self, root, process, child):
+        from .counters import get_changed_descendants_count
+        from .counters import increment_changed_descendants_count
+        increment_changed_descendants_count(child)
+        increment_changed_descendants_count(child)
+        assert get_changed_descendants_count(child) == 2
+        assert get_changed_descendants_count(process) == 0
+        assert get_changed_descendants_count(root) == 0
+
+    def test_increment_store_counter_in_process_table(self, process, child):
+        from .counters import increment_changed_descendants_count
+        increment_changed_descendants_count(child)
+        increment_changed_descendants_count(process)
+        assert process.__change_counters__.descendants[3]() == 1
+        assert process.__change_counters__.descendants[2]() == 1
+        assert not hasattr(child, '__changed_descendants_counter__')
+
+    def test_increment_store_counter_in_root_table(self, root):
+        from adhocracy_core.interfaces import IPool
+        from .counters import increment_changed_descendants_count
+        root['organisation'] = testing.DummyResource(__provides__=IPool,
+                                                     __oid__=5)
+        increment_changed_descendants_count(root['organisation'])
+        assert root.__change_counters__.descendants[5]() == 1
+
+    def test_increment_ignore_if_not_pool(self, root, resource):
+        from .counters import increment_changed_descendants_count
+        increment_changed_descendants_count(resource)
+        assert not hasattr(root, '__change_counters__')
+
+    def test_increment_continue_legacy_counter(self, child):
+        from BTrees.Length import Length
+        from .counters import get_changed_descendants_count
+        from .counters import increment_changed_descendants_count
+        child.__changed_descendants_counter__ = Length(5)
+        assert get_changed_descendants_count(child) == 5
+        increment_changed_descendants_count(child)
+        assert get_changed_descendants_count(child) == 6
+        assert child.__changed_descendants_counter__() == 5
+
+    def test_get_count_never_lower_than_legacy_counter(self, child):
+        from BTrees.Length import Length
+        from .counters import get_changed_descendants_count
+        from .counters import increment_changed_descendants_count
+        increment_changed_descendants_count(child)
+        child.__changed_descendants_counter__ = Length(5)
+        assert get_changed_descendants_count(child) == 5
+
+    def test_use_legacy_counter_without_oid(self, pool):
+        from BTrees.Length import Length
+        from .counters import get_changed_descendants_count
+        from .counters import increment_changed_descendants_count
+        pool.__changed_descendants_counter__ = Length()
+        increment_changed_descendants_count(pool)
+        assert get_changed_descendants_count(pool) == 1
+
+    def test_raise_count(self, child):
+        from .counters import get_changed_descendants_count
+        from .counters import raise_changed_descendants_count
+        raise_changed_descendants_count(child, 3)
+        assert get_changed_descendants_count(child) == 3
+        raise_changed_descendants_count(child, 2)
+        assert get_changed_descendants_count(child) == 3
+
+
+class TestChangedBackrefsCount:
+
+    def test_get_count(self, resource):
+        from BTrees.Length import Length
+        from .counters import get_changed_backrefs_count
+        resource.__changed_backrefs_counter__ = Length(2)
+        assert get_changed_backrefs_count(resource) == 2
+
+    def test_get_count_none_without_counter(self, resource):
+        from .counters import get_changed_backrefs_count
+        assert get_changed_backrefs_count(resource) is None
+
+    def test_increment(self, resource):
+        from BTrees.Length import Length
+        from .counters import increment_changed_backrefs_count
+        resource.__changed_backrefs_counter__ = Length()
+        increment_changed_backrefs_count(resource)
+        assert resource.__changed_backrefs_counter__() == 1
+
+    def test_increment_ignore_without_counter(self, resource):
+        from .counters import increment_changed_backrefs_count
+        increment_changed_backrefs_count(resource)
+        assert not hasattr(resource, '__changed_backrefs_counter__')
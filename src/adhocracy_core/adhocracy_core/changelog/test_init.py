@@ -22,12 +22,92 @@ def request_(registry):
     return request
 
 
+def test_changelog_set_and_delete():
+    from . import Changelog
+    inst = Changelog()
+    inst['/path/'] = 1
+    assert dict(inst) == {'/path/': 1}
+    del inst['/path/']
+    assert len(inst) == 0
+
+
+def test_changelog_entries_are_thread_local():
+    from threading import Thread
+    from . import Changelog
+    inst = Changelog()
+    inst['/main/'] = 1
+    thread_entries = []
+
+    def write():
+        inst['/thread/'] = 2
+        thread_entries.append(dict(inst))
+        inst.clear()
+
+    thread = Thread(target=write)
+    thread.start()
+    thread.join()
+    assert thread_entries == [{'/thread/': 2}]
+    assert dict(inst) == {'/main/': 1}
+
+
+@mark.usefixtures('integration')
+def test_changelog_parallel_writers(registry, context):
+    """Concurrent requests don't see the changelog of other requests."""
+    from threading import Barrier
+    from threading import Thread
+    from adhocracy_core.utils import get_modification_date
+    from . import clear_changelog_callback
+    from . import clear_modification_date_callback
+    from . import get_changelog
+    threads_count = 8
+    barrier = Barrier(threads_count)
+    results = {}
+    request = testing.DummyRequest(registry=registry)
+
+    def write(number):
+        changelog = get_changelog(registry)
+        path = '/{0}'.format(number)
+        barrier.wait()
+        for x in range(100):
+            changelog[path] = changelog[path]._replace(resource=x)
+        date = get_modification_date(registry)
+        barrier.wait()
+        results[number] = (dict(changelog), date,
+                           get_modification_date(registry))
+        clear_changelog_callback(request)
+        clear_modification_date_callback(request)
+
+    threads = [Thread(target=write, args=(x,)) for x in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for number, (entries, date, date_again) in results.items():
+        assert list(entries) == ['/{0}'.format(number)]
+        assert entries['/{0}'.format(number)].resource == 99
+        assert date is date_again
+    dates = [date for entries, date, date_again in results.values()]
+    assert len(set(id(x) for x in dates)) == threads_count
+
+
 @mark.usefixtures('integration')
 def test_includeme_add_changelog(registry):
     from . import Changelog
     assert isinstance(registry.changelog, Changelog)
 
 
+@mark.usefixtures('integration')
+def test_includeme_add_modification_date(registry):
+    from . import ModificationDate
+    assert isinstance(registry.modification_date, ModificationDate)
+
+
+def test_get_changelog(registry):
+    from . import get_changelog
+    registry.changelog = {}
+    assert get_changelog(registry) is registry.changelog
+
+
 @mark.usefixtures('integration')
 def test_clear_changelog(context, registry, request_, changelog):
     from . import clear_changelog_callback
@@ -1,6 +1,8 @@
 """Create resources, get sheets/metadata, permission checks."""
+from collections import namedtuple
 from functools import lru_cache
 
+from pyramid.interfaces import IApplicationCreated
 from pyramid.request import Request
 from pyramid.traversal import resource_path
 from pyramid.util import DottedNameResolver
@@ -28,6 +30,17 @@ from adhocracy_core.utils import get_iresource
 resolver = DottedNameResolver()
 
 
+OptionsSkeleton = namedtuple('OptionsSkeleton',
+                             ['sheets_read', 'sheets_edit', 'addables'])
+"""Permission independent data to build the OPTIONS response of a resource.
+
+`sheets_read` and `sheets_edit` are tuples of
+:class:`adhocracy_core.interfaces.SheetMetadata`, `addables` is a tuple of
+(:class:`adhocracy_core.interfaces.ResourceMetadata`, tuple of creatable
+:class:`adhocracy_core.interfaces.SheetMetadata`).
+"""
+
+
 class ResourceContentRegistry(ContentRegistry):
     """Extend substanced content registry to work with resources."""
 
@@ -56,6 +69,7 @@ class ResourceContentRegistry(ContentRegistry):
         """Dictionary with key workflow name and value
         :class:`substanced.workflow.IWorkflow`.
         """
+        self._sheet_fields = {}
 
     def get_resources_meta_addable(self, context: object,
                                    request: Request) -> [ResourceMetadata]:
@@ -98,6 +112,71 @@ class ResourceContentRegistry(ContentRegistry):
             resources_addables[iresource] = all_addables
         return resources_addables
 
+    @reify
+    def options_skeletons(self) -> {}:
+        """Options skeleton mapping.
+
+        Dictionary with key iresource (`resource type` interface) and value
+        :class:`OptionsSkeleton`. Permissions are not checked, so this
+        is computed only once.
+        """
+        skeletons = {}
+        for iresource in self.resources_meta:
+            skeletons[iresource] = self._create_options_skeleton(iresource)
+        return skeletons
+
+    @reify
+    def dotted_names(self) -> {}:
+        """Dotted name mapping.
+
+        Dictionary with key dotted name and value resource type, sheet or
+        reference type interface. Names do not change after startup, so
+        this is computed only once.
+        """
+        names = {}
+        for iresource in self.resources_meta:
+            names[iresource.__identifier__] = iresource
+        for isheet, sheet_meta in self.sheets_meta.items():
+            names[isheet.__identifier__] = isheet
+            for node in sheet_meta.schema_class().children:
+                reftype = getattr(node, 'reftype', None)
+                if reftype is not None:
+                    names[reftype.__identifier__] = reftype
+        return names
+
+    def resolve(self, dotted: object) -> object:
+        """Resolve `dotted` name, return non string values unchanged.
+
+        Use :attr:`dotted_names`, other names are imported.
+
+        :raise ValueError, ImportError: If `dotted` cannot be resolved.
+        """
+        if not isinstance(dotted, str):
+            return dotted
+        resolved = self.dotted_names.get(dotted, None)
+        if resolved is None:
+            resolved = resolver.resolve(dotted)
+        return resolved
+
+    def _create_options_skeleton(self, iresource) -> OptionsSkeleton:
+        read = tuple(self._get_sheets_meta(iresource, 'readable'))
+        edit = tuple(self._get_sheets_meta(iresource, 'editable'))
+        addables = tuple(
+            (meta, tuple(self._get_sheets_meta(meta.iresource, 'creatable')))
+            for meta in self.resources_meta_addable.get(iresource, []))
+        return OptionsSkeleton(sheets_read=read,
+                               sheets_edit=edit,
+                               addables=addables)
+
+    def get_options_skeleton(self, context: object) -> OptionsSkeleton:
+        """Get :class:`OptionsSkeleton` for the resource type of `context`."""
+        iresource = get_iresource(context)
+        skeleton = self.options_skeletons.get(iresource, None)
+        if skeleton is None:  # resource type added after startup
+            skeleton = self._create_options_skeleton(iresource)
+            self.options_skeletons[iresource] = skeleton
+        return skeleton
+
     @property
     def permissions(self) -> [str]:
         """Set of all permissions defined in the system."""
@@ -275,13 +354,15 @@ class ResourceContentRegistry(ContentRegistry):
         :raise ValueError: If the string is not dotted or it cannot be
             resolved to isheet and field name.
         """
+        if dotted in self._sheet_fields:
+            return self._sheet_fields[dotted]
         if ':' not in dotted:
             raise ValueError(
                 'Not a colon-separated dotted string: {}'.format(dotted))
         name = ''.join(dotted.split(':')[:-1])
         field = dotted.split(':')[-1]
         try:
-            isheet = resolver.resolve(name)
+            isheet = self.resolve(name)
         except ImportError:
             raise ValueError('No such sheet: {}'.format(name))
         if not (IInterface.providedBy(isheet) and isheet.isOrExtends(ISheet)):
@@ -290,7 +371,9 @@ class ResourceContentRegistry(ContentRegistry):
         node = schema.get(field, None)
         if not node:
             raise ValueError('No such field: {}'.format(dotted))
-        return isheet, field, node
+        resolved = isheet, field, node
+        self._sheet_fields[dotted] = resolved
+        return resolved
 
     def get_workflow(self, context: object) -> IWorkflow:
         """Get workflow of `context` or None."""
@@ -340,8 +423,28 @@ def _is_anonymized_and_has_permission(context: object,
     return is_anonymized and has_permission
 
 
+def compute_options_skeletons(event):
+    """Compute the options skeletons when the application is created.
+
+    :param event: this function should be used as a subscriber for the
+                  :class:`pyramid.interfaces.IApplicationCreated` event.
+    """
+    event.app.registry.content.options_skeletons
+
+
+def compute_dotted_names(event):
+    """Compute the dotted name mapping when the application is created.
+
+    :param event: this function should be used as a subscriber for the
+                  :class:`pyramid.interfaces.IApplicationCreated` event.
+    """
+    event.app.registry.content.dotted_names
+
+
 def includeme(config):  # pragma: no cover
     """Add content registry, register substanced content_type decorators."""
     config.registry.content = ResourceContentRegistry(config.registry)
     config.add_directive('add_content_type', add_content_type)
     config.add_directive('add_service_type', add_service_type)
+    config.add_subscriber(compute_options_skeletons, IApplicationCreated)
+    config.add_subscriber(compute_dotted_names, IApplicationCreated)
@@ -0,0 +1,89 @@
+"""Benchmark dotted name resolution of the content registry.
+
+Measure the time to build :attr:`ResourceContentRegistry.dotted_names` at
+startup and the time per call to resolve resource type, sheet and
+reference type names and sheet fields ('<isheet>:<field>'), with and
+without the precomputed mapping. Print the time per call in microseconds.
+"""
+from time import perf_counter
+import argparse
+import inspect
+
+from pyramid.config import Configurator
+from pyramid.util import DottedNameResolver
+
+
+def main(args=None) -> int:  # pragma: no cover
+    """Measure dotted name resolution of the content registry."""
+    docstring = inspect.getdoc(main)
+    parser = argparse.ArgumentParser(description=docstring)
+    parser.add_argument('-r',
+                        '--repeat',
+                        help='number of times to resolve every name',
+                        default=100,
+                        type=int)
+    args = parser.parse_args(args)
+    registry = _make_registry()
+    results = run_benchmark(registry.content, **vars(args))
+    print(format_results(results))
+    return 0
+
+
+def _make_registry():  # pragma: no cover
+    import adhocracy_core
+    settings = {'yaml.location': 'adhocracy_core:defaults.yaml',
+                'env': 'test',
+                }
+    config = Configurator(settings=settings,
+                          root_factory=adhocracy_core.root_factory)
+    config.include(adhocracy_core)
+    config.commit()
+    return config.registry
+
+
+def run_benchmark(content, repeat: int=100) -> [tuple]:  # pragma: no cover
+    """Run the benchmark.
+
+    Return (description, number of names, seconds per call) tuples.
+    """
+    content.__dict__.pop('dotted_names', None)
+    start = perf_counter()
+    names = list(content.dotted_names)
+    build = perf_counter() - start
+    fields = ['{0}:{1}'.format(isheet.__identifier__, node.name)
+              for isheet, meta in content.sheets_meta.items()
+              for node in meta.schema_class().children]
+    resolver = DottedNameResolver()
+    results = [('startup: build dotted names', len(names), build)]
+    results.append(('request: resolve name, import', len(names),
+                    _time(resolver.maybe_resolve, names, repeat)))
+    results.append(('request: resolve name, mapping', len(names),
+                    _time(content.resolve, names, repeat)))
+    resolve_field = content.resolve_isheet_field_from_dotted_string
+
+    def resolve_field_uncached(dotted):
+        content._sheet_fields.clear()
+        return resolve_field(dotted)
+    results.append(('request: resolve sheet field, uncached', len(fields),
+                    _time(resolve_field_uncached, fields, repeat)))
+    results.append(('request: resolve sheet field, cached', len(fields),
+                    _time(resolve_field, fields, repeat)))
+    return results
+
+
+def _time(func: callable, names: list,
+          repeat: int) -> float:  # pragma: no cover
+    """Return mean seconds per `func` call."""
+    start = perf_counter()
+    for x in range(repeat):
+        for name in names:
+            func(name)
+    return (perf_counter() - start) / (repeat * len(names))
+
+
+def format_results(results: [tuple]) -> str:
+    """Return time per call in microseconds."""
+    template = '{0} ({1} names): {2:.1f} us'
+    lines = [template.format(description, count, seconds * 1000000)
+             for description, count, seconds in results]
+    return '\n'.join(lines)
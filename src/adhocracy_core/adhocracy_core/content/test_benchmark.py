@@ -0,0 +1,14 @@
+class TestFormatResults:
+
+    def call_fut(self, *args):
+        from .benchmark import format_results
+        return format_results(*args)
+
+    def test_no_results(self):
+        assert self.call_fut([]) == ''
+
+    def test_results(self):
+        assert self.call_fut([('startup', 10, 0.001),
+                              ('request', 5, 0.0000004)]) == \
+            'startup (10 names): 1000.0 us\n'\
+            'request (5 names): 0.4 us'
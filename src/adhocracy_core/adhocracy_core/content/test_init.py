@@ -261,6 +261,37 @@ class TestResourceContentRegistry:
         config.testing_securitypolicy(userid='hank', permissive=False)
         assert inst.get_resources_meta_addable(context, request_) == []
 
+    def test_options_skeletons(self, inst, resource_meta, sheet_meta):
+        from adhocracy_core.content import OptionsSkeleton
+        simple_meta = deepcopy(resource_meta)._replace(iresource=ISimple)
+        inst.resources_meta[ISimple] = simple_meta
+        inst.resources_meta[IResource] = resource_meta._replace(
+            element_types=(ISimple,))
+        assert inst.options_skeletons[IResource] == OptionsSkeleton(
+            sheets_read=(sheet_meta,),
+            sheets_edit=(sheet_meta,),
+            addables=((simple_meta, (sheet_meta,)),))
+
+    def test_options_skeletons_ignore_disabled_sheets(self, inst, sheet_meta):
+        inst.sheets_meta[ISheet] = sheet_meta._replace(editable=False,
+                                                       readable=False)
+        skeleton = inst.options_skeletons[IResource]
+        assert skeleton.sheets_read == ()
+        assert skeleton.sheets_edit == ()
+
+    def test_get_options_skeleton(self, inst, context):
+        skeleton = inst.get_options_skeleton(context)
+        assert skeleton is inst.options_skeletons[IResource]
+
+    def test_get_options_skeleton_resource_type_added_later(
+            self, inst, resource_meta):
+        inst.options_skeletons
+        inst.resources_meta[ISimple] = resource_meta._replace(
+            iresource=ISimple)
+        context = testing.DummyResource(__provides__=ISimple)
+        skeleton = inst.get_options_skeleton(context)
+        assert skeleton is inst.options_skeletons[ISimple]
+
     def test_permissions_resource_permission_create_defined(
             self, inst, resource_meta, mock_registry):
         simple_meta = resource_meta._replace(
@@ -366,6 +397,45 @@ class TestResourceContentRegistry:
         with raises(ValueError):
             inst.resolve_isheet_field_from_dotted_string(dotted)
 
+    def test_resolve_isheet_field_dotted_string_cached(self, inst,
+                                                       sheet_meta_a):
+        inst.sheets_meta[ISheet] = sheet_meta_a
+        dotted = ISheet.__identifier__ + ':field1'
+        result = inst.resolve_isheet_field_from_dotted_string(dotted)
+        assert inst.resolve_isheet_field_from_dotted_string(dotted) is result
+
+    def test_dotted_names(self, inst, sheet_meta):
+        from adhocracy_core.interfaces import SheetToSheet
+        from adhocracy_core.schema import MappingSchema
+        from adhocracy_core.schema import Reference
+        class AReference(SheetToSheet):
+            pass
+        class ASchema(MappingSchema):
+            ref = Reference(reftype=AReference)
+        inst.sheets_meta[ISheetA] = sheet_meta._replace(isheet=ISheetA,
+                                                        schema_class=ASchema)
+        assert inst.dotted_names == {
+            IResource.__identifier__: IResource,
+            ISheet.__identifier__: ISheet,
+            ISheetA.__identifier__: ISheetA,
+            AReference.__identifier__: AReference,
+        }
+
+    def test_resolve(self, inst):
+        inst.dotted_names['a.b'] = ISheetA
+        assert inst.resolve('a.b') is ISheetA
+
+    def test_resolve_not_registered(self, inst):
+        assert inst.resolve('adhocracy_core.interfaces.IPool').__name__ \
+            == 'IPool'
+
+    def test_resolve_non_string(self, inst):
+        assert inst.resolve(ISheetA) is ISheetA
+
+    def test_resolve_raise_if_no_such_name(self, inst):
+        with raises(ImportError):
+            inst.resolve('adhocracy_core.interfaces.NoSuchInterface')
+
     def test_get_workflow_return_none_if_no_workflow_sheet(self, context,
                                                            inst):
         from adhocracy_core.exceptions import RuntimeConfigurationError
@@ -450,3 +520,19 @@ def integration(config):
 def test_includeme_register_pool_sheet(config):
     from adhocracy_core.content import ResourceContentRegistry
     assert isinstance(config.registry.content, ResourceContentRegistry)
+
+
+@mark.usefixtures('integration')
+def test_includeme_compute_options_skeletons_on_app_created(config):
+    from pyramid.events import ApplicationCreated
+    app = Mock(registry=config.registry)
+    config.registry.notify(ApplicationCreated(app))
+    assert 'options_skeletons' in config.registry.content.__dict__
+
+
+@mark.usefixtures('integration')
+def test_includeme_compute_dotted_names_on_app_created(config):
+    from pyramid.events import ApplicationCreated
+    app = Mock(registry=config.registry)
+    config.registry.notify(ApplicationCreated(app))
+    assert 'dotted_names' in config.registry.content.__dict__
@@ -0,0 +1,220 @@
+"""Dispatch events with a precompiled table of matching subscribers.
+
+Pyramid notifies every subscriber registered for the event interface and
+each of them evaluates its subscriber predicates. The predicates
+`event_isheet` and `object_iface` only depend on the event isheet and the
+interfaces provided by the event object. So the :class:`EventDispatcher`
+evaluates them once per event interfaces, object interfaces and isheet
+and stores the list of matching subscribers. The table is rebuilt if
+subscribers are added or removed.
+
+The dispatcher can count events and measure the time spent in every
+subscriber. The numbers are logged at the end of every request, you
+need to enable this in your settings::
+
+    adhocracy.event_dispatch.instrument = True
+
+"""
+from collections import defaultdict
+from logging import getLogger
+from threading import local
+from time import perf_counter
+
+from pyramid.events import NewRequest
+from pyramid.registry import Registry
+from pyramid.request import Request
+from zope.interface import Interface
+from zope.interface import providedBy
+
+from adhocracy_core.events import _InterfacePredicate
+from adhocracy_core.events import _ISheetPredicate
+
+
+logger = getLogger(__name__)
+
+
+_marker = object()
+
+
+class EventStats(local):
+    """Number of events and time per subscriber, stored per thread."""
+
+    def __init__(self):
+        """Initialize self."""
+        self.clear()
+
+    def clear(self):
+        """Reset all numbers of the current thread."""
+        self.events = defaultdict(int)
+        """Mapping event class name to number of notifications"""
+        self.subscribers = defaultdict(lambda: [0, 0.0])
+        """Mapping subscriber name to number of calls and seconds"""
+
+    def add_event(self, event: object):
+        """Count `event`."""
+        self.events[event.__class__.__name__] += 1
+
+    def add_call(self, subscriber: callable, seconds: float):
+        """Count call of `subscriber` that took `seconds`.
+
+        Nested events are included.
+        """
+        entry = self.subscribers[_get_name(subscriber)]
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def _get_name(subscriber: callable) -> str:
+    func = getattr(subscriber, 'func', subscriber)  # functools.partial
+    name = getattr(func, '__qualname__', None)
+    if name is None:
+        return repr(func)
+    return func.__module__ + '.' + name
+
+
+class EventDispatcher:
+    """Notify subscribers using a precompiled dispatch table.
+
+    Set an instance as `notify` method of the pyramid registry.
+    """
+
+    def __init__(self, registry: Registry, instrument=False):
+        """Initialize self."""
+        self.registry = registry
+        self.stats = EventStats() if instrument else None
+        self._generations = None
+        self._table = {}
+
+    def __call__(self, *events):
+        """Notify subscribers of `events`."""
+        if not self.registry.has_listeners:
+            return
+        if len(events) != 1:  # multi subscriber, no predicates to compile
+            Registry.notify(self.registry, *events)
+            return
+        event = events[0]
+        subscribers = self.get_subscribers(event)
+        if self.stats is None:
+            for subscriber in subscribers:
+                subscriber(event)
+        else:
+            self._notify_instrumented(event, subscribers)
+
+    def _notify_instrumented(self, event, subscribers: list):
+        stats = self.stats
+        stats.add_event(event)
+        for subscriber in subscribers:
+            start = perf_counter()
+            subscriber(event)
+            stats.add_call(subscriber, perf_counter() - start)
+
+    def get_subscribers(self, event) -> list:
+        """Return subscribers to be called with `event`."""
+        table = self._get_table()
+        obj = getattr(event, 'object', _marker)
+        key = (providedBy(event),
+               obj if obj is _marker else providedBy(obj),
+               getattr(event, 'isheet', Interface),
+               )
+        subscribers = table.get(key)
+        if subscribers is None:
+            subscribers = self._compile(*key)
+            table[key] = subscribers
+        return subscribers
+
+    def _get_table(self) -> dict:
+        adapters = self.registry.adapters
+        generations = [r._generation for r in adapters.ro]
+        if generations != self._generations:
+            self._table = {}
+            self._generations = generations
+        return self._table
+
+    def _compile(self, event_iface, object_iface, isheet) -> list:
+        """Return matching subscribers, skip predicates evaluated here."""
+        handlers = self.registry.adapters.subscriptions((event_iface,), None)
+        predicates = self._get_predicates()
+        subscribers = []
+        for handler in handlers:
+            if handler not in predicates:
+                subscribers.append(handler)
+                continue
+            subscriber, handler_predicates = predicates[handler]
+            matches = [self._match(p, object_iface, isheet)
+                       for p in handler_predicates]
+            if False in matches:
+                continue
+            elif None in matches:
+                subscribers.append(handler)  # evaluate predicates later
+            else:
+                subscribers.append(subscriber)
+        return subscribers
+
+    def _get_predicates(self) -> dict:
+        """Map registered handler to subscriber and predicates.
+
+        The pyramid introspector has this information, if introspection
+        is disabled all handlers evaluate their predicates themselves.
+        """
+        introspector = self.registry.introspector
+        predicates = {}
+        for entry in introspector.get_category('subscribers', ()):
+            intr = entry['introspectable']
+            handler = intr.get('derived_subscriber')
+            if handler is None or not intr.get('predicates'):
+                continue
+            predicates[handler] = (intr['subscriber'], intr['predicates'])
+        return predicates
+
+    def _match(self, predicate, object_iface, isheet) -> bool:
+        """Evaluate `predicate`, return None if not possible."""
+        if isinstance(predicate, _ISheetPredicate):
+            return isheet.isOrExtends(predicate.isheet)
+        elif isinstance(predicate, _InterfacePredicate)\
+                and object_iface is not _marker:
+            return object_iface.isOrExtends(predicate.interface)
+        else:
+            return None
+
+
+def log_event_stats(request: Request):
+    """Log number of events and subscriber timings of this request."""
+    stats = request.registry.notify.stats
+    if not stats.events:
+        return
+    events = sum(stats.events.values())
+    subscribers = sorted(stats.subscribers.items(),
+                         key=lambda x: x[1][1],
+                         reverse=True)
+    lines = ['{0} {1}: {2} events'.format(request.method, request.path,
+                                          events)]
+    lines += ['  {0}: {1}'.format(name, count)
+              for name, count in sorted(stats.events.items())]
+    lines += ['  {0}: {1} calls, {2:.2f} ms'.format(name, calls,
+                                                    seconds * 1000)
+              for name, (calls, seconds) in subscribers]
+    logger.info('\n'.join(lines))
+    stats.clear()
+
+
+def add_log_event_stats_callback(event: NewRequest):
+    """Log event stats when the request is finished."""
+    event.request.add_finished_callback(log_event_stats)
+
+
+def includeme(config):
+    """Use the :class:`EventDispatcher` to notify subscribers.
+
+    You can disable this in your settings::
+
+        adhocracy.event_dispatch.enabled = False
+
+    """
+    settings = config.registry['config'].adhocracy.event_dispatch
+    if not settings.enabled:
+        return
+    dispatcher = EventDispatcher(config.registry,
+                                 instrument=settings.instrument)
+    config.registry.notify = dispatcher
+    if settings.instrument:
+        config.add_subscriber(add_log_event_stats_callback, NewRequest)
@@ -0,0 +1,293 @@
+from functools import partial
+from unittest.mock import Mock
+
+from pyramid import testing
+from pytest import fixture
+from pytest import raises
+from zope.interface import Interface
+from zope.interface import implementer
+
+from adhocracy_core.interfaces import IResource
+from adhocracy_core.interfaces import ISheet
+
+
+class IEvent(Interface):
+    pass
+
+
+class ISheetA(ISheet):
+    pass
+
+
+class ISheetB(ISheet):
+    pass
+
+
+class IResourceA(IResource):
+    pass
+
+
+@implementer(IEvent)
+class DummyEvent:
+
+    def __init__(self, object=None, isheet=ISheet):
+        self.object = object
+        self.isheet = isheet
+
+
+@implementer(IEvent)
+class DummyEventWithoutObject:
+    pass
+
+
+@implementer(IResourceA)
+class DummyResourceA:
+    pass
+
+
+def dummy_subscriber(event):
+    pass
+
+
+class TestEventStats:
+
+    @fixture
+    def inst(self):
+        from .dispatch import EventStats
+        return EventStats()
+
+    def test_create(self, inst):
+        assert inst.events == {}
+        assert inst.subscribers == {}
+
+    def test_add_event(self, inst):
+        inst.add_event(DummyEvent())
+        inst.add_event(DummyEvent())
+        assert inst.events == {'DummyEvent': 2}
+
+    def test_add_call(self, inst):
+        inst.add_call(dummy_subscriber, 0.5)
+        inst.add_call(dummy_subscriber, 0.25)
+        name = 'adhocracy_core.events.test_dispatch.dummy_subscriber'
+        assert inst.subscribers == {name: [2, 0.75]}
+
+    def test_add_call_partial(self, inst):
+        inst.add_call(partial(dummy_subscriber), 1)
+        name = 'adhocracy_core.events.test_dispatch.dummy_subscriber'
+        assert name in inst.subscribers
+
+    def test_add_call_without_name(self, inst):
+        subscriber = Mock(spec=[])
+        inst.add_call(subscriber, 1)
+        assert repr(subscriber) in inst.subscribers
+
+    def test_clear(self, inst):
+        inst.add_event(DummyEvent())
+        inst.add_call(dummy_subscriber, 1)
+        inst.clear()
+        assert inst.events == {}
+        assert inst.subscribers == {}
+
+
+class TestEventDispatcher:
+
+    @fixture
+    def config(self, config):
+        config.include('adhocracy_core.events')
+        return config
+
+    @fixture
+    def calls(self) -> list:
+        return []
+
+    @fixture
+    def add_subscriber(self, config, calls):
+        def add_subscriber(name, **predicates):
+            config.add_subscriber(lambda event: calls.append(name), IEvent,
+                                  **predicates)
+        return add_subscriber
+
+    def make_one(self, registry, **kwargs):
+        from .dispatch import EventDispatcher
+        return EventDispatcher(registry, **kwargs)
+
+    @fixture
+    def inst(self, registry):
+        return self.make_one(registry)
+
+    def test_create(self, inst, registry):
+        assert inst.registry is registry
+        assert inst.stats is None
+
+    def test_create_instrumented(self, registry):
+        from .dispatch import EventStats
+        inst = self.make_one(registry, instrument=True)
+        assert isinstance(inst.stats, EventStats)
+
+    def test_call_without_predicates(self, inst, add_subscriber, calls):
+        add_subscriber('a')
+        add_subscriber('b')
+        inst(DummyEvent())
+        assert calls == ['a', 'b']
+
+    def test_call_isheet_predicate(self, inst, add_subscriber, calls):
+        add_subscriber('a', event_isheet=ISheetA)
+        add_subscriber('b', event_isheet=ISheetB)
+        inst(DummyEvent(isheet=ISheetB))
+        inst(DummyEvent(isheet=ISheetA))
+        assert calls == ['b', 'a']
+
+    def test_call_object_iface_predicate(self, inst, add_subscriber, calls):
+        add_subscriber('a', object_iface=IResourceA)
+        add_subscriber('b', object_iface=IResourceA, event_isheet=ISheetA)
+        inst(DummyEvent(object=DummyResourceA(), isheet=ISheetA))
+        inst(DummyEvent(object=object(), isheet=ISheetA))
+        assert calls == ['a', 'b']
+
+    def test_call_event_without_object(self, inst, add_subscriber, calls):
+        add_subscriber('a')
+        add_subscriber('b', object_iface=IResourceA)
+        with raises(AttributeError):  # like pyramid without dispatcher
+            inst(DummyEventWithoutObject())
+        assert calls == ['a']
+
+    def test_call_other_predicates(self, config, inst, add_subscriber,
+                                   calls):
+        class DummyPredicate:
+            def __init__(self, value, config):
+                self.value = value
+
+            def text(self):
+                return 'dummy'
+            phash = text
+
+            def __call__(self, event):
+                return event.isheet is self.value
+        config.add_subscriber_predicate('dummy', DummyPredicate)
+        add_subscriber('a', dummy=ISheetA)
+        inst(DummyEvent(isheet=ISheetA))
+        inst(DummyEvent(isheet=ISheetB))
+        assert calls == ['a']
+
+    def test_call_recompile_if_subscribers_changed(self, inst,
+                                                   add_subscriber, calls):
+        add_subscriber('a', event_isheet=ISheetA)
+        inst(DummyEvent(isheet=ISheetA))
+        add_subscriber('b', event_isheet=ISheetA)
+        inst(DummyEvent(isheet=ISheetA))
+        assert calls == ['a', 'a', 'b']
+
+    def test_call_reuse_compiled_subscribers(self, inst, add_subscriber):
+        add_subscriber('a', event_isheet=ISheetA)
+        event = DummyEvent(isheet=ISheetA)
+        assert inst.get_subscribers(event) is inst.get_subscribers(event)
+
+    def test_call_without_introspection(self, config, inst, calls):
+        config.introspection = False
+        config.add_subscriber(lambda event: calls.append('a'), IEvent,
+                              event_isheet=ISheetA)
+        inst(DummyEvent(isheet=ISheetA))
+        inst(DummyEvent(isheet=ISheetB))
+        assert calls == ['a']
+
+    def test_call_multiple_events(self, config, inst, calls):
+        config.add_subscriber(lambda *args: calls.append(args),
+                              [IEvent, IResourceA])
+        event = DummyEvent()
+        resource = DummyResourceA()
+        inst(event, resource)
+        assert calls == [(event, resource)]
+
+    def test_call_without_listeners(self, inst, registry, add_subscriber,
+                                    calls):
+        add_subscriber('a')
+        registry.has_listeners = False
+        inst(DummyEvent())
+        assert calls == []
+
+    def test_call_instrumented(self, registry, add_subscriber, calls):
+        inst = self.make_one(registry, instrument=True)
+        add_subscriber('a', event_isheet=ISheetA)
+        inst(DummyEvent(isheet=ISheetA))
+        inst(DummyEvent(isheet=ISheetB))
+        assert calls == ['a']
+        assert inst.stats.events == {'DummyEvent': 2}
+        [(calls, seconds)] = inst.stats.subscribers.values()
+        assert calls == 1
+        assert seconds >= 0
+
+
+class TestLogEventStats:
+
+    @fixture
+    def request_(self, registry):
+        from .dispatch import EventDispatcher
+        registry.notify = EventDispatcher(registry, instrument=True)
+        request = testing.DummyRequest(registry=registry, path='/path')
+        return request
+
+    def call_fut(self, *args):
+        from .dispatch import log_event_stats
+        return log_event_stats(*args)
+
+    @fixture
+    def mock_logger(self, monkeypatch):
+        from . import dispatch
+        mock_logger = Mock()
+        monkeypatch.setattr(dispatch, 'logger', mock_logger)
+        return mock_logger
+
+    def test_ignore_if_no_events(self, request_, mock_logger):
+        self.call_fut(request_)
+        assert not mock_logger.info.called
+
+    def test_log_and_clear_stats(self, request_, mock_logger):
+        stats = request_.registry.notify.stats
+        stats.add_event(DummyEvent())
+        stats.add_call(dummy_subscriber, 0.002)
+        self.call_fut(request_)
+        message = mock_logger.info.call_args[0][0]
+        assert message == \
+            'GET /path: 1 events\n'\
+            '  DummyEvent: 1\n'\
+            '  adhocracy_core.events.test_dispatch.dummy_subscriber: 1 calls,'\
+            ' 2.00 ms'
+        assert stats.events == {}
+
+
+def test_add_log_event_stats_callback():
+    from .dispatch import add_log_event_stats_callback
+    from .dispatch import log_event_stats
+    event = Mock()
+    add_log_event_stats_callback(event)
+    event.request.add_finished_callback.assert_called_with(log_event_stats)
+
+
+class TestIncludeme:
+
+    def test_set_event_dispatcher(self, config):
+        from .dispatch import EventDispatcher
+        config.include('adhocracy_core.events.dispatch')
+        assert isinstance(config.registry.notify, EventDispatcher)
+        assert config.registry.notify.stats is None
+
+    def test_set_instrumented_event_dispatcher(self, config):
+        from pyramid.events import NewRequest
+        from zope.interface import implementedBy
+        from .dispatch import add_log_event_stats_callback
+        settings = config.registry['config'].adhocracy.event_dispatch
+        settings.instrument = True
+        config.include('adhocracy_core.events.dispatch')
+        assert config.registry.notify.stats is not None
+        handlers = config.registry.adapters.subscriptions(
+            (implementedBy(NewRequest),), None)
+        assert add_log_event_stats_callback in [h.__wrapped__
+                                                for h in handlers]
+
+    def test_ignore_if_disabled(self, config):
+        from pyramid.registry import Registry
+        settings = config.registry['config'].adhocracy.event_dispatch
+        settings.enabled = False
+        config.include('adhocracy_core.events.dispatch')
+        assert 'notify' not in config.registry.__dict__
+        assert config.registry.notify.__func__ is Registry.notify
@@ -6,6 +6,7 @@ from BTrees.Length import Length
 from persistent.mapping import PersistentMapping
 from pyramid.registry import Registry
 from pyramid.threadlocal import get_current_registry
+from pyramid.traversal import resource_path
 from substanced.evolution import add_evolution_step
 from substanced.interfaces import IFolder
 from substanced.util import find_service
@@ -36,6 +37,9 @@ from adhocracy_core.resources.process import IProcess
 from adhocracy_core.resources.proposal import IProposal
 from adhocracy_core.resources.proposal import IProposalVersion
 from adhocracy_core.resources.relation import add_relationsservice
+from adhocracy_core.sheets import ANNOTATIONS_KEY
+from adhocracy_core.sheets import AnnotationRessourceSheet
+from adhocracy_core.sheets import SharedSheetData
 from adhocracy_core.sheets.asset import IHasAssetPool
 from adhocracy_core.sheets.badge import IBadgeable
 from adhocracy_core.sheets.badge import IHasBadgesPool
@@ -49,6 +53,7 @@ from adhocracy_core.sheets.principal import IUserExtended
 from adhocracy_core.sheets.relation import ICanPolarize
 from adhocracy_core.sheets.relation import IPolarizable
 from adhocracy_core.sheets.title import ITitle
+from adhocracy_core.sheets.versions import IVersionable
 from adhocracy_core.sheets.workflow import IWorkflowAssignment
 from adhocracy_core.workflows import update_workflow_state_acls
 
@@ -67,13 +72,31 @@ def migrate_to_attribute_storage(context: IPool, isheet: IInterface):
     logger.info('Migrating {0} resources with {1} to attribute storage'
                 .format(count, isheet))
     for index, resource in enumerate(resources):
-        data = resource.__dict__
-        if annotation_key in data:
+        data = _pop_sheet_annotation_data(resource, annotation_key)
+        if data is not None:
             logger.info('Migrating resource {0} of {1}'
                         .format(index + 1, count))
-            for field, value in data[annotation_key].items():
+            for field, value in data.items():
                 setattr(resource, field, value)
-            delattr(resource, annotation_key)
+
+
+def _pop_sheet_annotation_data(resource: IResource,
+                               annotation_key: str) -> dict:
+    """Remove and return annotation sheet data, None if there is no data."""
+    annotations = getattr(resource, ANNOTATIONS_KEY, None)
+    if annotations and annotation_key in annotations:
+        data = annotations.pop(annotation_key)
+        if isinstance(data, SharedSheetData):
+            data = dict(data.data)
+        if not annotations:
+            delattr(resource, ANNOTATIONS_KEY)
+        resource._p_changed = True
+        return data
+    if annotation_key in resource.__dict__:
+        data = getattr(resource, annotation_key)
+        delattr(resource, annotation_key)
+        return data
+    return None
 
 
 def migrate_new_sheet(context: IPool,
@@ -991,6 +1014,137 @@ def add_service_konto_settings_sheet_to_user(root,
     migrate_new_sheet(root, IUser, IServiceKontoSettings)
 
 
+@log_migration
+def add_children_index(root, registry):  # pragma: no cover
+    """Add children index and index all resources."""
+    from substanced.util import find_objectmap
+    catalogs = find_service(root, 'catalogs')
+    catalog = catalogs['adhocracy']
+    catalog.update_indexes(registry=registry)
+    index = catalog['children']
+    objectmap = find_objectmap(root)
+    for oid in catalog.objectids:
+        resource = objectmap.object_for(oid)
+        if resource is not None:
+            index.reindex_resource(resource, oid=oid)
+
+
+@log_migration
+def add_user_active_index(root, registry):  # pragma: no cover
+    """Add private_user_active index and index all users."""
+    from adhocracy_core.sheets.principal import IUserBasic
+    catalogs = find_service(root, 'catalogs')
+    catalog = catalogs['adhocracy']
+    catalog.update_indexes(registry=registry)
+    index = catalog['private_user_active']
+    for user in _search_for_interfaces(catalogs, IUserBasic):
+        index.reindex_resource(user)
+
+
+@log_migration
+def pack_sheet_annotation_data(root, registry):  # pragma: no cover
+    """Move sheet annotation data to one dictionary per resource.
+
+    Every `_sheet_<isheet>` attribute is a separate database object,
+    store the data of all annotation sheets in the resource record instead.
+    """
+    catalogs = find_service(root, 'catalogs')
+    resources = _search_for_interfaces(catalogs, IResource)
+    count = len(resources)
+    for index, resource in enumerate(resources):
+        if pack_annotation_data(resource):
+            logger.info('Migrated resource {0} of {1}'
+                        .format(index + 1, count))
+
+
+def pack_annotation_data(resource: IResource) -> bool:
+    """Move `_sheet_<isheet>` attributes to the annotation dictionary.
+
+    :returns: True if `resource` was modified.
+    """
+    annotations = getattr(resource, ANNOTATIONS_KEY, None) or {}
+    keys = [k for k in resource.__dict__ if k.startswith('_sheet_')]
+    if not keys:
+        return False
+    for key in keys:
+        annotations.setdefault(key, dict(getattr(resource, key)))
+        delattr(resource, key)
+    setattr(resource, ANNOTATIONS_KEY, annotations)
+    resource._p_changed = True
+    return True
+
+
+@log_migration
+def share_version_sheet_data(root, registry):  # pragma: no cover
+    """Share unchanged annotation sheet data of item versions.
+
+    See :meth:`adhocracy_core.sheets.AnnotationRessourceSheet.share_data`.
+    """
+    catalogs = find_service(root, 'catalogs')
+    versions = _search_for_interfaces(catalogs, IItemVersion)
+    versions = sorted(versions, key=resource_path)  # oldest versions first
+    count = len(versions)
+    for index, version in enumerate(versions):
+        if share_unchanged_sheet_data(version, registry):
+            logger.info('Migrated version {0} of {1}'
+                        .format(index + 1, count))
+
+
+def share_unchanged_sheet_data(version: IItemVersion,
+                               registry: Registry) -> bool:
+    """Share annotation sheet data that equals the preceding version data.
+
+    :returns: True if data is shared.
+    """
+    follows = registry.content.get_sheet_field(version, IVersionable,
+                                               'follows')
+    if len(follows) != 1:
+        return False
+    shared = False
+    for sheet in registry.content.get_sheets_all(version):
+        if not isinstance(sheet, AnnotationRessourceSheet):
+            continue
+        appstruct = sheet.get(add_back_references=False)
+        shared = sheet.share_data(follows[0], appstruct) or shared
+    return shared
+
+
+@log_migration
+def move_change_counters_to_subtrees(root, registry):  # pragma: no cover
+    """Move changed descendants counters to the table of their subtree.
+
+    Databases evolved with the removed `add_change_counters_to_root` step
+    store the counters of all pools and resources in one root table.
+    Process pools get their own tables now and the changed backreferences
+    counters are stored in the resources again. Counts are never decreased.
+    """
+    from BTrees.Length import Length
+    from substanced.util import find_objectmap
+    from adhocracy_core.changelog.counters import \
+        raise_changed_descendants_count
+    counters = getattr(root, '__change_counters__', None)
+    if counters is None:
+        return
+    objectmap = find_objectmap(root)
+    backrefs = getattr(counters, 'backrefs', {})
+    for oid, counter in backrefs.items():
+        resource = objectmap.object_for(oid)
+        if resource is None:
+            continue
+        legacy = getattr(resource, '__changed_backrefs_counter__', None)
+        if legacy is None:
+            resource.__changed_backrefs_counter__ = Length(counter())
+        elif legacy() < counter():
+            legacy.set(counter())
+    if hasattr(counters, 'backrefs'):
+        del counters.backrefs
+    for oid, counter in list(counters.descendants.items()):
+        del counters.descendants[oid]
+        resource = objectmap.object_for(oid)
+        if resource is not None:
+            raise_changed_descendants_count(resource, counter())
+
+
 def includeme(config):  # pragma: no cover
     """Register evolution utilities and add evolution steps."""
     config.add_directive('add_evolution_step', add_evolution_step)
@@ -1058,3 +1212,8 @@ def includeme(config):  # pragma: no cover
     config.add_evolution_step(add_activity_service_to_root)
     config.add_evolution_step(add_service_konto_sheet_to_user)
     config.add_evolution_step(add_service_konto_settings_sheet_to_user)
+    config.add_evolution_step(add_children_index)
+    config.add_evolution_step(pack_sheet_annotation_data)
+    config.add_evolution_step(share_version_sheet_data)
+    config.add_evolution_step(add_user_active_index)
+    config.add_evolution_step(move_change_counters_to_subtrees)
@@ -309,3 +309,108 @@ class TestMigrateToAttributeStorageSheet:
         self.call_fut(context, ISheet)
         assert not hasattr(context, annotation_key)
 
+    def test_mv_packed_annotation_sheet_data_to_attribute_storage(
+            self, context, registry, mock_catalogs, search_result,
+            mock_sheet):
+        from adhocracy_core.sheets import ANNOTATIONS_KEY
+        mock_catalogs.search.return_value = search_result._replace(
+            elements=[context])
+        annotation_key = '_sheet_' + mock_sheet.meta.isheet \
+            .__identifier__.replace('.', '_')
+        setattr(context, ANNOTATIONS_KEY,
+                {annotation_key: {'field1': 'value'}})
+        self.call_fut(context, ISheet)
+        assert context.field1 == 'value'
+        assert not hasattr(context, ANNOTATIONS_KEY)
+
+
+    def test_mv_shared_annotation_sheet_data_to_attribute_storage(
+            self, context, registry, mock_catalogs, search_result,
+            mock_sheet):
+        from adhocracy_core.sheets import ANNOTATIONS_KEY
+        from adhocracy_core.sheets import SharedSheetData
+        mock_catalogs.search.return_value = search_result._replace(
+            elements=[context])
+        annotation_key = '_sheet_' + mock_sheet.meta.isheet \
+            .__identifier__.replace('.', '_')
+        setattr(context, ANNOTATIONS_KEY,
+                {annotation_key: SharedSheetData({'field1': 'value'})})
+        self.call_fut(context, ISheet)
+        assert context.field1 == 'value'
+
+
+class TestPackAnnotationData:
+
+    def call_fut(self, *args):
+        from . import pack_annotation_data
+        return pack_annotation_data(*args)
+
+    def test_ignore_if_no_annotation_data(self, context):
+        from adhocracy_core.sheets import ANNOTATIONS_KEY
+        assert self.call_fut(context) is False
+        assert not hasattr(context, ANNOTATIONS_KEY)
+
+    def test_move_annotation_data(self, context):
+        from adhocracy_core.sheets import ANNOTATIONS_KEY
+        context._sheet_a = {'field': 1}
+        context._sheet_b = {'field': 2}
+        assert self.call_fut(context) is True
+        assert getattr(context, ANNOTATIONS_KEY) == {'_sheet_a': {'field': 1},
+                                                     '_sheet_b': {'field': 2}}
+        assert not hasattr(context, '_sheet_a')
+
+    def test_keep_existing_packed_data(self, context):
+        from adhocracy_core.sheets import ANNOTATIONS_KEY
+        setattr(context, ANNOTATIONS_KEY, {'_sheet_a': {'field': 'new'}})
+        context._sheet_a = {'field': 'old'}
+        self.call_fut(context)
+        assert getattr(context, ANNOTATIONS_KEY) == {'_sheet_a':
+                                                     {'field': 'new'}}
+
+
+class TestShareUnchangedSheetData:
+
+    @fixture
+    def registry(self, registry_with_content):
+        return registry_with_content
+
+    @fixture
+    def follows(self):
+        return testing.DummyResource()
+
+    @fixture
+    def versionable_sheet(self, registry, mock_sheet):
+        registry.content.get_sheet.return_value = mock_sheet
+        return mock_sheet
+
+    @fixture
+    def data_sheet(self):
+        from adhocracy_core.sheets import AnnotationRessourceSheet
+        sheet = Mock(spec=AnnotationRessourceSheet)
+        sheet.get.return_value = {'field': 1}
+        sheet.share_data.return_value = True
+        return sheet
+
+    def call_fut(self, *args):
+        from . import share_unchanged_sheet_data
+        return share_unchanged_sheet_data(*args)
+
+    def test_ignore_if_not_one_preceding_version(self, context, registry,
+                                                 versionable_sheet):
+        versionable_sheet.get.return_value = {'follows': []}
+        assert self.call_fut(context, registry) is False
+        assert not registry.content.get_sheets_all.called
+
+    def test_share_annotation_sheet_data(self, context, registry, follows,
+                                         versionable_sheet, data_sheet):
+        versionable_sheet.get.return_value = {'follows': [follows]}
+        registry.content.get_sheets_all.return_value = [data_sheet]
+        assert self.call_fut(context, registry) is True
+        data_sheet.share_data.assert_called_with(follows, {'field': 1})
+
+    def test_ignore_other_sheets(self, context, registry, follows,
+                                 versionable_sheet):
+        versionable_sheet.get.return_value = {'follows': [follows]}
+        registry.content.get_sheets_all.return_value = [versionable_sheet]
+        assert self.call_fut(context, registry) is False
+        assert not versionable_sheet.share_data.called
@@ -44,3 +44,19 @@ class AutoUpdateNoForkAllowedError(NoForkAllowedError):
         super().__init__(resource)
         self.event = event
         """Event causing the auto update process."""
+
+
+class AutoUpdateLimitError(Exception):
+    """Raise when the automatic resource update exceeds the configured limits.
+
+    See :mod:`adhocracy_core.resources.autoupdate` for more information.
+    """
+
+    def __init__(self, resource, limit: str, value: int):
+        """Initialize self."""
+        self.resource = resource
+        """Resource causing the auto update process."""
+        self.limit = limit
+        """Name of the exceeded limit setting."""
+        self.value = value
+        """Value of the exceeded limit."""
@@ -1,5 +1,6 @@
 """Set/Get Resource References / versions graph (DAG) helpers."""
 
+from collections import OrderedDict
 from collections import namedtuple
 from collections.abc import Iterable
 from collections.abc import Iterator
@@ -272,6 +273,37 @@ class Graph(Persistent):
                       if context not in lineage(ref.target)]
         return references
 
+    def get_references_for_bulk_removal_notification(self,
+                                                     resources: [IResource],
+                                                     removed_oids: set,
+                                                     ) -> [Reference]:
+        """Return one reference for every referenced resource and sheet.
+
+        This equals :meth:`get_refernces_for_removal_notificaton` for many
+        `resources`, but every target is resolved only once.
+
+        :param removed_oids: oids of all removed resources and descendants,
+            references to these targets are ignored.
+        """
+        om = self._objectmap
+        if not om:
+            return []
+        reftypes = list(self.get_reftypes())
+        sources = OrderedDict()
+        for source in resources:
+            for isheet, field, reftype in reftypes:
+                for oid in ObjectMap.targetids(om, source, reftype):
+                    if oid in removed_oids:
+                        continue
+                    sources.setdefault((oid, isheet), (source, field))
+        references = []
+        for (oid, isheet), (source, field) in sources.items():
+            target = om.object_for(oid)
+            if target is None:
+                continue
+            references.append(Reference(source, isheet, field, target))
+        return references
+
     def send_back_reference_removal_notificatons(self,
                                                  references: [Reference],
                                                  registry: Registry):
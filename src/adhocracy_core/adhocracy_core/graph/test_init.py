@@ -689,6 +689,37 @@ class TestGraphGetReferncesForRemovalNotificaton:
         assert result == []
 
 
+class TestGraphGetReferencesForBulkRemovalNotification:
+
+    def call_fut(self, objectmap, *args, **kwargs):
+        from adhocracy_core.graph import Graph
+        graph = Graph(objectmap.root)
+        return graph.get_references_for_bulk_removal_notification(*args,
+                                                                   **kwargs)
+
+    def test_no_references(self, context, objectmap):
+        resource = testing.DummyResource()
+        result = self.call_fut(objectmap, [resource], set())
+        assert result == []
+
+    def test_one_reference_per_target(self, context, objectmap):
+        resource, resource2, target = create_dummy_resources(parent=context,
+                                                             count=3)
+        objectmap.connect(resource, target, SheetToSheet)
+        objectmap.connect(resource2, target, SheetToSheet)
+        result = self.call_fut(objectmap, [resource, resource2], set())
+        assert len(result) == 1
+        assert result[0].source == resource
+        assert result[0].target == target
+
+    def test_ignore_removed_targets(self, context, objectmap):
+        resource, resource2 = create_dummy_resources(parent=context, count=2)
+        objectmap.connect(resource, resource2, SheetToSheet)
+        result = self.call_fut(objectmap, [resource],
+                               {resource2.__oid__})
+        assert result == []
+
+
 class TestGraphSendBackReferenceRemovedNotifications:
 
     def call_fut(self, objectmap, *args, **kwargs):
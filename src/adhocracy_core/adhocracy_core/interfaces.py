@@ -270,6 +270,7 @@ class ResourceMetadata(namedtuple('ResourceMetadata',
                                    'use_autonaming',
                                    'autonaming_prefix',
                                    'use_autonaming_random',
+                                   'use_autonaming_concurrent',
                                    'is_sdi_addable',
                                    'sdi_column_mapper',
                                    'element_types',
@@ -310,6 +311,12 @@ class ResourceMetadata(namedtuple('ResourceMetadata',
     use_autonaming_random:
         Use random the name if the new content object is added to the parent.
         You can enable only one, autonaming or random autonaming.
+    use_autonaming_concurrent:
+        Add a process specific suffix to the autogenerated name if the
+        setting `adhocracy.autonaming` is `concurrent`, see
+        :class:`adhocracy_core.resources.pool.Pool`. Use this for resources
+        that are often added to the same pool at the same time.
+        Ignored for item versions.
     is_sdi_addable:
         Make this resource type automatically addable with the substanced
         admin interface (sdi).
@@ -384,10 +391,10 @@ class IPool(IResource):  # pragma: no cover
         :raises ValueError: if 'name' contains '@@', slashes or is empty.
         """
 
-    def next_name(subobject, prefix='') -> str:
+    def next_name(subobject, prefix='', concurrent=False) -> str:
         """Return Name for subobject."""
 
-    def add_next(subobject, prefix='') -> str:
+    def add_next(subobject, prefix='', concurrent=False) -> str:
         """Add new subobject and auto generate name."""
 
     def add_service(service_name: str, other) -> str:
@@ -1058,6 +1065,26 @@ class HTTPCacheMode(Enum):
     """
 
 
+class HTTPCacheKeyMode(Enum):
+    """Key to share cached responses between users.
+
+    You can change the key mode in you pyramid ini file with the
+    `adhocracy.caching_key_mode` setting.
+    """
+
+    userid = 1
+    """Cache responses per user (vary on the user authentication headers)."""
+
+    principals = 2
+    """Cache responses per set of effective principals (groups and roles).
+    Users with the same principals share cached responses.
+    Responses that depend on the user itself are still cached per user,
+    see :func:`adhocracy_core.caching.is_user_specific`.
+    The proxy cache has to set the `X-Principals-Key` request header
+    by calling the `principals_key` view first.
+    """
+
+
 class IHTTPCacheStrategy(Interface):  # pragma: no cover
     """Strategy to set http cache headers."""
 
@@ -1067,6 +1094,9 @@ class IHTTPCacheStrategy(Interface):  # pragma: no cover
     def check_conditional_request():
         """Check if conditional_request and raise 304 Error if needed."""
 
+    def get_etag() -> str:
+        """Return the etag for the response or None."""
+
 
 class IAdhocracyWorkflow(IWorkflow):  # pragma: no cover
     """IAdhocracyWorkflow interface."""
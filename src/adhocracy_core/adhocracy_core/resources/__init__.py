@@ -2,7 +2,6 @@
 import random
 import string
 
-from pyramid.path import DottedNameResolver
 from pyramid.threadlocal import get_current_registry
 from pyramid.config import Configurator
 from pyramid.traversal import find_interface
@@ -23,8 +22,10 @@ from adhocracy_core.interfaces import IResource
 from adhocracy_core.interfaces import IServicePool
 from adhocracy_core.exceptions import ConfigurationError
 from adhocracy_core.events import ResourceCreatedAndAdded
+from adhocracy_core.sheets import AnnotationRessourceSheet
 from adhocracy_core.sheets.name import IName
 from adhocracy_core.sheets.metadata import IMetadata
+from adhocracy_core.sheets.versions import IVersionable
 from adhocracy_core.sheets.workflow import IWorkflowAssignment
 from adhocracy_core.utils import get_modification_date
 
@@ -40,6 +41,7 @@ resource_meta = ResourceMetadata(content_name='',
                                  use_autonaming=False,
                                  autonaming_prefix='',
                                  use_autonaming_random=False,
+                                 use_autonaming_concurrent=False,
                                  is_sdi_addable=False,
                                  sdi_column_mapper=None,
                                  element_types=(),
@@ -112,7 +114,9 @@ class ResourceFactory:
             name = appstructs[self.name_identifier]['name']
         if self.meta.use_autonaming:
             prefix = self.meta.autonaming_prefix
-            name = parent.next_name(resource, prefix=prefix)
+            concurrent = self.meta.use_autonaming_concurrent
+            name = parent.next_name(resource, prefix=prefix,
+                                    concurrent=concurrent)
         elif self.meta.use_autonaming_random:
             name = generate_random_name()
         if name in parent:
@@ -223,11 +227,15 @@ class ResourceFactory:
             elif 'workflow' not in appstructs[assignment]:  # pragma: no branch
                 appstructs[assignment]['workflow'] = default_workflow
 
+        follows = self._get_follows(appstructs)
         for key, struct in appstructs.items():
-            isheet = DottedNameResolver().maybe_resolve(key)
+            isheet = registry.content.resolve(key)
             sheet = registry.content.get_sheet(resource, isheet,
                                                request=request)
             if sheet.meta.creatable:
+                if follows is not None \
+                        and isinstance(sheet, AnnotationRessourceSheet):
+                    sheet.share_data(follows, struct)
                 sheet.set(struct, send_event=False, autoupdated=autoupdated)
 
         from adhocracy_core.resources.principal import IUser  # prevent circles
@@ -261,6 +269,17 @@ class ResourceFactory:
 
         return resource
 
+    def _get_follows(self, appstructs: dict) -> IResource:
+        """Return the preceding version to share unchanged sheet data with.
+
+        Return None if there is no or more than one preceding version.
+        """
+        versionable = appstructs.get(IVersionable.__identifier__, {})
+        follows = versionable.get('follows', [])
+        if len(follows) != 1:
+            return None
+        return follows[0]
+
     def _set_local_role_creator(self,
                                 resource: IResource,
                                 creator: IResource,
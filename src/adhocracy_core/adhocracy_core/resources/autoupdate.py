@@ -0,0 +1,191 @@
+"""Plan automatic updates of resources referencing a new item version.
+
+A new item version notifies all resources referencing the preceding version
+(:class:`adhocracy_core.interfaces.ISheetReferenceNewVersion`), see
+:mod:`adhocracy_core.resources.subscriber`.
+Referencing item versions get a new version too, so one change may cascade
+through documents, proposals and processes.
+
+:func:`plan_autoupdates` computes the resources that will be autoupdated
+without writing anything. To protect the backend against huge cascades you
+can limit the depth and the number of autoupdated resources (fan-out) of one
+change in your settings (0 means no limit)::
+
+    adhocracy.autoupdate.max_depth = 0
+    adhocracy.autoupdate.max_fanout = 0
+
+"""
+from collections import deque
+from collections import namedtuple
+
+from pyramid.registry import Registry
+from pyramid.traversal import find_interface
+from pyramid.traversal import resource_path
+
+from adhocracy_core.exceptions import AutoUpdateLimitError
+from adhocracy_core.interfaces import IItem
+from adhocracy_core.interfaces import IItemVersion
+from adhocracy_core.interfaces import IPool
+from adhocracy_core.interfaces import IResource
+from adhocracy_core.interfaces import ISheetReferenceAutoUpdateMarker
+from adhocracy_core.interfaces import ISimple
+from adhocracy_core.interfaces import SheetToSheet
+from adhocracy_core.sheets.tags import ITags
+from adhocracy_core.utils import find_graph
+
+
+class AutoUpdate(namedtuple('AutoUpdate',
+                            'resource isheet isheet_field depth')):
+    """Autoupdate of one resource.
+
+    Fields:
+    -------
+
+    resource:
+        Resource referencing a version that gets a new version.
+    isheet:
+        Sheet with the reference.
+    isheet_field:
+        Field name with the reference.
+    depth:
+        Number of hops from the changed version.
+    """
+
+
+class AutoUpdatePlan:
+    """Resources that will be autoupdated, ordered by depth."""
+
+    def __init__(self):
+        """Initialize self."""
+        self.updates = []
+        """List of :class:`AutoUpdate`"""
+
+    @property
+    def versions(self) -> [IItemVersion]:
+        """Item versions that get a new version."""
+        return [x.resource for x in self.updates
+                if IItemVersion.providedBy(x.resource)]
+
+    @property
+    def resources(self) -> [IResource]:
+        """Non versionable resources that are modified."""
+        return [x.resource for x in self.updates
+                if not IItemVersion.providedBy(x.resource)]
+
+    @property
+    def depth(self) -> int:
+        """Maximal number of hops from the changed versions."""
+        return max([x.depth for x in self.updates], default=0)
+
+    def to_dict(self) -> dict:
+        """Return json serializable dictionary."""
+        return {'depth': self.depth,
+                'versions': [resource_path(x) for x in self.versions],
+                'resources': [resource_path(x) for x in self.resources],
+                }
+
+
+def plan_autoupdates(versions: [IItemVersion],
+                     registry: Registry,
+                     root_versions: [IItemVersion]=(),
+                     max_depth: int=0,
+                     max_fanout: int=0,
+                     ) -> AutoUpdatePlan:
+    """Return resources that are autoupdated if `versions` get new versions.
+
+    This follows the rules of the autoupdate subscribers but does not
+    modify anything. Versions created in the current (batch) transaction are
+    not taken into account.
+
+    :param root_versions: only resources in the subtree of these versions
+        are autoupdated
+    :param max_depth: maximal number of hops, 0 means no limit
+    :param max_fanout: maximal number of autoupdated resources, 0 means
+        no limit
+    :raises adhocracy_core.exceptions.AutoUpdateLimitError: if a limit is
+        exceeded. The planning stops at this point.
+    """
+    plan = AutoUpdatePlan()
+    if not versions:
+        return plan
+    graph = find_graph(versions[0])
+    subtree = _get_subtree_oids(graph, root_versions) if root_versions \
+        else None
+    seen = set(id(x) for x in versions)
+    queue = deque((x, 0) for x in versions)
+    while queue:
+        old_version, depth = queue.popleft()
+        references = graph.get_back_references(old_version,
+                                               base_reftype=SheetToSheet)
+        for source, isheet, field, target in references:
+            if id(source) in seen:
+                continue
+            if not _is_autoupdated(source, isheet, registry, subtree):
+                continue
+            seen.add(id(source))
+            if max_depth and depth + 1 > max_depth:
+                raise AutoUpdateLimitError(versions[0], 'max_depth',
+                                           max_depth)
+            plan.updates.append(AutoUpdate(source, isheet, field, depth + 1))
+            if max_fanout and len(plan.updates) > max_fanout:
+                raise AutoUpdateLimitError(versions[0], 'max_fanout',
+                                           max_fanout)
+            if IItemVersion.providedBy(source):
+                queue.append((source, depth + 1))
+    return plan
+
+
+def _get_subtree_oids(graph, root_versions: [IItemVersion]) -> set:
+    """Return oids of all resources in the subtree of `root_versions`.
+
+    This equals :meth:`adhocracy_core.graph.Graph.is_in_subtree` but
+    traverses the references only once.
+    """
+    oids = set()
+    stack = list(root_versions)
+    while stack:
+        resource = stack.pop()
+        if resource.__oid__ in oids:
+            continue
+        oids.add(resource.__oid__)
+        references = graph.get_references(resource, base_reftype=SheetToSheet)
+        stack.extend(x.target for x in references)
+    return oids
+
+
+def _is_autoupdated(resource: IResource, isheet, registry: Registry,
+                    subtree: set=None) -> bool:
+    if not isheet.isOrExtends(ISheetReferenceAutoUpdateMarker):
+        return False
+    is_version = IItemVersion.providedBy(resource)
+    if not (is_version or IPool.providedBy(resource)
+            or ISimple.providedBy(resource)):
+        return False
+    if subtree is not None and resource.__oid__ not in subtree:
+        return False
+    sheet = registry.content.get_sheet(resource, isheet)
+    if not sheet.meta.editable:
+        return False
+    if is_version:  # old versions are not forked
+        item = find_interface(resource, IItem)
+        if item is None:
+            return True
+        last = registry.content.get_sheet_field(item, ITags, 'LAST')
+        return last is None or last is resource
+    return True
+
+
+def check_autoupdate_limits(versions: [IItemVersion], registry: Registry,
+                            root_versions: [IItemVersion]=()):
+    """Raise if autoupdates of `versions` exceed the configured limits.
+
+    :raises adhocracy_core.exceptions.AutoUpdateLimitError:
+    """
+    settings = registry['config'].adhocracy.autoupdate
+    if not (settings.max_depth or settings.max_fanout):
+        return
+    plan_autoupdates(versions,
+                     registry,
+                     root_versions=root_versions,
+                     max_depth=settings.max_depth,
+                     max_fanout=settings.max_fanout)
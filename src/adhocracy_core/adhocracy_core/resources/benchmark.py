@@ -0,0 +1,144 @@
+"""Benchmark automatic updates of documents with many paragraphs.
+
+Create a document with many paragraphs in an in-memory database and edit
+the paragraphs one after another. Every new paragraph version makes the
+document create a new version (autoupdate). Print the time and the
+database growth per edit.
+"""
+from time import perf_counter
+import argparse
+import inspect
+import logging
+
+from pyramid.config import Configurator
+from pyramid.scripting import prepare
+import transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+def main(args=None) -> int:  # pragma: no cover
+    """Measure autoupdates of a document with many paragraphs."""
+    docstring = inspect.getdoc(main)
+    parser = argparse.ArgumentParser(description=docstring)
+    parser.add_argument('-p',
+                        '--paragraphs',
+                        help='number of document paragraphs',
+                        default=100,
+                        type=int)
+    parser.add_argument('-e',
+                        '--edits',
+                        help='number of paragraph versions to create',
+                        default=20,
+                        type=int)
+    args = parser.parse_args(args)
+    env = _bootstrap_memory_app()
+    try:
+        durations, sizes = run_benchmark(env['root'], env['registry'],
+                                         **vars(args))
+    finally:
+        env['closer']()
+    print(format_results(durations, sizes))
+    return 0
+
+
+def _bootstrap_memory_app() -> dict:  # pragma: no cover
+    import adhocracy_core
+    settings = {'yaml.location': 'adhocracy_core:defaults.yaml',
+                'env': 'test',
+                }
+    config = Configurator(settings=settings,
+                          root_factory=adhocracy_core.root_factory)
+    config.include(adhocracy_core)
+    app = config.make_wsgi_app()
+    return prepare(registry=app.registry)
+
+
+def run_benchmark(root, registry, paragraphs: int=100,
+                  edits: int=20) -> ([float], [int]):  # pragma: no cover
+    """Run the benchmark.
+
+    Return seconds and database bytes written per edit.
+    """
+    from adhocracy_core.resources.document import IDocument
+    from adhocracy_core.resources.document import IDocumentVersion
+    from adhocracy_core.resources.paragraph import IParagraph
+    from adhocracy_core.resources.paragraph import IParagraphVersion
+    from adhocracy_core.resources.process import IProcess
+    from adhocracy_core.sheets.document import IDocument as IDocumentSheet
+    from adhocracy_core.sheets.document import IParagraph as IParagraphSheet
+    from adhocracy_core.sheets.name import IName
+    from adhocracy_core.sheets.tags import ITags
+    from adhocracy_core.sheets.title import ITitle
+    from adhocracy_core.sheets.versions import IVersionable
+    create = registry.content.create
+    storage = registry._zodb_databases[''].storage
+    process = create(IProcess.__identifier__, root,
+                     appstructs={IName.__identifier__: {'name': 'benchmark'}},
+                     registry=registry)
+    document = create(IDocument.__identifier__, process, registry=registry)
+    versions = []
+    for number in range(paragraphs):
+        paragraph = create(IParagraph.__identifier__, document,
+                           registry=registry)
+        first = paragraph['VERSION_0000000']
+        version = create(IParagraphVersion.__identifier__, paragraph,
+                         appstructs={IParagraphSheet.__identifier__:
+                                     {'text': 'paragraph %i' % number},
+                                     IVersionable.__identifier__:
+                                     {'follows': [first]},
+                                     },
+                         registry=registry)
+        versions.append(version)
+    last = create(IDocumentVersion.__identifier__, document,
+                  appstructs={IDocumentSheet.__identifier__:
+                              {'elements': versions},
+                              ITitle.__identifier__: {'title': 'benchmark'},
+                              IVersionable.__identifier__:
+                              {'follows': [document['VERSION_0000000']]},
+                              },
+                  registry=registry)
+    _commit(registry)
+    logger.info('Created document with %i paragraphs', paragraphs)
+    durations = []
+    sizes = []
+    for number in range(edits):
+        version = versions[number % paragraphs]
+        size = storage.getSize()
+        start = perf_counter()
+        version = create(IParagraphVersion.__identifier__, version.__parent__,
+                         appstructs={IParagraphSheet.__identifier__:
+                                     {'text': 'edit %i' % number},
+                                     IVersionable.__identifier__:
+                                     {'follows': [version]},
+                                     },
+                         root_versions=[last],
+                         registry=registry)
+        _commit(registry)
+        durations.append(perf_counter() - start)
+        sizes.append(storage.getSize() - size)
+        versions[number % paragraphs] = version
+        last = registry.content.get_sheet_field(document, ITags, 'LAST')
+    return durations, sizes
+
+
+def _commit(registry):  # pragma: no cover
+    """Commit and clear the transaction changelog like after a request."""
+    transaction.commit()
+    registry.changelog.clear()
+    registry.modification_date.value = None
+
+
+def format_results(durations: [float], sizes: [int]) -> str:
+    """Return mean and maximal time (milliseconds) and size (bytes)."""
+    count = len(durations)
+    if not count:
+        return 'edits: 0'
+    lines = ['edits: {}'.format(count),
+             'time mean: {0:.1f} ms'.format(sum(durations) / count * 1000),
+             'time max: {0:.1f} ms'.format(max(durations) * 1000),
+             'size mean: {0:.0f} bytes'.format(sum(sizes) / count),
+             'size max: {0} bytes'.format(max(sizes)),
+             ]
+    return '\n'.join(lines)
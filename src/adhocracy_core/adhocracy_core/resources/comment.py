@@ -48,6 +48,7 @@ comment_meta = item_meta._replace(
     item_type=ICommentVersion,
     use_autonaming=True,
     autonaming_prefix='comment_',
+    use_autonaming_concurrent=True,
     permission_create='create_comment',
 )
 
@@ -7,6 +7,7 @@ from adhocracy_core.interfaces import IItemVersion
 from adhocracy_core.interfaces import SheetToSheet
 from adhocracy_core.resources import add_resource_type_to_registry
 from adhocracy_core.resources import resource_meta
+from adhocracy_core.resources.autoupdate import check_autoupdate_limits
 from adhocracy_core.resources.base import Base
 from adhocracy_core.sheets.versions import IVersionable
 from adhocracy_core.utils import find_graph
@@ -49,6 +50,9 @@ def notify_new_itemversion_created(context, registry, options):
         autupdated:
             Flag passed to the creation events
     :return: None
+    :raises adhocracy_core.exceptions.AutoUpdateLimitError: if the
+        autoupdates exceed the configured limits, see
+        :mod:`adhocracy_core.resources.autoupdate`.
 
     """
     new_version = context
@@ -59,6 +63,8 @@ def notify_new_itemversion_created(context, registry, options):
     old_versions = []
     versionable = registry.content.get_sheet(context, IVersionable)
     follows = versionable.get()['follows']
+    if not autoupdated:
+        check_autoupdate_limits(follows, registry, root_versions)
     for old_version in follows:
         old_versions.append(old_version)
         _notify_itemversion_has_new_version(old_version, new_version, registry,
@@ -1,12 +1,23 @@
 """Basic type with children typically to create process structures."""
+from itertools import groupby
+from random import getrandbits
+import logging
+import os
+import threading
+import time
+
 from BTrees.Length import Length
 from pyramid.registry import Registry
 from pyramid.traversal import get_current_registry
 from substanced.folder import Folder
+from substanced.util import find_catalogs
+from substanced.util import find_objectmap
 from substanced.util import find_service
+from substanced.util import get_oid
 from substanced.interfaces import IFolder
 from zope.interface import implementer
 from zope.deprecation import deprecated
+import transaction
 
 import adhocracy_core.sheets.name
 import adhocracy_core.sheets.pool
@@ -15,14 +26,20 @@ import adhocracy_core.sheets.title
 import adhocracy_core.sheets.workflow
 import adhocracy_core.sheets.localroles
 from adhocracy_core.events import ResourceWillBeDeleted
+from adhocracy_core.interfaces import IItemVersion
 from adhocracy_core.interfaces import IPool
+from adhocracy_core.interfaces import IResource
 from adhocracy_core.resources import add_resource_type_to_registry
 from adhocracy_core.resources import resource_meta
 from adhocracy_core.resources.base import Base
+from adhocracy_core.resources.sharding import ShardedBTree
 from adhocracy_core.utils import now
 from adhocracy_core.utils import find_graph
 
 
+logger = logging.getLogger(__name__)
+
+
 class IBasicPool(IPool):
     """Basic Pool."""
 
@@ -37,7 +54,18 @@ class Pool(Base, Folder):
     Custom names are allowed and coexists with the autogenerated names.
 
     The next_name method sequentially increments the last name:
-    ``0000001``, then ``0000002``, and so on.
+    ``0000001``, then ``0000002``, and so on. If the children are stored in
+    a :class:`adhocracy_core.resources.sharding.ShardedBTree` the names are
+    unique but not sequential.
+
+    If the setting `adhocracy.autonaming` is `concurrent` and the resource
+    type opts in (`use_autonaming_concurrent` in
+    :class:`adhocracy_core.interfaces.ResourceMetadata`, e.g. comments and
+    rates) a suffix specific for the current process and thread is
+    appended: ``comment_0000001_3fa2c1``. Concurrent transactions may get
+    the same number, but never the same name, so the BTree conflict
+    resolution can merge their inserts. The names still sort in creation
+    order. Item versions always get sequential names (``VERSION_0000001``).
     """
 
     #  The pool needs to provide IFolder to make substance.util.find_service
@@ -46,12 +74,15 @@ class Pool(Base, Folder):
     _autoname_length = 7
 
     def __init__(self, data=None, family=None):
-        """Counter that should increment if descendants are changed."""
+        """Initialize self.
+
+        Changed descendants are counted in the table of the nearest process
+        or the root, see :mod:`adhocracy_core.changelog.counters`.
+        """
         Folder.__init__(self, data=data, family=family)
         Base.__init__(self)
-        self.__changed_descendants_counter__ = Length()
 
-    def next_name(self, subobject, prefix='') -> str:
+    def next_name(self, subobject, prefix='', concurrent=False) -> str:
         """Generate name to add subobject to the folder.
 
         This method does:
@@ -59,30 +90,37 @@ class Pool(Base, Folder):
             - increment the last generated name associated to the prefix.
             - zero-filling the left hand side of the result with 7 zeros.
             - add prefix to the left hand side if any
+            - add the process specific suffix to the right hand side if
+              `concurrent` is True and the concurrent autonaming is enabled
 
         If the generated Name exists add timestamp to the right side.
 
         """
         number = self._get_next_number(prefix)
         name = prefix + self._zfill(number)
+        if concurrent and not IItemVersion.providedBy(subobject)\
+                and _is_concurrent_autonaming(get_current_registry(self)):
+            name += '_' + _get_autoname_suffix()
         if name in self.data:
             timestamp = now().isoformat()
             name += '_' + timestamp
         return name
 
-    def add_next(self, subobject, prefix=''):
+    def add_next(self, subobject, prefix='', concurrent=False):
         """Add a subobject and name it automatically.
 
         Use the name returned by this folder's ``next_name`` method.
 
         """
-        name = self.next_name(subobject, prefix=prefix)
+        name = self.next_name(subobject, prefix=prefix, concurrent=concurrent)
         return self.add(name, subobject, send_events=False)
 
     def _zfill(self, name):
         return str(int(name)).zfill(self._autoname_length)
 
     def _get_next_number(self, prefix):
+        if isinstance(self.data, ShardedBTree):
+            return self.data.next_number(prefix)
         last = getattr(self, '_autoname_last_' + prefix, None)
         if last is None:
             last = Length()
@@ -117,6 +155,100 @@ class Pool(Base, Folder):
         graph.send_back_reference_removal_notificatons(references, registry)
         return res
 
+    def remove_many(self, names: [str], registry: Registry=None) -> list:
+        """Delete subresources `names` from database in one batch.
+
+        This equals calling :meth:`remove` for every name but the removed
+        subtrees are unindexed together, the catalogs modification count is
+        incremented once and :class:`adhocracy_core.interfaces.
+        ISheetBackReferenceRemoved` is sent only once for every referenced
+        resource and sheet. References to resources removed in this batch are
+        not notified. The substanced folder events are not sent.
+
+        :raises KeyError: if a name is not a valid subresource name
+        """
+        subresources = [self[name] for name in names]
+        registry = registry or get_current_registry(self)
+        graph = find_graph(self)
+        objectmap = find_objectmap(self)
+        removed_oids = set()
+        for subresource in subresources:
+            event = ResourceWillBeDeleted(object=subresource,
+                                          parent=self,
+                                          registry=registry)
+            registry.notify(event)
+            if objectmap is not None \
+                    and get_oid(subresource, None) is not None:
+                removed_oids.update(objectmap.pathlookup(subresource))
+        references = graph.get_references_for_bulk_removal_notification(
+            subresources, removed_oids)
+        for name in names:
+            super().remove(name, registry=registry, send_events=False)
+        self._unindex(removed_oids)
+        graph.send_back_reference_removal_notificatons(references, registry)
+        return subresources
+
+    def _unindex(self, oids: set):
+        from adhocracy_core.catalog import ICatalogsService  # prevent circles
+        catalogs = find_service(self, 'catalogs')
+        if ICatalogsService.providedBy(catalogs):
+            catalogs.increment_modification_count()
+        for catalog in find_catalogs(self):
+            oids_set = catalog.family.IF.Set(oids)
+            for oid in catalog.family.IF.intersection(oids_set,
+                                                      catalog.objectids):
+                catalog.unindex_resource(oid)
+
+
+_autoname_local = threading.local()
+
+
+def _is_concurrent_autonaming(registry: Registry) -> bool:
+    settings = registry.get('config')
+    if settings is None:
+        return False
+    return settings.adhocracy.autonaming == 'concurrent'
+
+
+def _get_autoname_suffix() -> str:
+    """Return random name suffix, unique for the current process and thread.
+
+    The suffix is generated once per thread and regenerated in forked
+    processes.
+    """
+    pid = os.getpid()
+    if getattr(_autoname_local, 'pid', None) != pid:
+        _autoname_local.pid = pid
+        _autoname_local.suffix = '{0:06x}'.format(getrandbits(24))
+    return _autoname_local.suffix
+
+
+def remove_resources(resources: [IResource],
+                     registry: Registry,
+                     chunk_size: int=1000,
+                     commit: bool=False) -> int:
+    """Delete `resources` in chunks with :meth:`Pool.remove_many`.
+
+    :param chunk_size: number of resources to delete per batch
+    :param commit: commit the transaction after every chunk
+    :return: number of deleted resources
+    """
+    total = len(resources)
+    count = 0
+    start = time.time()
+    for offset in range(0, total, chunk_size):
+        chunk = resources[offset:offset + chunk_size]
+        for parent, children in groupby(chunk, key=lambda x: x.__parent__):
+            parent.remove_many([x.__name__ for x in children],
+                               registry=registry)
+        if commit:
+            transaction.commit()
+        count += len(chunk)
+        rate = count / max(time.time() - start, 0.001)
+        logger.info('Deleted {0} of {1} resources ({2:.0f} resources/sec)'
+                    .format(count, total, rate))
+    return count
+
 
 pool_meta = resource_meta._replace(
     iresource=IPool,
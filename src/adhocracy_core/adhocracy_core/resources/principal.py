@@ -1,4 +1,5 @@
 """Principal types (user/group) and helpers to search/get user information."""
+from datetime import timedelta
 from logging import getLogger
 from pytz import timezone
 
@@ -17,9 +18,11 @@ from substanced.stats import statsd_timer
 from zope.interface import Attribute
 from zope.interface import Interface
 from zope.interface import implementer
+from zope.interface.interfaces import IInterface
 
 from adhocracy_core.authorization import set_acl
 from adhocracy_core.authentication import is_marked_anonymize
+from adhocracy_core.interfaces import FieldComparator
 from adhocracy_core.interfaces import IPool
 from adhocracy_core.interfaces import IServicePool
 from adhocracy_core.interfaces import IResource
@@ -29,17 +32,19 @@ from adhocracy_core.resources import add_resource_type_to_registry
 from adhocracy_core.resources import resource_meta
 from adhocracy_core.resources.pool import Pool
 from adhocracy_core.resources.pool import pool_meta
+from adhocracy_core.resources.pool import remove_resources
 from adhocracy_core.resources.service import service_meta
+from adhocracy_core.resources.sharding import shard_users_service
 from adhocracy_core.resources.base import Base
 from adhocracy_core.resources.badge import add_badge_assignments_service
 from adhocracy_core.resources.badge import add_badges_service
 from adhocracy_core.resources.asset import add_assets_service
 from adhocracy_core.sheets.metadata import IMetadata
-from adhocracy_core.sheets.metadata import is_older_than
 from adhocracy_core.sheets.principal import IEmailNew
 from adhocracy_core.sheets.principal import IUserBasic
 from adhocracy_core.sheets.principal import IUserExtended
 from adhocracy_core.sheets.principal import IPasswordAuthentication
+from adhocracy_core.utils import now
 import adhocracy_core.sheets.metadata
 import adhocracy_core.sheets.principal
 import adhocracy_core.sheets.pool
@@ -258,7 +263,8 @@ users_meta = service_meta._replace(
     element_types=(IUser,),
     permission_create='create_service',
     extended_sheets=(adhocracy_core.sheets.asset.IHasAssetPool,),
-    after_creation=(add_badge_assignments_service,
+    after_creation=(shard_users_service,
+                    add_badge_assignments_service,
                     add_assets_service,
                     allow_create_asset_authenticated,
                     ),
@@ -527,29 +533,57 @@ def groups_and_roles_finder(userid: str, request: Request) -> list:
         return principals
 
 
-def delete_not_activated_users(request: Request, age_in_days: int):
-    """Delete not activate users that are older than `age_in_days`."""
-    userlocator = request.registry.getMultiAdapter((request.context,
-                                                    request),
-                                                   IRolesUserLocator)
-    users = userlocator.get_users()
-    not_activated = (u for u in users if not u.active)
-    expired = [u for u in not_activated if is_older_than(u, age_in_days)]
+def delete_not_activated_users(request: Request, age_in_days: int,
+                               chunk_size: int=1000,
+                               commit: bool=False) -> int:
+    """Delete not activate users that are older than `age_in_days`.
+
+    :param chunk_size: number of users to delete per batch
+    :param commit: commit the transaction after every chunk
+    :return: number of deleted users
+    """
+    expired = _search_older_than(request.root, IUser, age_in_days,
+                                 indexes={'private_user_active': False})
     for user in expired:
         msg = 'deleting user {0}: name {1} email {2}'.format(user,
                                                              user.email,
                                                              user.name)
         logger.info(msg)
-        user.__parent__.remove(user.__name__, registry=request.registry)
+    return remove_resources(expired, request.registry,
+                            chunk_size=chunk_size,
+                            commit=commit)
+
+
+def delete_password_resets(request: Request, age_in_days: int,
+                           chunk_size: int=1000,
+                           commit: bool=False) -> int:
+    """Delete password resets that are older than `age_in_days`.
+
+    :param chunk_size: number of resets to delete per batch
+    :param commit: commit the transaction after every chunk
+    :return: number of deleted resets
+    """
+    expired = _search_older_than(request.root, IPasswordReset, age_in_days)
+    logger.info('deleting {0} password resets'.format(len(expired)))
+    return remove_resources(expired, request.registry,
+                            chunk_size=chunk_size,
+                            commit=commit)
 
 
-def delete_password_resets(request: Request, age_in_days: int):
-    """Delete password resets that are older than `age_in_days`."""
-    resets = find_service(request.root, 'principals', 'resets')
-    expired = [u for u in resets.values() if is_older_than(u, age_in_days)]
-    for reset in expired:
-        logger.info('deleting reset {0}'.format(reset))
-        resets.remove(reset.__name__, registry=request.registry)
+def _search_older_than(root: IResource, iresource: IInterface,
+                       age_in_days: int, indexes: dict=None) -> [IResource]:
+    """Search resources created more than `age_in_days` ago.
+
+    This matches :func:`adhocracy_core.sheets.metadata.is_older_than`.
+    """
+    max_date = now() - timedelta(days=age_in_days + 1)
+    indexes = dict(indexes or {})
+    indexes['item_creation_date'] = (FieldComparator.le.value, max_date)
+    query = search_query._replace(interfaces=iresource,
+                                  indexes=indexes,
+                                  resolve=True)
+    catalogs = find_service(root, 'catalogs')
+    return catalogs.search(query).elements
 
 
 def includeme(config):
@@ -34,6 +34,7 @@ rate_meta = item_meta._replace(
     item_type=IRateVersion,
     use_autonaming=True,
     autonaming_prefix='rate_',
+    use_autonaming_concurrent=True,
     permission_create='create_rate',
 )
 
@@ -0,0 +1,150 @@
+"""Benchmark concurrent user registrations.
+
+Register users with multiple threads, every thread uses its own database
+connection and commits after every user. Print the number of write
+conflicts and the classes of the conflicting objects. Compare the results
+with and without sharded users service, see
+:mod:`adhocracy_core.resources.sharding`.
+
+The database is a temporary file storage, the in-memory storage
+does not resolve conflicts.
+"""
+from collections import Counter
+from threading import Lock
+from threading import Thread
+import argparse
+import inspect
+import os
+import tempfile
+
+from pyramid.config import Configurator
+from pyramid.scripting import prepare
+from pyramid.threadlocal import manager
+from substanced.util import find_service
+from ZODB.POSException import ConflictError
+import transaction
+
+
+def main(args=None) -> int:  # pragma: no cover
+    """Measure write conflicts of concurrent user registrations."""
+    docstring = inspect.getdoc(main)
+    parser = argparse.ArgumentParser(description=docstring)
+    parser.add_argument('-t',
+                        '--threads',
+                        help='number of concurrent registrations',
+                        default=8,
+                        type=int)
+    parser.add_argument('-u',
+                        '--users',
+                        help='number of users to register per thread',
+                        default=20,
+                        type=int)
+    parser.add_argument('-s',
+                        '--shards',
+                        help='number of users service shards, 0 means no '
+                             'sharding',
+                        default=0,
+                        type=int)
+    args = parser.parse_args(args)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = _bootstrap_file_app(os.path.join(tmp_dir, 'Data.fs'),
+                                  args.shards)
+        registry = env['registry']
+        try:
+            registrations, conflicts = run_benchmark(registry,
+                                                     args.threads,
+                                                     args.users)
+        finally:
+            env['closer']()
+            registry._zodb_databases[''].close()
+    print(format_results(registrations, conflicts))
+    return 0
+
+
+def _bootstrap_file_app(path: str, shards: int) -> dict:  # pragma: no cover
+    from ZODB import DB
+    from ZODB.FileStorage import FileStorage
+    import adhocracy_core
+    settings = {'yaml.location': 'adhocracy_core:defaults.yaml',
+                'env': 'test',
+                }
+    config = Configurator(settings=settings,
+                          root_factory=adhocracy_core.root_factory)
+    config.include(adhocracy_core)
+    config.registry._zodb_databases[''] = DB(FileStorage(path))
+    config.registry['config'].adhocracy.users_shards = shards
+    app = config.make_wsgi_app()
+    env = prepare(registry=app.registry)
+    transaction.commit()
+    return env
+
+
+def run_benchmark(registry, threads: int=8,
+                  users: int=20) -> (int, Counter):  # pragma: no cover
+    """Run the benchmark.
+
+    Return the number of registrations and the number of conflicts per
+    class name of the conflicting object.
+    """
+    db = registry._zodb_databases['']
+    conflicts = Counter()
+    lock = Lock()
+    workers = [Thread(target=_register_users,
+                      args=(db, registry, number, users, conflicts, lock))
+               for number in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * users, conflicts
+
+
+def _register_users(db, registry, thread: int, count: int,
+                    conflicts: Counter, lock: Lock):  # pragma: no cover
+    from adhocracy_core.resources.principal import IUser
+    from adhocracy_core.sheets.principal import IPasswordAuthentication
+    from adhocracy_core.sheets.principal import IUserBasic
+    from adhocracy_core.sheets.principal import IUserExtended
+    manager.push({'registry': registry, 'request': None})
+    connection = db.open()
+    try:
+        for number in range(count):
+            name = 'user_{0}_{1}'.format(thread, number)
+            while True:
+                root = connection.root()['app_root']
+                users = find_service(root, 'principals', 'users')
+                appstructs = {IUserBasic.__identifier__: {'name': name},
+                              IUserExtended.__identifier__:
+                              {'email': name + '@example.org'},
+                              IPasswordAuthentication.__identifier__:
+                              {'password': 'password'},
+                              }
+                try:
+                    registry.content.create(IUser.__identifier__, users,
+                                            appstructs=appstructs,
+                                            registry=registry)
+                    transaction.commit()
+                    break
+                except ConflictError as error:
+                    transaction.abort()
+                    with lock:
+                        conflicts[error.class_name] += 1
+                finally:
+                    registry.changelog.clear()
+                    registry.modification_date.value = None
+    finally:
+        connection.close()
+        manager.pop()
+
+
+def format_results(registrations: int, conflicts: Counter) -> str:
+    """Return conflict rate and the conflicting classes."""
+    total = sum(conflicts.values())
+    rate = total / registrations if registrations else 0
+    lines = ['registrations: {}'.format(registrations),
+             'conflicts: {}'.format(total),
+             'conflicts per registration: {0:.2f}'.format(rate),
+             ]
+    for class_name, count in conflicts.most_common():
+        lines.append('  {0}: {1}'.format(class_name, count))
+    return '\n'.join(lines)
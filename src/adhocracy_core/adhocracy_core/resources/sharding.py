@@ -0,0 +1,167 @@
+"""Spread the children of a pool across multiple BTrees.
+
+All users are children of the users service. Concurrent registrations
+increment the same autoname counter and add sequential names to the same
+folder BTree buckets, which causes write conflicts. :class:`ShardedBTree`
+can replace the folder data of such a pool: every child is stored in one of
+`shards` BTrees, chosen by the hash of its name, and every shard has its own
+autoname counter. The names, :term:`userid` and paths do not change.
+
+The autoname numbers are taken from the counter of a random shard, so
+generated names are unique but not in creation order. Use the
+`item_creation_date` index to list children by creation date.
+:meth:`ShardedBTree.keys`, `values` and `items` merge the sorted shards
+lazily, so iterating a sharded pool still yields names in sorted order.
+
+To shard the users service of new databases set in your settings::
+
+    adhocracy.users_shards = 16
+
+To shard an existing users service run `ad_shard_users`.
+"""
+from collections.abc import Iterator
+from heapq import merge
+from operator import itemgetter
+from random import randrange
+from zlib import crc32
+
+from BTrees.Length import Length
+from persistent import Persistent
+import BTrees
+
+
+class ShardedBTree(Persistent):
+    """Mapping with the BTree API used by folders, stored in `shards`."""
+
+    family = BTrees.family64
+
+    def __init__(self, data: dict=None, shards: int=16, family=None):
+        """Initialize self."""
+        if family is not None:
+            self.family = family
+        self._shards = tuple(self.family.OO.BTree() for x in range(shards))
+        self._counters = self.family.OO.BTree()
+        for name, value in (data or {}).items():
+            self[name] = value
+
+    @property
+    def shards(self) -> int:
+        """Return the number of shards."""
+        return len(self._shards)
+
+    def get_shard(self, name: str) -> int:
+        """Return the shard number for `name`.
+
+        Numeric names are distributed round robin, so names generated by
+        :meth:`next_number` end up in the shard of their counter.
+        """
+        if name.isdigit():
+            return int(name) % self.shards
+        return crc32(name.encode()) % self.shards
+
+    def _get_tree(self, name: str):
+        return self._shards[self.get_shard(name)]
+
+    def __getitem__(self, name: str):
+        return self._get_tree(name)[name]
+
+    def get(self, name: str, default=None):
+        """Return value for `name` or `default`."""
+        return self._get_tree(name).get(name, default)
+
+    def __contains__(self, name) -> bool:
+        return name in self._get_tree(name)
+
+    def __setitem__(self, name: str, value):
+        self._get_tree(name)[name] = value
+
+    def __delitem__(self, name: str):
+        del self._get_tree(name)[name]
+
+    def __len__(self) -> int:
+        return sum(len(x) for x in self._shards)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self, min=None, max=None, excludemin=False,
+             excludemax=False) -> Iterator:
+        """Iterate names of all shards sorted by name.
+
+        The arguments limit the names like :meth:`BTrees.OOBTree.keys`.
+        """
+        ranges = dict(min=min, max=max, excludemin=excludemin,
+                      excludemax=excludemax)
+        return merge(*(tree.keys(**ranges) for tree in self._shards))
+
+    def values(self, min=None, max=None, excludemin=False,
+               excludemax=False) -> Iterator:
+        """Iterate values sorted by name."""
+        items = self.items(min=min, max=max, excludemin=excludemin,
+                           excludemax=excludemax)
+        return (value for name, value in items)
+
+    def items(self, min=None, max=None, excludemin=False,
+              excludemax=False) -> Iterator:
+        """Iterate (name, value) tuples sorted by name."""
+        ranges = dict(min=min, max=max, excludemin=excludemin,
+                      excludemax=excludemax)
+        return merge(*(tree.items(**ranges) for tree in self._shards),
+                     key=itemgetter(0))
+
+    def next_number(self, prefix: str='') -> int:
+        """Return the next autoname number for `prefix`.
+
+        The number is taken from the counter of a random shard, so
+        concurrent transactions most likely increment different counters.
+        Numbers are unique but not sequential.
+        """
+        shard = randrange(self.shards)
+        counter = self._get_counter(prefix, shard)
+        number = counter() * self.shards + shard
+        counter.change(1)
+        return number
+
+    def set_next_number(self, prefix: str, number: int):
+        """Make :meth:`next_number` return numbers >= `number`."""
+        start = -(-number // self.shards)  # round up
+        for shard in range(self.shards):
+            counter = self._get_counter(prefix, shard)
+            counter.set(max(counter(), start))
+
+    def _get_counter(self, prefix: str, shard: int) -> Length:
+        key = (prefix, shard)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = Length()
+            self._counters[key] = counter
+        return counter
+
+
+def shard_pool(pool, shards: int=16):
+    """Move the children of `pool` to a :class:`ShardedBTree`.
+
+    The autoname counters of the pool are taken over, so new names never
+    collide with names generated before.
+    """
+    data = pool.data
+    if isinstance(data, ShardedBTree):
+        return
+    sharded = ShardedBTree(data=data, shards=shards, family=pool.family)
+    counter_prefix = '_autoname_last_'
+    for attr, counter in list(pool.__dict__.items()):
+        if not attr.startswith(counter_prefix):
+            continue
+        prefix = attr[len(counter_prefix):]
+        sharded.set_next_number(prefix, counter())
+    numbers = [int(x) for x in sharded.keys() if x.isdigit()]
+    if numbers:
+        sharded.set_next_number('', max(numbers) + 1)
+    pool.data = sharded
+
+
+def shard_users_service(context, registry, options: dict):
+    """Shard the users service if `adhocracy.users_shards` is set."""
+    shards = registry['config'].adhocracy.users_shards
+    if shards:
+        shard_pool(context, shards)
@@ -0,0 +1,155 @@
+"""Benchmark database loads to read the sheet data of resources.
+
+Create proposal versions in an in-memory database and read the stored data
+of all annotation sheets with an empty connection cache. Compare the legacy
+storage (one `_sheet_<isheet>` database object per sheet) with the data of
+all sheets in one dictionary of the resource record, see
+:class:`adhocracy_core.sheets.AnnotationRessourceSheet`. Print the database
+loads and the number of objects in the connection cache per resource.
+"""
+import argparse
+import inspect
+import logging
+
+from persistent.mapping import PersistentMapping
+from pyramid.config import Configurator
+from pyramid.scripting import prepare
+import transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+def main(args=None) -> int:  # pragma: no cover
+    """Measure database loads to read the sheet data of resources."""
+    docstring = inspect.getdoc(main)
+    parser = argparse.ArgumentParser(description=docstring)
+    parser.add_argument('-r',
+                        '--resources',
+                        help='number of proposal versions to read',
+                        default=100,
+                        type=int)
+    args = parser.parse_args(args)
+    env = _bootstrap_memory_app()
+    try:
+        results = run_benchmark(env['root'], env['registry'],
+                                **vars(args))
+    finally:
+        env['closer']()
+    print(format_results(results))
+    return 0
+
+
+def _bootstrap_memory_app() -> dict:  # pragma: no cover
+    import adhocracy_core
+    settings = {'yaml.location': 'adhocracy_core:defaults.yaml',
+                'env': 'test',
+                }
+    config = Configurator(settings=settings,
+                          root_factory=adhocracy_core.root_factory)
+    config.include(adhocracy_core)
+    app = config.make_wsgi_app()
+    return prepare(registry=app.registry)
+
+
+def run_benchmark(root, registry,
+                  resources: int=100) -> [tuple]:  # pragma: no cover
+    """Run the benchmark.
+
+    Return (storage, resources, loads, cached objects) tuples for the
+    legacy and the packed storage.
+    """
+    from adhocracy_core.evolution import pack_annotation_data
+    versions = _create_versions(root, registry, resources)
+    for version in versions:
+        unpack_annotation_data(version)
+    transaction.commit()
+    results = [('legacy',) + _read_sheets(versions, registry)]
+    for version in versions:
+        pack_annotation_data(version)
+    transaction.commit()
+    results.append(('packed',) + _read_sheets(versions, registry))
+    return results
+
+
+def _create_versions(root, registry, count: int) -> list:  # pragma: no cover
+    from adhocracy_core.resources.process import IProcess
+    from adhocracy_core.resources.proposal import IProposal
+    from adhocracy_core.resources.proposal import IProposalVersion
+    from adhocracy_core.sheets.description import IDescription
+    from adhocracy_core.sheets.name import IName
+    from adhocracy_core.sheets.title import ITitle
+    from adhocracy_core.sheets.versions import IVersionable
+    create = registry.content.create
+    process = create(IProcess.__identifier__, root,
+                     appstructs={IName.__identifier__: {'name': 'benchmark'}},
+                     registry=registry)
+    versions = []
+    for number in range(count):
+        proposal = create(IProposal.__identifier__, process,
+                          registry=registry)
+        first = proposal['VERSION_0000000']
+        appstructs = {ITitle.__identifier__: {'title': 'title %i' % number},
+                      IDescription.__identifier__:
+                      {'short_description': 'short %i' % number,
+                       'description': 'description %i' % number},
+                      IVersionable.__identifier__: {'follows': [first]},
+                      }
+        version = create(IProposalVersion.__identifier__, proposal,
+                         appstructs=appstructs, registry=registry)
+        versions.append(version)
+    transaction.commit()
+    registry.changelog.clear()
+    logger.info('Created %i proposal versions', count)
+    return versions
+
+
+def unpack_annotation_data(resource) -> bool:
+    """Move annotation sheet data to legacy `_sheet_<isheet>` attributes.
+
+    This restores the storage before the `pack_sheet_annotation_data`
+    evolution step.
+
+    :returns: True if `resource` was modified.
+    """
+    from adhocracy_core.sheets import ANNOTATIONS_KEY
+    from adhocracy_core.sheets import SharedSheetData
+    annotations = getattr(resource, ANNOTATIONS_KEY, None)
+    if not annotations:
+        return False
+    for key, data in annotations.items():
+        if isinstance(data, SharedSheetData):
+            data = data.data
+        setattr(resource, key, PersistentMapping(data))
+    delattr(resource, ANNOTATIONS_KEY)
+    resource._p_changed = True
+    return True
+
+
+def _read_sheets(resources: list,
+                 registry) -> (int, int, int):  # pragma: no cover
+    """Read the stored sheet data of `resources` with an empty cache."""
+    from adhocracy_core.sheets import AnnotationRessourceSheet
+    connection = resources[0]._p_jar
+    connection.cacheMinimize()
+    connection.getTransferCounts(True)
+    for resource in resources:
+        for sheet in registry.content.get_sheets_all(resource):
+            if isinstance(sheet, AnnotationRessourceSheet):
+                sheet.get_stored_data()
+    loads, stores = connection.getTransferCounts(True)
+    cached = connection._cache.cache_non_ghost_count
+    return len(resources), loads, cached
+
+
+def format_results(results: [tuple]) -> str:
+    """Return database loads and cached objects per resource."""
+    lines = []
+    for storage, count, loads, cached in results:
+        if not count:
+            lines.append('{}: resources: 0'.format(storage))
+            continue
+        lines.append('{0}: resources: {1}, loads per resource: {2:.1f}, '
+                     'cached objects per resource: {3:.1f}'
+                     .format(storage, count, loads / count, cached / count))
+    return '\n'.join(lines)
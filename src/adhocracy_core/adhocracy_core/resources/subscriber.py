@@ -228,7 +228,8 @@ def _get_writable_appstructs(resource, registry) -> dict:
         editable = sheet.meta.editable
         creatable = sheet.meta.creatable
         if editable or creatable:  # pragma: no branch
-            appstructs[sheet.meta.isheet.__identifier__] = sheet.get()
+            appstruct = sheet.get(add_back_references=False)
+            appstructs[sheet.meta.isheet.__identifier__] = appstruct
     return appstructs
 
 
@@ -0,0 +1,186 @@
+from unittest.mock import Mock
+
+from pyramid import testing
+from pytest import fixture
+from pytest import mark
+from pytest import raises
+
+from adhocracy_core.interfaces import IItemVersion
+
+
+class TestAutoUpdatePlan:
+
+    @fixture
+    def inst(self):
+        from .autoupdate import AutoUpdatePlan
+        return AutoUpdatePlan()
+
+    @fixture
+    def version(self):
+        from zope.interface import alsoProvides
+        version = testing.DummyResource(__name__='version')
+        alsoProvides(version, IItemVersion)
+        return version
+
+    def add_update(self, inst, resource, depth=1):
+        from adhocracy_core.interfaces import ISheet
+        from .autoupdate import AutoUpdate
+        inst.updates.append(AutoUpdate(resource, ISheet, 'field', depth))
+
+    def test_create(self, inst):
+        assert inst.updates == []
+        assert inst.versions == []
+        assert inst.resources == []
+        assert inst.depth == 0
+
+    def test_versions_and_resources(self, inst, version):
+        resource = testing.DummyResource(__name__='resource')
+        self.add_update(inst, version, depth=1)
+        self.add_update(inst, resource, depth=2)
+        assert inst.versions == [version]
+        assert inst.resources == [resource]
+        assert inst.depth == 2
+
+    def test_to_dict(self, inst, version):
+        self.add_update(inst, version)
+        assert inst.to_dict() == {'depth': 1,
+                                  'versions': ['version'],
+                                  'resources': [],
+                                  }
+
+
+@fixture
+def integration(integration):
+    integration.include('adhocracy_core.changelog')
+    return integration
+
+
+@mark.usefixtures('integration')
+class TestPlanAutoupdates:
+
+    @fixture
+    def make_version(self, integration, registry, pool_with_catalogs):
+        from adhocracy_core.resources import add_resource_type_to_registry
+        from adhocracy_core.resources.item import IItem
+        from adhocracy_core.resources.itemversion import itemversion_meta
+        from adhocracy_core.sheets.document import IDocument
+        from adhocracy_core.sheets.versions import IVersionable
+        metadata = itemversion_meta._replace(extended_sheets=(IDocument,))
+        add_resource_type_to_registry(metadata, integration)
+
+        def make_version(elements=(), follows=(), item=None):
+            if item is None:
+                item = registry.content.create(IItem.__identifier__,
+                                               parent=pool_with_catalogs)
+            appstructs = {IDocument.__identifier__:
+                          {'elements': list(elements)},
+                          IVersionable.__identifier__:
+                          {'follows': list(follows)},
+                          }
+            return registry.content.create(IItemVersion.__identifier__,
+                                           parent=item,
+                                           appstructs=appstructs,
+                                           registry=registry)
+        return make_version
+
+    def call_fut(self, *args, **kwargs):
+        from .autoupdate import plan_autoupdates
+        return plan_autoupdates(*args, **kwargs)
+
+    def test_no_versions(self, registry):
+        plan = self.call_fut([], registry)
+        assert plan.updates == []
+
+    def test_not_referenced(self, registry, make_version):
+        version = make_version()
+        plan = self.call_fut([version], registry)
+        assert plan.updates == []
+
+    def test_referencing_versions(self, registry, make_version):
+        paragraph = make_version()
+        document = make_version(elements=[paragraph])
+        process = make_version(elements=[document])
+        plan = self.call_fut([paragraph], registry)
+        assert plan.versions == [document, process]
+        assert [x.depth for x in plan.updates] == [1, 2]
+        assert plan.updates[0].isheet_field == 'elements'
+
+    def test_referencing_versions_once(self, registry, make_version):
+        paragraph = make_version()
+        other = make_version()
+        document = make_version(elements=[paragraph, other])
+        plan = self.call_fut([paragraph, other], registry)
+        assert plan.versions == [document]
+
+    def test_ignore_not_last_versions(self, registry, make_version):
+        paragraph = make_version()
+        document = make_version(elements=[paragraph])
+        document_last = make_version(elements=[paragraph],
+                                     follows=[document],
+                                     item=document.__parent__)
+        plan = self.call_fut([paragraph], registry)
+        assert plan.versions == [document_last]
+
+    def test_ignore_not_in_root_versions_subtree(self, registry,
+                                                 make_version):
+        paragraph = make_version()
+        document = make_version(elements=[paragraph])
+        other_document = make_version(elements=[paragraph])
+        plan = self.call_fut([paragraph], registry, root_versions=[document])
+        assert plan.versions == [document]
+        assert other_document not in plan.versions
+
+    def test_raise_if_max_depth_exceeded(self, registry, make_version):
+        from adhocracy_core.exceptions import AutoUpdateLimitError
+        paragraph = make_version()
+        document = make_version(elements=[paragraph])
+        make_version(elements=[document])
+        assert self.call_fut([paragraph], registry, max_depth=2).depth == 2
+        with raises(AutoUpdateLimitError) as err:
+            self.call_fut([paragraph], registry, max_depth=1)
+        assert err.value.resource is paragraph
+        assert err.value.limit == 'max_depth'
+        assert err.value.value == 1
+
+    def test_raise_if_max_fanout_exceeded(self, registry, make_version):
+        from adhocracy_core.exceptions import AutoUpdateLimitError
+        paragraph = make_version()
+        make_version(elements=[paragraph])
+        make_version(elements=[paragraph])
+        with raises(AutoUpdateLimitError) as err:
+            self.call_fut([paragraph], registry, max_fanout=1)
+        assert err.value.limit == 'max_fanout'
+
+
+class TestCheckAutoupdateLimits:
+
+    @fixture
+    def mock_plan_autoupdates(self, monkeypatch):
+        from . import autoupdate
+        mock = Mock(spec=autoupdate.plan_autoupdates)
+        monkeypatch.setattr(autoupdate, 'plan_autoupdates', mock)
+        return mock
+
+    @fixture
+    def settings(self, registry):
+        return registry['config'].adhocracy.autoupdate
+
+    def call_fut(self, *args):
+        from .autoupdate import check_autoupdate_limits
+        return check_autoupdate_limits(*args)
+
+    def test_ignore_if_no_limits(self, registry, mock_plan_autoupdates):
+        self.call_fut([], registry)
+        assert not mock_plan_autoupdates.called
+
+    def test_plan_with_limits(self, registry, settings,
+                              mock_plan_autoupdates):
+        version = testing.DummyResource()
+        root = testing.DummyResource()
+        settings.max_depth = 2
+        settings.max_fanout = 100
+        self.call_fut([version], registry, [root])
+        mock_plan_autoupdates.assert_called_with([version], registry,
+                                                 root_versions=[root],
+                                                 max_depth=2,
+                                                 max_fanout=100)
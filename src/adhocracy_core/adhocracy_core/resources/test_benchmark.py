@@ -0,0 +1,16 @@
+class TestFormatResults:
+
+    def call_fut(self, *args):
+        from .benchmark import format_results
+        return format_results(*args)
+
+    def test_no_edits(self):
+        assert self.call_fut([], []) == 'edits: 0'
+
+    def test_edits(self):
+        assert self.call_fut([0.001, 0.003], [100, 300]) == \
+            'edits: 2\n'\
+            'time mean: 2.0 ms\n'\
+            'time max: 3.0 ms\n'\
+            'size mean: 200 bytes\n'\
+            'size max: 300 bytes'
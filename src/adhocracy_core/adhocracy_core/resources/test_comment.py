@@ -11,6 +11,7 @@ def test_comment_meta():
     assert meta.item_type == ICommentVersion
     assert meta.element_types == (ICommentVersion,)
     assert meta.use_autonaming
+    assert meta.use_autonaming_concurrent
     assert meta.permission_create == 'create_comment'
 
 
@@ -65,6 +66,17 @@ class TestRoot:
         assert ICommentsService.providedBy(res)
         assert find_service(context, 'comments')
 
+    def test_create_comment_with_concurrent_autonaming(self, registry,
+                                                       pool_with_catalogs):
+        from adhocracy_core.resources.comment import IComment
+        registry['config'].adhocracy.autonaming = 'concurrent'
+        res = registry.content.create(IComment.__identifier__,
+                                      pool_with_catalogs)
+        prefix, number, suffix = res.__name__.split('_')
+        assert prefix + '_' + number == 'comment_0000000'
+        assert len(suffix) == 6
+        assert 'VERSION_0000000' in res
+
     def test_add_commentsservice(self, context, registry):
         from adhocracy_core.resources.comment import add_commentsservice
         add_commentsservice(context, registry, {})
@@ -1,4 +1,5 @@
 from unittest.mock import MagicMock
+from unittest.mock import Mock
 from pyramid import testing
 from pytest import raises
 from pytest import fixture
@@ -186,6 +187,38 @@ class TestResourceFactory:
         assert mock_sheet.set.call_args[0] == ({'count': 0},)
         assert mock_sheet.set.call_args[1]['send_event'] is False
 
+    def test_call_with_follows_share_annotation_data(
+            self, resource_meta, registry, mock_sheet):
+        from adhocracy_core.sheets import AnnotationRessourceSheet
+        from adhocracy_core.sheets.versions import IVersionable
+        meta = resource_meta._replace(iresource=IResource,
+                                      basic_sheets=(ISheetY,))
+        annotation_sheet = Mock(spec=AnnotationRessourceSheet)
+        annotation_sheet.meta = mock_sheet.meta
+        register_sheet(None, annotation_sheet, registry, ISheetY)
+        follows = testing.DummyResource()
+        appstructs = {ISheetY.__identifier__: {'count': 0},
+                      IVersionable.__identifier__: {'follows': [follows]}}
+
+        self.make_one(meta)(appstructs=appstructs)
+
+        annotation_sheet.share_data.assert_any_call(follows, {'count': 0})
+        assert annotation_sheet.set.called
+
+    def test_call_without_follows_not_share_annotation_data(
+            self, resource_meta, registry, mock_sheet):
+        from adhocracy_core.sheets import AnnotationRessourceSheet
+        meta = resource_meta._replace(iresource=IResource,
+                                      basic_sheets=(ISheetY,))
+        annotation_sheet = Mock(spec=AnnotationRessourceSheet)
+        annotation_sheet.meta = mock_sheet.meta
+        register_sheet(None, annotation_sheet, registry, ISheetY)
+        appstructs = {ISheetY.__identifier__: {'count': 0}}
+
+        self.make_one(meta)(appstructs=appstructs)
+
+        assert not annotation_sheet.share_data.called
+
     def test_call_with_not_creatable_appstructs_data(self, resource_meta,
                                                      registry, mock_sheet):
         meta = resource_meta._replace(iresource=IResource,
@@ -270,6 +303,18 @@ class TestResourceFactory:
 
         assert 'prefix_0000000' in pool
 
+    def test_call_with_parent_and_use_autonaming_concurrent(self,
+                                                            resource_meta,
+                                                            pool):
+        meta = resource_meta._replace(iresource=IResource,
+                                      use_autonaming=True,
+                                      use_autonaming_concurrent=True)
+        pool.next_name = Mock(return_value='name')
+
+        self.make_one(meta)(parent=pool)
+
+        assert pool.next_name.call_args[1]['concurrent'] is True
+
     def test_call_with_parent_and_use_autonaming_random(self, resource_meta,
                                                        pool):
         meta = resource_meta._replace(iresource=IResource,
@@ -1,5 +1,6 @@
 from pytest import fixture
 from pytest import mark
+from pytest import raises
 
 from pyramid import testing
 
@@ -124,3 +125,24 @@ class TestItemVersion:
         referenceing_v0_path = resource_path(referenceing_v0)
         assert registry.changelog[referenceing_v0_path].followed_by
 
+
+    def test_raise_if_autoupdate_limits_exceeded(self, config, registry,
+                                                 item, other_item,
+                                                 pool_with_catalogs):
+        from adhocracy_core.exceptions import AutoUpdateLimitError
+        from adhocracy_core.sheets.document import IDocument
+        from adhocracy_core.resources.item import IItem
+        from adhocracy_core.resources.itemversion import itemversion_meta
+        from adhocracy_core.resources import add_resource_type_to_registry
+        metadata = itemversion_meta._replace(extended_sheets=(IDocument,))
+        add_resource_type_to_registry(metadata, config)
+        third_item = registry.content.create(IItem.__identifier__,
+                                             parent=pool_with_catalogs)
+        referenced_v0 = self.make_one(registry, item)
+        appstructs = {IDocument.__identifier__: {'elements': [referenced_v0]}}
+        self.make_one(registry, other_item, appstructs=appstructs)
+        self.make_one(registry, third_item, appstructs=appstructs)
+        settings = registry['config'].adhocracy.autoupdate
+        settings.max_fanout = 1
+        with raises(AutoUpdateLimitError):
+            self.make_one(registry, item, follows=[referenced_v0])
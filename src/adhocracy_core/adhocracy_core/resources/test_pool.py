@@ -1,6 +1,9 @@
+from unittest.mock import Mock
+
 from pyramid import testing
 from pytest import mark
 from pytest import fixture
+from pytest import raises
 
 
 def test_pool_meta():
@@ -83,6 +86,61 @@ class TestPoolClass:
         assert inst.next_name(context, prefix='otherprefix') == 'otherprefix' + '1'.zfill(7)
 
 
+    def test_next_name_sharded(self, context):
+        from .sharding import ShardedBTree
+        inst = self._makeOne()
+        inst.data = ShardedBTree(shards=4)
+        names = [inst.next_name(context) for x in range(8)]
+        assert len(set(names)) == 8
+        assert all(len(x) == 7 for x in names)
+
+    def test_next_name_concurrent(self, context, registry):
+        registry['config'].adhocracy.autonaming = 'concurrent'
+        inst = self._makeOne()
+        first = inst.next_name(context, concurrent=True)
+        second = inst.next_name(context, prefix='prefix', concurrent=True)
+        number, suffix = first.split('_')
+        assert number == '0'.zfill(7)
+        assert len(suffix) == 6
+        assert second == 'prefix' + '0'.zfill(7) + '_' + suffix
+
+    def test_next_name_concurrent_not_enabled(self, context):
+        inst = self._makeOne()
+        assert inst.next_name(context, concurrent=True) == '0'.zfill(7)
+
+    def test_next_name_concurrent_only_if_requested(self, context, registry):
+        registry['config'].adhocracy.autonaming = 'concurrent'
+        inst = self._makeOne()
+        assert inst.next_name(context) == '0'.zfill(7)
+
+    def test_next_name_concurrent_ignore_item_versions(self, context,
+                                                       registry):
+        from zope.interface import alsoProvides
+        from adhocracy_core.interfaces import IItemVersion
+        registry['config'].adhocracy.autonaming = 'concurrent'
+        alsoProvides(context, IItemVersion)
+        inst = self._makeOne()
+        assert inst.next_name(context, prefix='VERSION_', concurrent=True)\
+            == 'VERSION_' + '0'.zfill(7)
+
+    def test_next_name_concurrent_suffix_per_thread(self, context, registry):
+        from threading import Thread
+        registry['config'].adhocracy.autonaming = 'concurrent'
+        inst = self._makeOne()
+        names = []
+
+        def next_name():
+            from pyramid.threadlocal import manager
+            manager.push({'registry': registry, 'request': None})
+            names.append(inst.next_name(context, concurrent=True))
+            manager.pop()
+        thread = Thread(target=next_name)
+        thread.start()
+        thread.join()
+        names.append(inst.next_name(context, concurrent=True))
+        assert names[0].split('_')[1] != names[1].split('_')[1]
+        assert sorted(names) == names
+
     def test_add(self, context):
         inst = self._makeOne()
         inst.add('name', context)
@@ -142,3 +200,196 @@ class TestPoolClass:
         inst['child'] = context
         res = inst.remove('child', registry)
         assert res == context
+
+    def test_remove_many_removes_subresources(self, registry, context, mocker):
+        inst = self._makeOne()
+        mocker.patch('adhocracy_core.resources.pool.find_graph')
+        other = testing.DummyResource()
+        inst['child'] = context
+        inst['other'] = other
+        res = inst.remove_many(['child', 'other'], registry=registry)
+        assert res == [context, other]
+        assert 'child' not in inst
+        assert 'other' not in inst
+
+    def test_remove_many_raise_if_wrong_name(self, registry, context,
+                                             mocker):
+        inst = self._makeOne()
+        mocker.patch('adhocracy_core.resources.pool.find_graph')
+        inst['child'] = context
+        with raises(KeyError):
+            inst.remove_many(['child', 'wrong'], registry=registry)
+        assert 'child' in inst
+
+    def test_remove_many_sends_deleted_events(self, config, registry,
+                                              context, mocker):
+        from adhocracy_core.testing import create_event_listener
+        from adhocracy_core.events import IResourceWillBeDeleted
+        deleted_listener = create_event_listener(config, IResourceWillBeDeleted)
+        inst = self._makeOne()
+        mocker.patch('adhocracy_core.resources.pool.find_graph')
+        inst['child'] = context
+        inst.remove_many(['child'], registry=registry)
+        event = deleted_listener[0]
+        assert event.parent == inst
+        assert event.object == context
+
+    def test_remove_many_sends_aggregated_backreference_events(
+            self, registry, context, mocker):
+        inst = self._makeOne()
+        mock_graph = mocker.patch(
+            'adhocracy_core.resources.pool.find_graph').return_value
+        references = [mocker.Mock()]
+        mock_graph.get_references_for_bulk_removal_notification.return_value\
+            = references
+        inst['child'] = context
+        inst.remove_many(['child'], registry=registry)
+        mock_graph.get_references_for_bulk_removal_notification\
+            .assert_called_with([context], set())
+        mock_graph.send_back_reference_removal_notificatons\
+            .assert_called_with(references, registry)
+
+
+@mark.usefixtures('integration')
+class TestPoolRemoveManyIntegration:
+
+    @fixture
+    def context(self, pool_with_catalogs):
+        from adhocracy_core.resources.pool import Pool
+        for name in ['child', 'other', 'keep']:
+            pool_with_catalogs.add(name, Pool())
+        return pool_with_catalogs
+
+    def _get_indexed_names(self, context):
+        from substanced.util import find_service
+        name_index = find_service(context, 'catalogs', 'system', 'name')
+        return list(name_index.unique_values())
+
+    def test_unindex_removed_subresources(self, context, registry):
+        context['child'].add('grandchild', testing.DummyResource())
+        context.remove_many(['child', 'other'], registry=registry)
+        names = self._get_indexed_names(context)
+        assert 'keep' in names
+        assert 'child' not in names
+        assert 'grandchild' not in names
+        assert 'other' not in names
+
+    def test_increment_modification_count(self, context, registry):
+        catalogs = context['catalogs']
+        count = catalogs.modification_count
+        context.remove_many(['child', 'other'], registry=registry)
+        assert catalogs.modification_count == count + 1
+
+
+class TestPoolConcurrentAdd:
+    """Post 50 comments at the same time, count the write conflicts."""
+
+    posts = 50
+
+    @fixture
+    def db(self, tmpdir):
+        from ZODB import DB
+        from ZODB.FileStorage import FileStorage
+        from transaction import TransactionManager
+        from .pool import Pool
+        db = DB(FileStorage(str(tmpdir.join('Data.fs'))),
+                pool_size=self.posts)
+        manager = TransactionManager()
+        connection = db.open(transaction_manager=manager)
+        comments = Pool()
+        comments.add_next(Pool())  # initialize autoname counter
+        connection.root()['comments'] = comments
+        manager.commit()
+        connection.close()
+        yield db
+        db.close()
+
+    def post_comments(self, db, registry) -> int:
+        """Add comments in parallel threads, return the number of retries."""
+        from threading import Barrier
+        from threading import Thread
+        from transaction import TransactionManager
+        barrier = Barrier(self.posts)
+        retries = []
+
+        def post_comment():
+            from pyramid.threadlocal import manager
+            from ZODB.POSException import ConflictError
+            import transaction
+            from .pool import Pool
+            manager.push({'registry': registry, 'request': None})
+            connection = db.open()
+            first_try = True
+            while True:
+                comments = connection.root()['comments']
+                comments.add_next(Pool(), concurrent=True)
+                if first_try:  # all threads commit at the same time
+                    barrier.wait()
+                    first_try = False
+                try:
+                    transaction.commit()
+                    break
+                except ConflictError:
+                    transaction.abort()
+                    retries.append(1)
+            connection.close()
+            manager.pop()
+        threads = [Thread(target=post_comment) for x in range(self.posts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        connection = db.open(transaction_manager=TransactionManager())
+        assert len(connection.root()['comments']) == self.posts + 1
+        connection.close()
+        return len(retries)
+
+    def test_sequential_names_conflict(self, db, registry):
+        registry['config'].adhocracy.autonaming = 'sequential'
+        retries = self.post_comments(db, registry)
+        assert retries >= self.posts - 1
+
+    def test_concurrent_names_reduce_conflicts(self, db, registry):
+        registry['config'].adhocracy.autonaming = 'concurrent'
+        retries = self.post_comments(db, registry)
+        assert retries < self.posts - 1
+
+
+class TestRemoveResources:
+
+    @fixture
+    def mock_transaction(self, monkeypatch):
+        from . import pool
+        mock = Mock()
+        monkeypatch.setattr(pool, 'transaction', mock)
+        return mock
+
+    @fixture
+    def context(self, pool):
+        for name in ['a', 'b', 'c']:
+            pool.add(name, testing.DummyResource())
+        return pool
+
+    def call_fut(self, *args, **kwargs):
+        from .pool import remove_resources
+        return remove_resources(*args, **kwargs)
+
+    def test_remove_in_chunks(self, context, registry, mock_transaction):
+        context.remove_many = Mock()
+        resources = list(context.values())
+        count = self.call_fut(resources, registry, chunk_size=2)
+        assert count == 3
+        assert context.remove_many.call_args_list[0][0][0] == ['a', 'b']
+        assert context.remove_many.call_args_list[1][0][0] == ['c']
+        assert not mock_transaction.commit.called
+
+    def test_remove_and_commit_every_chunk(self, context, registry,
+                                           mock_transaction):
+        resources = list(context.values())
+        self.call_fut(resources, registry, chunk_size=2, commit=True)
+        assert len(context) == 0
+        assert mock_transaction.commit.call_count == 2
+
+    def test_remove_nothing(self, registry, mock_transaction):
+        assert self.call_fut([], registry) == 0
+        assert not mock_transaction.commit.called
@@ -17,11 +17,11 @@ def integration(integration):
 
 
 @fixture
-def mock_is_older(monkeypatch):
-    from adhocracy_core.sheets.metadata import is_older_than
+def mock_now(monkeypatch):
+    from datetime import datetime
     from . import principal
-    mock = Mock(spec=is_older_than)
-    monkeypatch.setattr(principal, 'is_older_than', mock)
+    mock = Mock(return_value=datetime(2016, 1, 11))
+    monkeypatch.setattr(principal, 'now', mock)
     return mock
 
 
@@ -82,6 +82,7 @@ class TestUsers:
         from . import badge
         from . import asset
         from . import principal
+        from . import sharding
         from adhocracy_core import sheets
         assert meta.iresource is principal.IUsersService
         assert meta.permission_create == 'create_service'
@@ -91,12 +92,21 @@ class TestUsers:
         assert badge.add_badge_assignments_service in meta.after_creation
         assert asset.add_assets_service in meta.after_creation
         assert principal.allow_create_asset_authenticated in meta.after_creation
+        assert sharding.shard_users_service in meta.after_creation
 
     @mark.usefixtures('integration')
     def test_create(self, meta, registry):
         resource = registry.content.create(meta.iresource.__identifier__)
         assert meta.iresource.providedBy(resource)
 
+    @mark.usefixtures('integration')
+    def test_create_sharded(self, meta, registry):
+        from .sharding import ShardedBTree
+        registry['config'].adhocracy.users_shards = 4
+        resource = registry.content.create(meta.iresource.__identifier__)
+        assert isinstance(resource.data, ShardedBTree)
+        assert 'assets' in resource
+
 
 def test_create_asset_permission(context, registry, mocker):
     from . import principal
@@ -658,7 +668,7 @@ class TestDeleteNotActiveUsers:
 
     @fixture
     def request_(self, context, registry):
-        request = testing.DummyRequest(context=context)
+        request = testing.DummyRequest(context=context, root=context)
         request.registry = registry
         return request
 
@@ -672,30 +682,38 @@ class TestDeleteNotActiveUsers:
         service['user'] = user
         return service
 
+    @fixture
+    def mock_catalogs(self, monkeypatch, mock_catalogs):
+        from . import principal
+        monkeypatch.setattr(principal, 'find_service',
+                            lambda x, y: mock_catalogs)
+        return mock_catalogs
+
     def call_fut(self, *args):
         from .principal import delete_not_activated_users
         return delete_not_activated_users(*args)
 
-    def test_delete_not_active_users_older_then_days(
-            self, users, user, request_, mock_is_older, mock_user_locator):
-        mock_is_older.return_value = True
-        mock_user_locator.get_users.return_value = [user]
+    def test_search_not_active_users_older_then_days(
+            self, request_, query, mock_catalogs, mock_now):
+        from datetime import datetime
+        from .principal import IUser
         self.call_fut(request_, 7)
-        mock_is_older.assert_called_with(user, 7)
-        assert 'user' not in users
+        assert mock_catalogs.search.call_args[0][0] == query._replace(
+            interfaces=IUser,
+            indexes={'private_user_active': False,
+                     'item_creation_date': ('le', datetime(2016, 1, 3))},
+            resolve=True)
 
-    def test_ignore_not_active_user_younger_then_days(
-            self, users, user, request_, mock_is_older, mock_user_locator):
-        mock_is_older.return_value = False
-        mock_user_locator.get_users.return_value = [user]
-        self.call_fut(request_, 7)
-        assert 'user' in users
+    def test_delete_found_users(self, users, user, request_, mock_catalogs,
+                                search_result, mock_now):
+        mock_catalogs.search.return_value = search_result._replace(
+            elements=[user])
+        assert self.call_fut(request_, 7) == 1
+        assert 'user' not in users
 
-    def test_ignore_active_user(
-            self, users, user, request_, mock_user_locator):
-        user.active = True
-        mock_user_locator.get_users.return_value = [user]
-        self.call_fut(request_, 7)
+    def test_ignore_if_no_users_found(self, users, request_, mock_catalogs,
+                                      mock_now):
+        assert self.call_fut(request_, 7) == 0
         assert 'user' in users
 
 
@@ -707,27 +725,41 @@ class TestDeletePasswordResets:
         return reset
 
     @fixture
-    def resets(self, reset, service, monkeypatch):
-        from . import principal
+    def resets(self, reset, service):
         service['reset'] = reset
-        monkeypatch.setattr(principal, 'find_service', lambda x, y, z: service)
         return service
 
+    @fixture
+    def mock_catalogs(self, monkeypatch, mock_catalogs):
+        from . import principal
+        monkeypatch.setattr(principal, 'find_service',
+                            lambda x, y: mock_catalogs)
+        return mock_catalogs
+
     def call_fut(self, *args):
         from .principal import delete_password_resets
         return delete_password_resets(*args)
 
-    def test_delete_resets_older_then_days(
-            self, resets, reset, request_, mock_is_older):
-        mock_is_older.return_value = True
+    def test_search_resets_older_then_days(
+            self, request_, query, mock_catalogs, mock_now):
+        from datetime import datetime
+        from .principal import IPasswordReset
         self.call_fut(request_, 7)
-        mock_is_older.assert_called_with(reset, 7)
+        assert mock_catalogs.search.call_args[0][0] == query._replace(
+            interfaces=IPasswordReset,
+            indexes={'item_creation_date': ('le', datetime(2016, 1, 3))},
+            resolve=True)
+
+    def test_delete_found_resets(self, resets, reset, request_, mock_catalogs,
+                                 search_result, mock_now):
+        mock_catalogs.search.return_value = search_result._replace(
+            elements=[reset])
+        assert self.call_fut(request_, 7) == 1
         assert 'reset' not in resets
 
-    def test_ignore_resets_younger_then_days(
-            self, resets, reset, request_, mock_is_older):
-        mock_is_older.return_value = False
-        self.call_fut(request_, 7)
+    def test_ignore_if_no_resets_found(self, resets, request_, mock_catalogs,
+                                       mock_now):
+        assert self.call_fut(request_, 7) == 0
         assert 'reset' in resets
 
 
@@ -14,6 +14,7 @@ def test_rate_meta():
     assert rate_meta.element_types == (IRateVersion,)
     assert rate_meta.item_type == IRateVersion
     assert rate_meta.use_autonaming
+    assert rate_meta.use_autonaming_concurrent
     assert rate_meta.autonaming_prefix == 'rate_'
 
 
@@ -0,0 +1,24 @@
+from collections import Counter
+
+
+class TestFormatResults:
+
+    def call_fut(self, *args):
+        from .registration_benchmark import format_results
+        return format_results(*args)
+
+    def test_no_registrations(self):
+        assert self.call_fut(0, Counter()) == \
+            'registrations: 0\n'\
+            'conflicts: 0\n'\
+            'conflicts per registration: 0.00'
+
+    def test_conflicts(self):
+        conflicts = Counter({'BTrees.OOBTree.OOBucket': 3,
+                             'BTrees.Length.Length': 1})
+        assert self.call_fut(8, conflicts) == \
+            'registrations: 8\n'\
+            'conflicts: 4\n'\
+            'conflicts per registration: 0.50\n'\
+            '  BTrees.OOBTree.OOBucket: 3\n'\
+            '  BTrees.Length.Length: 1'
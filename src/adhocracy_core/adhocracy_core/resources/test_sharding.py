@@ -0,0 +1,156 @@
+from pyramid import testing
+from pytest import fixture
+from pytest import mark
+
+
+class TestShardedBTree:
+
+    @fixture
+    def inst(self):
+        from .sharding import ShardedBTree
+        return ShardedBTree(shards=4)
+
+    def test_create(self, inst):
+        assert inst.shards == 4
+        assert len(inst) == 0
+        assert list(inst.keys()) == []
+
+    def test_create_with_data(self):
+        from .sharding import ShardedBTree
+        inst = ShardedBTree(data={'a': 1, 'b': 2}, shards=2)
+        assert list(inst.items()) == [('a', 1), ('b', 2)]
+
+    def test_get_shard_numeric_name(self, inst):
+        assert inst.get_shard('0000005') == 1
+        assert inst.get_shard('0000008') == 0
+
+    def test_get_shard_other_name(self, inst):
+        assert inst.get_shard('assets') == inst.get_shard('assets')
+        assert 0 <= inst.get_shard('assets') < 4
+
+    def test_set_get_delete(self, inst):
+        inst['0000001'] = 1
+        assert inst['0000001'] == 1
+        assert inst.get('0000001') == 1
+        assert inst.get('0000002', 'default') == 'default'
+        assert '0000001' in inst
+        del inst['0000001']
+        assert '0000001' not in inst
+
+    def test_spread_names_across_shards(self, inst):
+        for number in range(8):
+            inst[str(number).zfill(7)] = number
+        assert [len(x) for x in inst._shards] == [2, 2, 2, 2]
+        assert len(inst) == 8
+
+    def test_keys_values_items_sorted(self, inst):
+        for name in ['0000003', 'assets', '0000000', '0000002']:
+            inst[name] = name
+        keys = ['0000000', '0000002', '0000003', 'assets']
+        assert list(inst.keys()) == keys
+        assert list(inst.values()) == keys
+        assert list(inst.items()) == [(x, x) for x in keys]
+        assert list(inst) == keys
+
+    def test_keys_values_items_lazy(self, inst):
+        from collections.abc import Iterator
+        assert isinstance(inst.keys(), Iterator)
+        assert isinstance(inst.values(), Iterator)
+        assert isinstance(inst.items(), Iterator)
+
+    def test_keys_values_items_min_max(self, inst):
+        for number in range(8):
+            inst[str(number).zfill(7)] = number
+        assert list(inst.keys(min='0000002', max='0000004')) == \
+            ['0000002', '0000003', '0000004']
+        assert list(inst.keys(min='0000002', max='0000004',
+                              excludemin=True, excludemax=True)) == \
+            ['0000003']
+        assert list(inst.values(min='0000006')) == [6, 7]
+        assert list(inst.items(max='0000000')) == [('0000000', 0)]
+
+    def test_next_number_unique(self, inst):
+        numbers = [inst.next_number() for x in range(40)]
+        assert len(set(numbers)) == 40
+
+    def test_next_number_stored_in_counter_shard(self, inst):
+        for x in range(10):
+            number = inst.next_number()
+            shard = number % inst.shards
+            assert inst._counters[('', shard)]() == number // inst.shards + 1
+
+    def test_next_number_per_prefix(self, inst):
+        inst.next_number('prefix')
+        assert [x[0] for x in inst._counters.keys()] == ['prefix']
+
+    def test_set_next_number(self, inst):
+        inst.set_next_number('', 10)
+        numbers = [inst.next_number() for x in range(20)]
+        assert min(numbers) >= 10
+
+
+class TestShardPool:
+
+    @fixture
+    def pool(self):
+        from .pool import Pool
+        return Pool()
+
+    def call_fut(self, *args, **kwargs):
+        from .sharding import shard_pool
+        return shard_pool(*args, **kwargs)
+
+    def test_move_children(self, pool):
+        from .sharding import ShardedBTree
+        child = testing.DummyResource()
+        pool.add('0000000', child)
+        self.call_fut(pool, shards=4)
+        assert isinstance(pool.data, ShardedBTree)
+        assert pool['0000000'] is child
+        assert list(pool.keys()) == ['0000000']
+        assert len(pool) == 1
+
+    def test_ignore_if_already_sharded(self, pool):
+        self.call_fut(pool, shards=4)
+        data = pool.data
+        self.call_fut(pool, shards=2)
+        assert pool.data is data
+
+    def test_take_over_autoname_counters(self, pool):
+        context = testing.DummyResource()
+        for x in range(3):
+            pool.add_next(testing.DummyResource())
+        pool.next_name(context, prefix='prefix')
+        del pool.data['0000002']
+        self.call_fut(pool, shards=4)
+        names = [pool.next_name(context) for x in range(10)]
+        assert min(names) >= '0000003'
+        assert pool.next_name(context, prefix='prefix') > 'prefix0000000'
+
+    def test_take_over_names_higher_than_counter(self, pool):
+        context = testing.DummyResource()
+        pool.add('0000010', testing.DummyResource())
+        self.call_fut(pool, shards=4)
+        assert pool.next_name(context) > '0000010'
+
+
+class TestShardUsersService:
+
+    def call_fut(self, *args):
+        from .sharding import shard_users_service
+        return shard_users_service(*args)
+
+    @mark.usefixtures('integration')
+    def test_ignore_if_no_shards(self, registry):
+        from .pool import Pool
+        pool = Pool()
+        self.call_fut(pool, registry, {})
+        assert not hasattr(pool.data, 'shards')
+
+    @mark.usefixtures('integration')
+    def test_shard_if_shards(self, registry):
+        from .pool import Pool
+        registry['config'].adhocracy.users_shards = 8
+        pool = Pool()
+        self.call_fut(pool, registry, {})
+        assert pool.data.shards == 8
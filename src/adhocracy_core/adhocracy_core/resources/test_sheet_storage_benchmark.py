@@ -0,0 +1,53 @@
+from pyramid import testing
+
+
+class TestUnpackAnnotationData:
+
+    def call_fut(self, *args):
+        from .sheet_storage_benchmark import unpack_annotation_data
+        return unpack_annotation_data(*args)
+
+    def test_ignore_without_annotations(self):
+        resource = testing.DummyResource()
+        assert self.call_fut(resource) is False
+
+    def test_move_annotations_to_sheet_attributes(self):
+        from persistent.mapping import PersistentMapping
+        from adhocracy_core.sheets import ANNOTATIONS_KEY
+        from adhocracy_core.sheets import SharedSheetData
+        resource = testing.DummyResource()
+        setattr(resource, ANNOTATIONS_KEY,
+                {'_sheet_a': {'x': 1},
+                 '_sheet_b': SharedSheetData({'y': 2})})
+        assert self.call_fut(resource) is True
+        assert isinstance(resource._sheet_a, PersistentMapping)
+        assert resource._sheet_a == {'x': 1}
+        assert resource._sheet_b == {'y': 2}
+        assert not hasattr(resource, ANNOTATIONS_KEY)
+
+    def test_reverse_pack_annotation_data(self):
+        from adhocracy_core.evolution import pack_annotation_data
+        from adhocracy_core.sheets import ANNOTATIONS_KEY
+        resource = testing.DummyResource()
+        annotations = {'_sheet_a': {'x': 1}}
+        setattr(resource, ANNOTATIONS_KEY, dict(annotations))
+        self.call_fut(resource)
+        pack_annotation_data(resource)
+        assert getattr(resource, ANNOTATIONS_KEY) == annotations
+
+
+class TestFormatResults:
+
+    def call_fut(self, *args):
+        from .sheet_storage_benchmark import format_results
+        return format_results(*args)
+
+    def test_no_resources(self):
+        assert self.call_fut([('legacy', 0, 0, 0)]) == 'legacy: resources: 0'
+
+    def test_resources(self):
+        assert self.call_fut([('legacy', 2, 6, 6), ('packed', 2, 2, 2)]) == \
+            'legacy: resources: 2, loads per resource: 3.0, '\
+            'cached objects per resource: 3.0\n'\
+            'packed: resources: 2, loads per resource: 1.0, '\
+            'cached objects per resource: 1.0'
@@ -16,6 +16,7 @@ from pyramid.view import view_config
 
 from adhocracy_core.interfaces import API_ROUTE_NAME
 from adhocracy_core.authentication import UserTokenHeader
+from adhocracy_core.exceptions import AutoUpdateLimitError
 from adhocracy_core.exceptions import AutoUpdateNoForkAllowedError
 from adhocracy_core.interfaces import error_entry
 from adhocracy_core.schema import References
@@ -217,6 +218,23 @@ def handle_error_400_auto_update_no_fork_allowed(error, request):
     return handle_error_400_colander_invalid(error_colander, request)
 
 
+@view_config(
+    context=AutoUpdateLimitError,
+    permission=NO_PERMISSION_REQUIRED,
+    route_name=API_ROUTE_NAME,
+)
+def handle_error_400_auto_update_limit(error, request):
+    """Return 400 JSON error if the auto update exceeds the limits."""
+    msg = 'Auto update limit exceeded - The new version of {0} causes too'\
+          ' many auto updates (adhocracy.autoupdate.{1} = {2}). Try another'\
+          ' root_version.'.format(resource_path(error.resource),
+                                  error.limit,
+                                  error.value)
+    dummy_node = References(name='root_versions')
+    error_colander = Invalid(dummy_node, msg)
+    return handle_error_400_colander_invalid(error_colander, request)
+
+
 @view_config(
     context=URLDecodeError,
     permission=NO_PERMISSION_REQUIRED,
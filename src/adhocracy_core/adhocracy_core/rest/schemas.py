@@ -399,6 +399,13 @@ class POSTItemRequestSchema(POSTResourceRequestSchema):
                               validator=validate_root_versions)
 
 
+class GETAutoUpdatePlanRequestSchema(MappingSchema):
+    """GET parameters accepted for autoupdate plan requests."""
+
+    root_versions = Resources(missing=[],
+                              validator=validate_root_versions)
+
+
 class POSTResourceRequestSchemaList(SequenceSchema):
     """Overview of POST request/response data structure."""
 
@@ -809,7 +816,8 @@ class GETPoolRequestSchema(MappingSchema):
                 if 'references' not in search_query:  # pragma: no branch
                     search_query['references'] = []
                 isheet_name, isheet_field = filter.split(':')
-                isheet = resolver.resolve(isheet_name)
+                registry = self.bindings['registry']
+                isheet = registry.content.resolve(isheet_name)
                 target = appstruct[filter]
                 reference = ReferenceTuple(None, isheet, isheet_field, target)
                 search_query['references'].append(reference)
@@ -131,6 +131,7 @@ class TestHandleError40X_exception:
     @fixture
     def integration(self, config):
         import adhocracy_core.rest
+        config.include('adhocracy_core.content')
         config.include(adhocracy_core.rest)
         return config
 
@@ -300,6 +301,32 @@ class TestHandleAutoUpdateNoForkAllowed400Exception:
         assert inst.json == wanted
 
 
+@mark.usefixtures('log')
+class TestHandleAutoUpdateLimit400Exception:
+
+    def make_one(self, error, request_):
+        from adhocracy_core.rest.exceptions import \
+            handle_error_400_auto_update_limit
+        return handle_error_400_auto_update_limit(error, request_)
+
+    def test_render_exception_error(self, request_):
+        from adhocracy_core.exceptions import AutoUpdateLimitError
+        resource = testing.DummyResource(__name__='resource')
+        error = AutoUpdateLimitError(resource, 'max_depth', 2)
+        inst = self.make_one(error, request_)
+        assert inst.status == '400 Bad Request'
+        wanted = \
+            {'errors': [{'description': 'Auto update limit exceeded - The new '
+                                        'version of resource causes too many '
+                                        'auto updates (adhocracy.autoupdate.'
+                                        'max_depth = 2). Try another '
+                                        'root_version.',
+                         'location': 'body',
+                         'name': 'root_versions'}],
+             'status': 'error'}
+        assert inst.json == wanted
+
+
 @mark.usefixtures('log')
 class TestHandleError410:
 
@@ -805,7 +805,7 @@ class TestGETPoolRequestSchema:
         inst = inst.bind(context=context)
         assert inst.deserialize({}) == {}
 
-    def test_deserialize_valid(self, inst, context):
+    def test_deserialize_valid(self, inst, context, registry):
         from hypatia.interfaces import IIndexSort
         from adhocracy_core.sheets.name import IName
         from adhocracy_core.interfaces import ISheet
@@ -856,7 +856,7 @@ class TestGETPoolRequestSchema:
                   'show_frequency': True,
                   'sort_by': 'index1',
                   }
-        inst = inst.bind(context=context)
+        inst = inst.bind(context=context, registry=registry)
         node = Resource(name=ISheet.__identifier__ + ':x').bind(**inst.bindings)
         inst.add(node)
         node = Integer(name='index1')
@@ -118,13 +118,21 @@ class TestResourceRESTView:
         assert inst.context is context
         assert inst.content is request_.registry.content
 
+    def set_options_skeleton(self, request_, read=(), edit=(), addables=()):
+        from adhocracy_core.content import OptionsSkeleton
+        skeleton = OptionsSkeleton(sheets_read=tuple(read),
+                                   sheets_edit=tuple(edit),
+                                   addables=tuple(addables))
+        request_.registry.content.get_options_skeleton.return_value = skeleton
+
     def test_options_with_sheets_and_addables(
             self, request_, context, resource_meta, mock_sheet):
         content = request_.registry.content
-        content.get_sheets_edit.return_value = [mock_sheet]
-        content.get_sheets_read.return_value = [mock_sheet]
-        content.get_resources_meta_addable.return_value = [resource_meta]
-        content.get_sheets_create.return_value = [mock_sheet]
+        self.set_options_skeleton(request_,
+                                  read=[mock_sheet.meta],
+                                  edit=[mock_sheet.meta],
+                                  addables=[(resource_meta,
+                                             [mock_sheet.meta])])
         content.can_edit_anonymized.return_value = False
         content.can_add_anonymized.return_value = False
         content.can_delete_anonymized.return_value = False
@@ -160,11 +168,11 @@ class TestResourceRESTView:
 
     def test_options_with_sheets_and_addables_but_no_permissons(
             self, config, request_, context, resource_meta, mock_sheet):
-        content = request_.registry.content
-        content.get_sheets_edit.return_value = [mock_sheet]
-        content.get_sheets_read.return_value = [mock_sheet]
-        content.get_resources_meta_addable.return_value = [resource_meta]
-        content.get_sheets_create.return_value = [mock_sheet]
+        self.set_options_skeleton(request_,
+                                  read=[mock_sheet.meta],
+                                  edit=[mock_sheet.meta],
+                                  addables=[(resource_meta,
+                                             [mock_sheet.meta])])
         inst = self.make_one(context, request_)
         config.testing_securitypolicy(userid='hank', permissive=False)
 
@@ -194,8 +202,9 @@ class TestResourceRESTView:
     def test_options_with_allow_x_anonymize_header(
             self, request_, context, resource_meta, mock_sheet):
         content = request_.registry.content
-        content.get_sheets_edit.return_value = [mock_sheet]
-        content.get_resources_meta_addable.return_value = [resource_meta]
+        self.set_options_skeleton(request_,
+                                  edit=[mock_sheet.meta],
+                                  addables=[(resource_meta, [])])
         content.can_edit_anonymized.return_value = True
         content.can_add_anonymized.return_value = True
         content.can_delete_anonymized.return_value = True
@@ -210,17 +219,44 @@ class TestResourceRESTView:
     def test_options_with_allow_x_user_password_header(
             self, request_, context, resource_meta, mock_sheet):
         from adhocracy_core.interfaces import ISheetRequirePassword
-        content = request_.registry.content
         mock_sheet.meta = \
             mock_sheet.meta._replace(isheet=ISheetRequirePassword)
-        content.get_sheets_edit.return_value = [mock_sheet]
-        content.get_resources_meta_addable.return_value = [resource_meta]
+        self.set_options_skeleton(request_,
+                                  edit=[mock_sheet.meta],
+                                  addables=[(resource_meta, [])])
         inst = self.make_one(context, request_)
         response = inst.options()
         assert response['POST']['request_headers'] == {}
         assert response['PUT']['request_headers'] == {'X-User-Password': []}
         assert response['DELETE']['request_headers'] == {}
 
+    def test_options_with_workflow_sheet(
+            self, request_, registry, context, mock_sheet, mock_workflow):
+        from adhocracy_core.sheets.workflow import IWorkflowAssignment
+        mock_workflow.get_next_states.return_value = ['draft']
+        mock_sheet.get.return_value = {'workflow': 'sample'}
+        registry.content.workflows['sample'] = mock_workflow
+        mock_sheet.meta = mock_sheet.meta._replace(isheet=IWorkflowAssignment)
+        registry.content.get_sheet.return_value = mock_sheet
+        self.set_options_skeleton(request_, edit=[mock_sheet.meta])
+        inst = self.make_one(context, request_)
+        response = inst.options()
+        assert response['PUT']['request_body']['data'] ==\
+            {IWorkflowAssignment.__identifier__: {'workflow_state': ['draft']}}
+
+    def test_options_check_every_permission_once(
+            self, request_, context, resource_meta, mock_sheet):
+        request_.has_permission = Mock(return_value=True)
+        self.set_options_skeleton(request_,
+                                  read=[mock_sheet.meta] * 3,
+                                  edit=[mock_sheet.meta] * 3,
+                                  addables=[(resource_meta,
+                                             [mock_sheet.meta] * 3)])
+        inst = self.make_one(context, request_)
+        inst.options()
+        permissions = [x[0][0] for x in request_.has_permission.call_args_list]
+        assert sorted(permissions) == sorted(set(permissions))
+
     def test_add_workflow_permissions_info(
             self, request_, registry, context, mock_sheet, mock_workflow):
         from adhocracy_core.sheets.workflow import IWorkflowAssignment
@@ -703,6 +739,15 @@ class TestItemRESTView:
         assert wanted == response
 
 
+def set_options_skeleton(request_, resource_meta, create_sheet):
+    from adhocracy_core.content import OptionsSkeleton
+    skeleton = OptionsSkeleton(sheets_read=(),
+                               sheets_edit=(),
+                               addables=((resource_meta,
+                                          (create_sheet.meta,)),))
+    request_.registry.content.get_options_skeleton.return_value = skeleton
+
+
 class TestBadgeAssignmentsRESTView:
 
     @fixture
@@ -745,9 +790,7 @@ class TestBadgeAssignmentsRESTView:
 
     def test_options_ignore_if_no_postable_assignments_sheets(
             self, request_, context, resource_meta,  mock_sheet):
-        registry = request_.registry.content
-        registry.get_resources_meta_addable.return_value = [resource_meta]
-        registry.get_sheets_create.return_value = [mock_sheet]
+        set_options_skeleton(request_, resource_meta, mock_sheet)
         inst = self.make_one(context, request_)
         response = inst.options()
         assert response['POST']['request_body'][0]['data'] ==\
@@ -756,9 +799,7 @@ class TestBadgeAssignmentsRESTView:
     def test_options_add_assignable_badges(
             self, request_, context, resource_meta, assignment_sheet,
             mock_get_assignables, rest_url):
-        registry = request_.registry.content
-        registry.get_resources_meta_addable.return_value = [resource_meta]
-        registry.get_sheets_create.return_value = [assignment_sheet]
+        set_options_skeleton(request_, resource_meta, assignment_sheet)
         badge = testing.DummyResource()
         mock_get_assignables.return_value = [badge]
         inst = self.make_one(context, request_)
@@ -794,7 +835,7 @@ class TestMetaApiView:
 
     def test_get_empty(self, request_, context):
         inst = self.make_one(request_, context)
-        response = inst.get()
+        response = inst.describe(request_.registry)
         assert response['resources'] == {}
         assert response['sheets'] == {}
         assert response['workflows'] == {}
@@ -802,7 +843,7 @@ class TestMetaApiView:
     def test_get_resources(self, request_, context, resource_meta):
         request_.registry.content.resources_meta[IResource] = resource_meta
         inst = self.make_one(request_, context)
-        resp = inst.get()
+        resp = inst.describe(request_.registry)
         assert IResource.__identifier__ in resp['resources']
         assert resp['resources'][IResource.__identifier__]['sheets'] == []
         assert resp['resources'][IResource.__identifier__]['super_types'] == []
@@ -813,7 +854,7 @@ class TestMetaApiView:
         resource_meta._replace(iresource=IResourceBX)
         request_.registry.content.resources_meta[IResourceBX] = resource_meta
         inst = self.make_one(request_, context)
-        resp = inst.get()
+        resp = inst.describe(request_.registry)
         assert resp['resources'][IResourceBX.__identifier__]['super_types'] ==\
             [IResourceX.__identifier__]
 
@@ -823,7 +864,7 @@ class TestMetaApiView:
         request_.registry.content.resources_meta[IResource] = resource_meta
         inst = self.make_one(request_, context)
 
-        resp = inst.get()['resources']
+        resp = inst.describe(request_.registry)['resources']
 
         wanted_sheets = [ISheet.__identifier__, ISheetB.__identifier__]
         assert wanted_sheets == resp[IResource.__identifier__]['sheets']
@@ -834,7 +875,7 @@ class TestMetaApiView:
         request_.registry.content.resources_meta[IResource] = resource_meta
         inst = self.make_one(request_, context)
 
-        resp = inst.get()['resources']
+        resp = inst.describe(request_.registry)['resources']
 
         wanted = [IResource.__identifier__, IResourceX.__identifier__]
         assert wanted == resp[IResource.__identifier__]['element_types']
@@ -844,7 +885,7 @@ class TestMetaApiView:
         request_.registry.content.resources_meta[IResource] = resource_meta
         inst = self.make_one(request_, context)
 
-        resp = inst.get()['resources']
+        resp = inst.describe(request_.registry)['resources']
 
         wanted = IResourceX.__identifier__
         assert wanted == resp[IResource.__identifier__]['item_type']
@@ -852,7 +893,7 @@ class TestMetaApiView:
     def test_get_sheets(self, request_, context, sheet_meta):
         request_.registry.content.sheets_meta[ISheet] = sheet_meta
         inst = self.make_one(request_, context)
-        response = inst.get()
+        response = inst.describe(request_.registry)
         assert ISheet.__identifier__ in response['sheets']
         assert 'fields' in response['sheets'][ISheet.__identifier__]
         assert response['sheets'][ISheet.__identifier__]['fields'] == []
@@ -864,7 +905,8 @@ class TestMetaApiView:
         sheet_meta = sheet_meta._replace(isheet=ISheetBX)
         request_.registry.content.sheets_meta[ISheetBX] = sheet_meta
         inst = self.make_one(request_, context)
-        response = inst.get()['sheets'][ISheetBX.__identifier__]
+        sheets = inst.describe(request_.registry)['sheets']
+        response = sheets[ISheetBX.__identifier__]
         assert response['super_types'] == [ISheetB.__identifier__]
 
     def test_get_sheets_with_field(self, request_, context, sheet_meta):
@@ -874,7 +916,8 @@ class TestMetaApiView:
         request_.registry.content.sheets_meta[ISheet] = sheet_meta
         inst = self.make_one(request_, context)
 
-        response = inst.get()['sheets'][ISheet.__identifier__]
+        sheets = inst.describe(request_.registry)['sheets']
+        response = sheets[ISheet.__identifier__]
 
         assert len(response['fields']) == 1
         field_metadata = response['fields'][0]
@@ -892,7 +935,8 @@ class TestMetaApiView:
         request_.registry.content.sheets_meta[ISheet] = sheet_meta
         inst = self.make_one(request_, context)
 
-        response = inst.get()['sheets'][ISheet.__identifier__]
+        sheets = inst.describe(request_.registry)['sheets']
+        response = sheets[ISheet.__identifier__]
 
         field_metadata = response['fields'][0]
         assert field_metadata['editable'] is False
@@ -907,7 +951,8 @@ class TestMetaApiView:
         request_.registry.content.sheets_meta[ISheet] = sheet_meta
         inst = self.make_one(request_, context)
 
-        response = inst.get()['sheets'][ISheet.__identifier__]
+        sheets = inst.describe(request_.registry)['sheets']
+        response = sheets[ISheet.__identifier__]
 
         field_metadata = response['fields'][0]
         assert 'containertype' not in field_metadata
@@ -922,7 +967,8 @@ class TestMetaApiView:
         request_.registry.content.sheets_meta[ISheet] = sheet_meta
         inst = self.make_one(request_, context)
 
-        sheet_metadata = inst.get()['sheets'][ISheet.__identifier__]
+        sheets = inst.describe(request_.registry)['sheets']
+        sheet_metadata = sheets[ISheet.__identifier__]
 
         field_metadata = sheet_metadata['fields'][0]
         assert field_metadata['containertype'] == 'list'
@@ -941,7 +987,8 @@ class TestMetaApiView:
         request_.registry.content.sheets_meta[ISheet] = sheet_meta
         inst = self.make_one(request_, context)
 
-        sheet_metadata = inst.get()['sheets'][ISheet.__identifier__]
+        sheets = inst.describe(request_.registry)['sheets']
+        sheet_metadata = sheets[ISheet.__identifier__]
 
         field_metadata = sheet_metadata['fields'][0]
         assert field_metadata['targetsheet'] == ISheetB.__identifier__
@@ -954,7 +1001,8 @@ class TestMetaApiView:
         sheet_meta = sheet_meta._replace(schema_class=SchemaF)
         request_.registry.content.sheets_meta[ISheet] = sheet_meta
         inst = self.make_one(request_, context)
-        sheet_metadata = inst.get()['sheets'][ISheet.__identifier__]
+        sheets = inst.describe(request_.registry)['sheets']
+        sheet_metadata = sheets[ISheet.__identifier__]
         field_metadata = sheet_metadata['fields'][0]
         assert field_metadata['valuetype'] == 'adhocracy_core.schema.Identifier'
 
@@ -966,7 +1014,8 @@ class TestMetaApiView:
         sheet_meta = sheet_meta._replace(schema_class=SchemaF)
         request_.registry.content.sheets_meta[ISheet] = sheet_meta
         inst = self.make_one(request_, context)
-        sheet_metadata = inst.get()['sheets'][ISheet.__identifier__]
+        sheets = inst.describe(request_.registry)['sheets']
+        sheet_metadata = sheets[ISheet.__identifier__]
         field_metadata = sheet_metadata['fields'][0]
         assert field_metadata['valuetype'] == 'adhocracy_core.schema.Role'
         assert field_metadata['containertype'] == 'list'
@@ -977,7 +1026,7 @@ class TestMetaApiView:
         inst = self.make_one(request_, context)
         request_.registry.content.workflows_meta['sample'] = {'states': {},
                                                               'transitions': {}}
-        workflows_meta = inst.get()['workflows']
+        workflows_meta = inst.describe(request_.registry)['workflows']
         assert workflows_meta == {'sample': {'initial_state': '',
                                              'auto_transition': 'false',
                                              'add_local_role_participant_to_default_group': 'false',
@@ -985,6 +1034,138 @@ class TestMetaApiView:
                                              'states': {},
                                              'transitions': {}}}
 
+
+    @fixture
+    def request_blank(self, registry):
+        from pyramid.request import Request
+        request = Request.blank('/api/meta_api')
+        request.registry = registry
+        return request
+
+    def test_get(self, request_blank, context, resource_meta):
+        from json import loads
+        registry = request_blank.registry
+        registry.content.resources_meta[IResource] = resource_meta
+        inst = self.make_one(request_blank, context)
+        response = inst.get()
+        assert response.status_code == 200
+        assert response.content_type == 'application/json'
+        assert loads(response.body.decode()) == inst.describe(registry)
+        assert response.etag == registry.meta_api.etag
+        assert response.vary == ('Accept-Encoding',)
+
+    def test_get_cached(self, request_blank, context, resource_meta):
+        from json import loads
+        registry = request_blank.registry
+        inst = self.make_one(request_blank, context)
+        inst.get()
+        registry.content.resources_meta[IResource] = resource_meta
+        response = inst.get()
+        assert loads(response.body.decode())['resources'] == {}
+
+    def test_get_gzip(self, request_blank, context):
+        from gzip import decompress
+        request_blank.headers['Accept-Encoding'] = 'gzip, deflate'
+        inst = self.make_one(request_blank, context)
+        response = inst.get()
+        assert response.content_encoding == 'gzip'
+        meta_api = request_blank.registry.meta_api
+        assert decompress(response.body) == meta_api.body
+
+    def test_get_not_modified(self, request_blank, context):
+        from .views import get_meta_api
+        etag = get_meta_api(request_blank.registry).etag
+        request_blank.headers['If-None-Match'] = '"{}"'.format(etag)
+        inst = self.make_one(request_blank, context)
+        response = inst.get()
+        assert response.status_code == 304
+        assert response.body == b''
+        assert response.etag == etag
+
+
+class TestCreateMetaApi:
+
+    def call_fut(self, registry):
+        from .views import create_meta_api
+        return create_meta_api(registry)
+
+    def test_create(self, registry):
+        from gzip import decompress
+        from hashlib import sha1
+        from json import loads
+        result = self.call_fut(registry)
+        assert loads(result.body.decode()) == {'resources': {},
+                                               'sheets': {},
+                                               'workflows': {}}
+        assert decompress(result.gzip_body) == result.body
+        assert result.etag == sha1(result.body).hexdigest()
+
+    def test_create_on_startup(self, registry):
+        from pyramid.events import ApplicationCreated
+        from .views import create_meta_api_on_startup
+        app = Mock(registry=registry)
+        create_meta_api_on_startup(ApplicationCreated(app))
+        assert registry.meta_api == self.call_fut(registry)
+
+class TestPrincipalsKeyView:
+
+    @fixture
+    def request_(self, config, request_):
+        config.testing_securitypolicy(userid='/user')
+        request_.authenticated_userid = '/user'
+        return request_
+
+    def make_one(self, request_, context):
+        from adhocracy_core.rest.views import PrincipalsKeyView
+        return PrincipalsKeyView(context, request_)
+
+    def test_get(self, request_, context):
+        from adhocracy_core.caching import get_principals_key
+        inst = self.make_one(request_, context)
+        key = get_principals_key(request_)
+        assert inst.get() == {'principals_key': key}
+        assert request_.response.headers['X-Principals-Key'] == key
+
+    def test_get_set_cache_headers(self, request_, context):
+        inst = self.make_one(request_, context)
+        inst.get()
+        response = request_.response
+        assert response.headers['Cache-Control'] == 'max-age=0, s-maxage=60'
+        assert response.headers['Vary'] == 'X-User-Path, X-User-Token'
+
+
+class TestAutoUpdatePlanView:
+
+    @fixture
+    def mock_plan_autoupdates(self, monkeypatch):
+        from adhocracy_core.rest import views
+        mock = Mock(spec=views.plan_autoupdates)
+        mock.return_value.to_dict.return_value = {'depth': 0}
+        monkeypatch.setattr(views, 'plan_autoupdates', mock)
+        return mock
+
+    def make_one(self, context, request_):
+        from adhocracy_core.rest.views import AutoUpdatePlanView
+        return AutoUpdatePlanView(context, request_)
+
+    def test_get(self, context, request_, mock_plan_autoupdates):
+        inst = self.make_one(context, request_)
+        assert inst.get() == {'depth': 0}
+        mock_plan_autoupdates.assert_called_with([context],
+                                                 request_.registry,
+                                                 root_versions=[])
+
+    def test_get_with_root_versions(self, context, request_,
+                                    mock_plan_autoupdates):
+        root = testing.DummyResource()
+        request_.validated['root_versions'] = [root]
+        inst = self.make_one(context, request_)
+        inst.get()
+        mock_plan_autoupdates.assert_called_with([context],
+                                                 request_.registry,
+                                                 root_versions=[root])
+
+
 class TestLoginUserName:
 
     @fixture
@@ -1,11 +1,17 @@
 """GET/POST/PUT requests processing."""
 from collections import defaultdict
+from collections import namedtuple
 from copy import deepcopy
+from gzip import compress
+from hashlib import sha1
+from json import dumps
 from logging import getLogger
 
 from substanced.util import find_service
 from substanced.stats import statsd_timer
+from pyramid.interfaces import IApplicationCreated
 from pyramid.interfaces import IRequest
+from pyramid.response import Response
 from pyramid.view import view_defaults
 from pyramid.security import remember
 from pyramid.traversal import resource_path
@@ -15,18 +21,23 @@ from zope.interface import Interface
 import colander
 
 from adhocracy_core.authentication import UserPasswordHeader
+from adhocracy_core.changelog import get_changelog
 from adhocracy_core.authentication import UserTokenHeader
 from adhocracy_core.authentication import AnonymizeHeader
+from adhocracy_core.authentication import UserPathHeader
+from adhocracy_core.caching import PrincipalsKeyHeader
+from adhocracy_core.caching import get_principals_key
 from adhocracy_core.interfaces import API_ROUTE_NAME
-from adhocracy_core.authorization import is_password_required_to_edit_some
 from adhocracy_core.authorization import is_password_required_to_edit
 from adhocracy_core.interfaces import IResource
 from adhocracy_core.interfaces import IItem
 from adhocracy_core.interfaces import IItemVersion
 from adhocracy_core.interfaces import ISimple
 from adhocracy_core.interfaces import ISheet
+from adhocracy_core.interfaces import ISheetRequirePassword
 from adhocracy_core.interfaces import IPool
 from adhocracy_core.resources.asset import IAsset
+from adhocracy_core.resources.autoupdate import plan_autoupdates
 from adhocracy_core.resources.asset import IAssetDownload
 from adhocracy_core.resources.asset import IAssetsService
 from adhocracy_core.resources.principal import IUsersService
@@ -47,6 +58,7 @@ from adhocracy_core.rest.schemas import POSTPasswordResetRequestSchema
 from adhocracy_core.rest.schemas import POSTReportAbuseViewRequestSchema
 from adhocracy_core.rest.schemas import POSTResourceRequestSchema
 from adhocracy_core.rest.schemas import PUTResourceRequestSchema
+from adhocracy_core.rest.schemas import GETAutoUpdatePlanRequestSchema
 from adhocracy_core.rest.schemas import GETPoolRequestSchema
 from adhocracy_core.rest.schemas import GETItemResponseSchema
 from adhocracy_core.rest.schemas import GETResourceResponseSchema
@@ -74,6 +86,17 @@ from adhocracy_core.workflows.schemas import create_workflow_meta_schema
 logger = getLogger(__name__)
 
 
+def _cache_permission_checks(context: IResource, request: IRequest):
+    """Return function to check permissions, check every permission once."""
+    cache = {}
+
+    def has_permission(permission: str) -> bool:
+        if permission not in cache:
+            cache[permission] = request.has_permission(permission, context)
+        return cache[permission]
+    return has_permission
+
+
 @view_defaults(
     context=IResource,
 )
@@ -101,16 +124,25 @@ class ResourceRESTView:
     def _options(self, context: IResource, request: IRequest) -> dict:
         empty = {}  # tiny performance tweak
         cstruct = deepcopy(options_resource_response_data_dict)
+        skeleton = self.content.get_options_skeleton(context)
+        has_permission = _cache_permission_checks(context, request)
 
-        if request.has_permission('edit_some', context):
-            edits = self.content.get_sheets_edit(context, request)
-            put_sheets = [(s.meta.isheet.__identifier__, empty) for s in edits]
+        if has_permission('edit_some'):
+            edits = [m for m in skeleton.sheets_edit
+                     if has_permission(m.permission_edit)]
             can_anonymize = self.content.can_edit_anonymized(context, request)
-            allow_password = is_password_required_to_edit_some(edits)
+            allow_password = any(m.isheet.isOrExtends(ISheetRequirePassword)
+                                 for m in edits)
             headers_dict = {}
-            if put_sheets:
-                put_sheets_dict = dict(put_sheets)
-                self._add_workflow_edit_permission_info(put_sheets_dict, edits)
+            if edits:
+                put_sheets_dict = dict.fromkeys(
+                    [m.isheet.__identifier__ for m in edits], empty)
+                workflow_sheets = [
+                    self.content.get_sheet(context, m.isheet, request=request)
+                    for m in edits if m.isheet.isOrExtends(IWorkflowAssignment)
+                ]
+                self._add_workflow_edit_permission_info(put_sheets_dict,
+                                                        workflow_sheets)
                 cstruct['PUT']['request_body']['data'] = put_sheets_dict
                 if can_anonymize:
                     headers_dict[AnonymizeHeader] = []
@@ -122,17 +154,18 @@ class ResourceRESTView:
         else:
             del cstruct['PUT']
 
-        if request.has_permission('view', context):
-            views = self.content.get_sheets_read(context, request)
-            get_sheets = [(s.meta.isheet.__identifier__, empty) for s in views]
+        if has_permission('view'):
+            get_sheets = [m.isheet.__identifier__ for m in skeleton.sheets_read
+                          if has_permission(m.permission_view)]
             if get_sheets:
-                cstruct['GET']['response_body']['data'] = dict(get_sheets)
+                cstruct['GET']['response_body']['data'] =\
+                    dict.fromkeys(get_sheets, empty)
             else:
                 del cstruct['GET']
         else:
             del cstruct['GET']
 
-        if request.has_permission('delete', context):
+        if has_permission('delete'):
             can_anonymize = self.content.can_delete_anonymized(context,
                                                                request)
             headers_dict = can_anonymize and {AnonymizeHeader: []} or {}
@@ -141,21 +174,18 @@ class ResourceRESTView:
             del cstruct['DELETE']
 
         is_users = IUsersService.providedBy(context) \
-            and request.has_permission('create_user', context)
+            and has_permission('create_user')
         # TODO move the is_user specific part the UsersRestView
-        if request.has_permission('create', self.context) or is_users:
-            addables = self.content.get_resources_meta_addable(context,
-                                                               request)
+        if has_permission('create') or is_users:
+            addables = [(meta, creates) for meta, creates in skeleton.addables
+                        if self.content.can_add_resource(request, meta,
+                                                         context)]
             can_anonymize = self.content.can_add_anonymized(context, request)
             if addables:
-                for resource_meta in addables:
-                    iresource = resource_meta.iresource
-                    resource_typ = iresource.__identifier__
-                    creates = self.content.get_sheets_create(context,
-                                                             request,
-                                                             iresource)
-                    sheet_typs = [s.meta.isheet.__identifier__ for s
-                                  in creates]
+                for resource_meta, creates in addables:
+                    resource_typ = resource_meta.iresource.__identifier__
+                    sheet_typs = [m.isheet.__identifier__ for m in creates
+                                  if has_permission(m.permission_create)]
                     sheets_dict = dict.fromkeys(sheet_typs, empty)
                     post_data = {'content_type': resource_typ,
                                  'data': sheets_dict}
@@ -220,7 +250,7 @@ class ResourceRESTView:
 
 def _build_updated_resources_dict(registry: Registry) -> dict:
     result = defaultdict(list)
-    for meta in registry.changelog.values():
+    for meta in get_changelog(registry).values():
         events = extract_events_from_changelog_metadata(meta)
         for event in events:
             result[event].append(meta.resource)
@@ -605,7 +635,8 @@ class MetaApiView:
         self.request = request
         self.registry = request.registry
 
-    def _describe_resources(self, resources_meta):
+    @staticmethod
+    def _describe_resources(resources_meta):
         """Build a description of the resources registered in the system.
 
         Args:
@@ -644,7 +675,8 @@ class MetaApiView:
             resource_map[to_dotted_name(iresource)] = prop_map
         return resource_map
 
-    def _describe_sheets(self, sheet_metadata):
+    @staticmethod
+    def _describe_sheets(sheet_metadata):
         """Build a description of the sheets used in the system.
 
         Args:
@@ -722,34 +754,155 @@ class MetaApiView:
 
         return sheet_map
 
-    def _describe_workflows(self, appstructs: dict) -> dict:
+    @staticmethod
+    def _describe_workflows(appstructs: dict) -> dict:
         cstructs = {}
         for name, appstruct in appstructs.items():
             schema = create_workflow_meta_schema(appstruct)
             cstructs[name] = schema.serialize(appstruct)
         return cstructs
 
-    @api_view(request_method='GET')
-    def get(self) -> dict:
-        """Get the API specification of this installation as JSON."""
+    @classmethod
+    def describe(cls, registry: Registry) -> dict:
+        """Describe the resources, sheets and workflows of this installation.
+
+        The result depends only on the `registry`, the view serves a
+        cached version, see :func:`get_meta_api`.
+        """
         # Collect info about all resources
+        resources_meta = registry.content.resources_meta
+        resource_map = cls._describe_resources(resources_meta)
+
+        # Collect info about all sheets referenced by any of the resources
+        sheet_metadata = registry.content.sheets_meta
+        sheet_map = cls._describe_sheets(sheet_metadata)
+
+        workflows_meta = registry.content.workflows_meta
+        workflows_map = cls._describe_workflows(workflows_meta)
+
+        struct = {'resources': resource_map,
+                  'sheets': sheet_map,
+                  'workflows': workflows_map,
+                  }
+        return struct
+
+    @api_view(request_method='GET')
+    def get(self) -> Response:
+        """Get the API specification of this installation as JSON.
+
+        The response has a strong ETag and is gzip encoded if the client
+        accepts it. Return 304 Not Modified if the ETag matches.
+        """
         with statsd_timer('process.get.metaapi', rate=.1,
                           registry=self.registry):
-            resources_meta = self.request.registry.content.resources_meta
-            resource_map = self._describe_resources(resources_meta)
+            meta_api = get_meta_api(self.registry)
+        response = self.request.response
+        response.etag = meta_api.etag
+        response.vary = ('Accept-Encoding',)
+        if meta_api.etag in self.request.if_none_match:
+            response.status_code = 304
+            return response
+        response.content_type = 'application/json'
+        if 'gzip' in self.request.accept_encoding:
+            response.content_encoding = 'gzip'
+            response.body = meta_api.gzip_body
+        else:
+            response.body = meta_api.body
+        return response
 
-            # Collect info about all sheets referenced by any of the resources
-            sheet_metadata = self.request.registry.content.sheets_meta
-            sheet_map = self._describe_sheets(sheet_metadata)
 
-            workflows_meta = self.request.registry.content.workflows_meta
-            workflows_map = self._describe_workflows(workflows_meta)
+MetaApi = namedtuple('MetaApi', ['body', 'gzip_body', 'etag'])
+"""JSON encoded meta api document, gzipped document and content hash."""
 
-            struct = {'resources': resource_map,
-                      'sheets': sheet_map,
-                      'workflows': workflows_map,
-                      }
-        return struct
+
+def get_meta_api(registry: Registry) -> MetaApi:
+    """Return the :class:`MetaApi` document, create it only once."""
+    meta_api = getattr(registry, 'meta_api', None)
+    if meta_api is None:
+        meta_api = create_meta_api(registry)
+        registry.meta_api = meta_api
+    return meta_api
+
+
+def create_meta_api(registry: Registry) -> MetaApi:
+    """Create :class:`MetaApi` document."""
+    struct = MetaApiView.describe(registry)
+    body = dumps(struct, sort_keys=True).encode()
+    etag = sha1(body).hexdigest()
+    return MetaApi(body=body, gzip_body=compress(body), etag=etag)
+
+
+def create_meta_api_on_startup(event):
+    """Create the :class:`MetaApi` document when the application starts.
+
+    :param event: this function should be used as a subscriber for the
+                  :class:`pyramid.interfaces.IApplicationCreated` event.
+    """
+    registry = event.app.registry
+    registry.meta_api = create_meta_api(registry)
+
+
+@view_defaults(
+    context=IRootPool,
+    name='principals_key',
+)
+class PrincipalsKeyView:
+    """Return the principals key of the current user.
+
+    A caching proxy sets this key as `X-Principals-Key` request header to
+    share cached responses between users with the same principals, see
+    :class:`adhocracy_core.interfaces.HTTPCacheKeyMode`.
+    """
+
+    def __init__(self, context: IRootPool, request: IRequest):
+        self.context = context
+        self.request = request
+        self.registry = request.registry
+
+    @api_view(request_method='GET')
+    def get(self) -> dict:
+        """Get the principals key and set the `X-Principals-Key` header."""
+        key = get_principals_key(self.request)
+        response = self.request.response
+        response.headers[PrincipalsKeyHeader] = key
+        settings = self.registry['config']
+        max_age = settings.adhocracy.caching_principals_key_max_age
+        response.cache_control.max_age = 0
+        response.cache_control.s_max_age = max_age
+        response.vary = (UserPathHeader, UserTokenHeader)
+        return {'principals_key': key}
+
+
+@view_defaults(
+    context=IItemVersion,
+    name='autoupdate_plan',
+)
+class AutoUpdatePlanView:
+    """Return resources autoupdated if the context gets a new version.
+
+    This is a dry-run to debug autoupdate cascades, nothing is modified.
+    The query parameter `root_versions` (json list of resource urls) works
+    like the `root_versions` of POST requests, see
+    :mod:`adhocracy_core.resources.autoupdate`.
+    """
+
+    def __init__(self, context: IItemVersion, request: IRequest):
+        self.context = context
+        self.request = request
+        self.registry = request.registry
+
+    @api_view(
+        request_method='GET',
+        schema=GETAutoUpdatePlanRequestSchema,
+        permission='sdi.view',
+    )
+    def get(self) -> dict:
+        """Get the depth and paths of autoupdated resources."""
+        root_versions = self.request.validated.get('root_versions', [])
+        plan = plan_autoupdates([self.context],
+                                self.registry,
+                                root_versions=root_versions)
+        return plan.to_dict()
 
 
 def _get_base_ifaces(iface: IInterface, root_iface=Interface) -> [str]:
@@ -1044,3 +1197,4 @@ class LoginServiceKontoView:
 def includeme(config):
     """Register Views."""
     config.scan('.views')
+    config.add_subscriber(create_meta_api_on_startup, IApplicationCreated)
@@ -2,6 +2,7 @@
 from collections import Sequence
 from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 import decimal
 import io
 import json
@@ -89,6 +90,38 @@ class SchemaNode(colander.SchemaNode):
             return None
         return super().serialize(appstruct)
 
+    def _bind(self, kw: dict):
+        """Resolve deferred values, used by :meth:`bind`.
+
+        The names of deferred class attributes are only computed once per
+        class, :meth:`colander.SchemaNode._bind` has to inspect all
+        attributes of every node instead.
+        """
+        self.bindings = kw
+        for child in self.children:
+            child._bind(kw)
+        for name in _get_deferred_names(self):
+            value = getattr(self, name)
+            if isinstance(value, deferred):
+                setattr(self, name, value(self, kw))
+        if getattr(self, 'after_bind', None):
+            self.after_bind(self, kw)
+
+
+def _get_deferred_names(node: colander.SchemaNode) -> [str]:
+    names = _get_deferred_class_names(node.__class__)
+    instance_names = [k for k, v in node.__dict__.items()
+                      if isinstance(v, deferred)]
+    if instance_names:
+        names = sorted(set(names).union(instance_names))
+    return names
+
+
+@lru_cache(maxsize=None)
+def _get_deferred_class_names(cls: type) -> tuple:
+    return tuple(k for k in dir(cls)
+                 if isinstance(getattr(cls, k, None), deferred))
+
 
 class SequenceSchema(colander.SequenceSchema, SchemaNode):
     """Subclass of :class: `SchemaNode` with Sequence type.
@@ -326,11 +359,21 @@ class InterfaceType(SchemaType):
         if value in (null, ''):
             return value
         try:
-            return DottedNameResolver().resolve(value)
+            return _resolve_dotted_name(node, value)
         except Exception as err:
             raise Invalid(node, msg=str(err), value=value)
 
 
+def _resolve_dotted_name(node: SchemaNode, value: str) -> object:
+    """Resolve with the content registry if `node` is bound to a registry."""
+    bindings = getattr(node, 'bindings', None) or {}
+    registry = bindings.get('registry', None)
+    content = getattr(registry, 'content', None)
+    if content is None or not isinstance(value, str):
+        return DottedNameResolver().resolve(value)
+    return content.resolve(value)
+
+
 class Interface(SchemaNode):
 
     schema_type = InterfaceType
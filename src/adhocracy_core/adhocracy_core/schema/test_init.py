@@ -80,6 +80,37 @@ class AdhocracySchemaNodeUnitTest(unittest.TestCase):
         with raises(colander.Invalid):
             inst.deserialize('1')
 
+    def test_bind_resolve_deferred_class_attributes(self):
+        from adhocracy_core.schema import SchemaNode
+
+        class ExampleNode(SchemaNode):
+            @colander.deferred
+            def default(node, kw):
+                return kw['default']
+        inst = ExampleNode(colander.String())
+        bound = inst.bind(default='x')
+        assert bound.default == 'x'
+        assert bound.bindings == {'default': 'x'}
+        assert isinstance(inst.default, colander.deferred)
+
+    def test_bind_resolve_deferred_instance_attributes(self):
+        from adhocracy_core.schema import MappingSchema
+        from adhocracy_core.schema import SchemaNode
+        deferred_missing = colander.deferred(lambda node, kw: kw['missing'])
+        inst = MappingSchema()
+        inst.add(SchemaNode(colander.String(), name='child',
+                            missing=deferred_missing))
+        bound = inst.bind(missing='x')
+        assert bound['child'].missing == 'x'
+        assert bound['child'].bindings == {'missing': 'x'}
+        assert inst['child'].missing is deferred_missing
+
+    def test_bind_call_after_bind(self):
+        after_bind = Mock()
+        inst = self.make_one(colander.String(), after_bind=after_bind)
+        bound = inst.bind(a=1)
+        after_bind.assert_called_with(bound, {'a': 1})
+
 
 class TestSequenceSchema:
 
@@ -181,6 +212,16 @@ class TestInterface():
         with raises(colander.Invalid):
             inst.deserialize(None, 'adhocracy_core.sheets.tags.NoSuchTag')
 
+    def test_deserialize_with_content_registry(self, inst):
+        from adhocracy_core.sheets.tags import ITag
+        registry = Mock()
+        registry.content.resolve.return_value = ITag
+        node = colander.SchemaNode(inst).bind(registry=registry)
+        result = inst.deserialize(node, 'adhocracy_core.sheets.tags.ITag')
+        assert result == ITag
+        registry.content.resolve.assert_called_with(
+            'adhocracy_core.sheets.tags.ITag')
+
 
 class TestName:
 
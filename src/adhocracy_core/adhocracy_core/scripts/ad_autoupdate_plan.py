@@ -0,0 +1,53 @@
+"""Script to show the resources autoupdated by a new item version.
+
+This is a dry-run, nothing is modified. See
+:mod:`adhocracy_core.resources.autoupdate` for more information.
+"""
+import argparse
+import inspect
+
+from pyramid.paster import bootstrap
+from pyramid.traversal import find_resource
+from pyramid.traversal import resource_path
+
+from adhocracy_core.resources.autoupdate import AutoUpdatePlan
+from adhocracy_core.resources.autoupdate import plan_autoupdates
+
+
+def main():  # pragma: no cover
+    """Show resources autoupdated if a version gets a new version."""
+    docstring = inspect.getdoc(main)
+    parser = argparse.ArgumentParser(description=docstring)
+    parser.add_argument('ini_file',
+                        help='path to the adhocracy backend ini file')
+    parser.add_argument('version_path',
+                        help='path of the item version that gets a new '
+                             'version')
+    parser.add_argument('-r',
+                        '--root_versions',
+                        help='paths of the root versions, only resources '
+                             'in their subtree are autoupdated',
+                        nargs='*',
+                        default=[])
+    args = parser.parse_args()
+    env = bootstrap(args.ini_file)
+    root = env['root']
+    version = find_resource(root, args.version_path)
+    root_versions = [find_resource(root, x) for x in args.root_versions]
+    plan = plan_autoupdates([version],
+                            env['registry'],
+                            root_versions=root_versions)
+    print(format_plan(plan))
+    env['closer']()
+
+
+def format_plan(plan: AutoUpdatePlan) -> str:
+    """Return one line per autoupdated resource and a summary."""
+    lines = ['{0} {1} {2}:{3}'.format(x.depth,
+                                      resource_path(x.resource),
+                                      x.isheet.__identifier__,
+                                      x.isheet_field)
+             for x in plan.updates]
+    lines.append('versions: {0}, resources: {1}, depth: {2}'
+                 .format(len(plan.versions), len(plan.resources), plan.depth))
+    return '\n'.join(lines)
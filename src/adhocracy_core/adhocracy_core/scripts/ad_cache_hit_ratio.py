@@ -0,0 +1,138 @@
+r"""Script to compare proxy cache hit ratios of the caching key modes.
+
+Replays recorded GET requests and simulates a shared proxy cache keyed by
+user or by principals key, see
+:class:`adhocracy_core.interfaces.HTTPCacheKeyMode`.
+Cache invalidation is ignored, so the ratios are upper bounds.
+
+The recorded traffic is a text file with one request per line:
+the `X-User-Path` header (empty for anonymous requests) and the request
+path, separated by a tab. For example with varnish::
+
+    varnishncsa -q 'ReqMethod eq "GET"' -F '%{X-User-Path}i\t%U'
+"""
+from collections import OrderedDict
+from urllib.parse import urlparse
+import argparse
+import inspect
+import logging
+
+from pyramid.paster import bootstrap
+from pyramid.request import Request
+from pyramid.security import Authenticated
+from pyramid.security import Everyone
+from pyramid.traversal import find_resource
+
+from adhocracy_core.caching import hash_principals
+from adhocracy_core.caching import is_user_specific_for
+from adhocracy_core.interfaces import HTTPCacheKeyMode
+from adhocracy_core.interfaces import IResource
+from adhocracy_core.resources.principal import groups_and_roles_finder
+
+
+logger = logging.getLogger(__name__)
+
+
+def main():  # pragma: no cover
+    """Compare proxy cache hit ratios of the caching key modes."""
+    docstring = inspect.getdoc(main)
+    parser = argparse.ArgumentParser(description=docstring)
+    parser.add_argument('ini_file',
+                        help='path to the adhocracy backend ini file')
+    parser.add_argument('traffic_file',
+                        help='path to the recorded traffic file, one request '
+                             'per line: <X-User-Path header>\\t<path>')
+    parser.add_argument('-s',
+                        '--cache_size',
+                        help='max number of cached responses, '
+                             'default: unlimited',
+                        default=None,
+                        type=int)
+    args = parser.parse_args()
+    env = bootstrap(args.ini_file)
+    settings = env['registry'].settings
+    api_prefix = settings.get('adhocracy.api_prefix', '/api')
+    with open(args.traffic_file) as traffic:
+        records = read_records(traffic, api_prefix)
+        ratios = get_hit_ratios(env['root'],
+                                env['request'],
+                                records,
+                                cache_size=args.cache_size)
+    for mode, ratio in ratios.items():
+        print('{0}: {1:.1%}'.format(mode, ratio))
+    env['closer']()
+
+
+def read_records(lines: iter, api_prefix: str='/api') -> iter:
+    """Return (userid, path) tuples for the recorded traffic `lines`."""
+    for line in lines:
+        line = line.rstrip('\n')
+        if not line:
+            continue
+        user_url, url = line.split('\t')
+        userid = _to_path(user_url, api_prefix) if user_url else None
+        yield userid, _to_path(url, api_prefix)
+
+
+def _to_path(url: str, api_prefix: str) -> str:
+    path = urlparse(url).path
+    if path.startswith(api_prefix):
+        path = path[len(api_prefix):]
+    return path or '/'
+
+
+def get_hit_ratios(root: IResource,
+                   request: Request,
+                   records: iter,
+                   cache_size: int=None) -> dict:
+    """Return proxy cache hit ratio for every :class:`HTTPCacheKeyMode`."""
+    request.root = root
+    request.context = root
+    caches = {mode: _LRUCache(cache_size) for mode in HTTPCacheKeyMode}
+    principals_keys = {}
+    count = 0
+    for userid, path in records:
+        try:
+            context = find_resource(root, path)
+        except KeyError:
+            logger.debug('Ignore not existing resource {}'.format(path))
+            continue
+        count += 1
+        if userid not in principals_keys:
+            principals_keys[userid] = _get_principals_key(userid, request)
+        caches[HTTPCacheKeyMode.userid].lookup((path, userid))
+        if userid is None or is_user_specific_for(context, userid,
+                                                  request.registry):
+            key = userid
+        else:
+            key = principals_keys[userid]
+        caches[HTTPCacheKeyMode.principals].lookup((path, key))
+    return {mode.name: cache.hits / count if count else 0
+            for mode, cache in caches.items()}
+
+
+def _get_principals_key(userid: str, request: Request) -> str:
+    groups_and_roles = None
+    if userid is not None:
+        groups_and_roles = groups_and_roles_finder(userid, request)
+    if groups_and_roles is None:  # not authenticated
+        return hash_principals([Everyone])
+    principals = [Everyone, Authenticated, userid] + groups_and_roles
+    return hash_principals(principals, userid)
+
+
+class _LRUCache:
+
+    def __init__(self, size: int=None):
+        self.size = size
+        self.hits = 0
+        self._keys = OrderedDict()
+
+    def lookup(self, key):
+        if key in self._keys:
+            self.hits += 1
+            self._keys.move_to_end(key)
+            return
+        self._keys[key] = True
+        if self.size is not None and len(self._keys) > self.size:
+            self._keys.popitem(last=False)
@@ -0,0 +1,80 @@
+"""Script to list the objects with the most write conflicts.
+
+Reads the backend log file with the conflict warnings written by
+:mod:`adhocracy_core.stats.conflicts`.
+"""
+from collections import Counter
+from collections import namedtuple
+import argparse
+import inspect
+
+from adhocracy_core.stats.conflicts import LOG_PATTERN
+
+
+class HotObject(namedtuple('HotObject',
+                           'oid class_name conflicts retries request_types')):
+    """Object with write conflicts.
+
+    Fields:
+    -------
+
+    oid:
+        Object id of the conflicting object.
+    class_name:
+        Dotted name of its class.
+    conflicts:
+        Number of conflicts.
+    retries:
+        Number of conflicts that were retried.
+    request_types:
+        :class:`collections.Counter` with the conflicts per request type.
+    """
+
+
+def main():  # pragma: no cover
+    """List the objects with the most write conflicts in a log file."""
+    docstring = inspect.getdoc(main)
+    parser = argparse.ArgumentParser(description=docstring)
+    parser.add_argument('log_file',
+                        help='path to the adhocracy backend log file')
+    parser.add_argument('-n',
+                        '--limit',
+                        help='number of objects to list, default: 20',
+                        default=20,
+                        type=int)
+    args = parser.parse_args()
+    with open(args.log_file) as lines:
+        hot_objects = summarize_conflicts(lines)
+    print(format_summary(hot_objects[:args.limit]))
+
+
+def summarize_conflicts(lines: iter) -> [HotObject]:
+    """Return objects with write conflicts, most conflicts first."""
+    conflicts = Counter()
+    retries = Counter()
+    request_types = {}
+    for line in lines:
+        match = LOG_PATTERN.search(line)
+        if match is None:
+            continue
+        key = (match.group('oid'), match.group('class_name'))
+        conflicts[key] += 1
+        if match.group('retry') == 'True':
+            retries[key] += 1
+        request_types.setdefault(key, Counter())
+        request_types[key][match.group('request_type')] += 1
+    return [HotObject(oid, class_name, count, retries[(oid, class_name)],
+                      request_types[(oid, class_name)])
+            for (oid, class_name), count in conflicts.most_common()]
+
+
+def format_summary(hot_objects: [HotObject]) -> str:
+    """Return one line per object and its request types."""
+    lines = []
+    for hot in hot_objects:
+        lines.append('{0} {1}: {2} conflicts, {3} retries'
+                     .format(hot.oid, hot.class_name, hot.conflicts,
+                             hot.retries))
+        for request_type, count in hot.request_types.most_common():
+            lines.append('  {0}: {1}'.format(request_type, count))
+    return '\n'.join(lines)
@@ -4,14 +4,17 @@ import transaction
 import argparse
 import inspect
 import logging
+import sys
 
 from pyramid.paster import bootstrap
+from pyramid.traversal import get_current_registry
 from substanced.util import find_service
 
 from adhocracy_core.interfaces import Reference
 from adhocracy_core.interfaces import search_query
 from adhocracy_core.interfaces import FieldComparator
 from adhocracy_core.resources.image import IImage
+from adhocracy_core.resources.pool import remove_resources
 from adhocracy_core.sheets.image import IImageReference
 from adhocracy_core.utils import now
 
@@ -31,10 +34,18 @@ def main():  # pragma: no cover
                         help='Max age in days of images',
                         default=30,
                         type=int)
+    parser.add_argument('-c',
+                        '--chunk_size',
+                        help='number of images to delete per transaction',
+                        default=1000,
+                        type=int)
     args = parser.parse_args()
     env = bootstrap(args.ini_file)
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
     delete_not_referenced_images(env['root'],
                                  args.max_age,
+                                 chunk_size=args.chunk_size,
+                                 commit=True,
                                  )
     transaction.commit()
     env['closer']()
@@ -42,8 +53,14 @@ def main():  # pragma: no cover
 
 def delete_not_referenced_images(root,
                                  max_age: int,
+                                 chunk_size: int=1000,
+                                 commit: bool=False,
                                  ):
-    """Delete images older than `max_age` that are not referenced."""
+    """Delete images older than `max_age` that are not referenced.
+
+    :param chunk_size: number of images to delete per batch
+    :param commit: commit the transaction after every chunk
+    """
     catalogs = find_service(root, 'catalogs')
     max_date = now() - timedelta(days=max_age)
     query = search_query._replace(interfaces=IImage,
@@ -55,6 +72,7 @@ def delete_not_referenced_images(root,
     images = catalogs.search(query).elements
     msg = 'Found {0} images older then {1} days'.format(len(images), max_age)
     logger.info(msg)
+    deleted = []
     for image in images:
         picture_reference = Reference(None, IImageReference, '', image)
         query = search_query._replace(references=(picture_reference,))
@@ -62,4 +80,7 @@ def delete_not_referenced_images(root,
         if referencing.count > 0:
             msg = 'Deleting image {0} that is not referenced'.format(image)
             logger.info(msg)
-            del image.__parent__[image.__name__]
+            deleted.append(image)
+    remove_resources(deleted, get_current_registry(root),
+                     chunk_size=chunk_size,
+                     commit=commit)
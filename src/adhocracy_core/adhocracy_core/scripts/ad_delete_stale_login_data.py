@@ -3,6 +3,7 @@ import transaction
 import argparse
 import inspect
 import logging
+import sys
 
 from pyramid.paster import bootstrap
 from pyramid.request import Request
@@ -30,12 +31,20 @@ def main():  # pragma: no cover
                         help='Max age in days for not activated users',
                         default=60,
                         type=int)
+    parser.add_argument('-c',
+                        '--chunk_size',
+                        help='number of resources to delete per transaction',
+                        default=1000,
+                        type=int)
     args = parser.parse_args()
     env = bootstrap(args.ini_file)
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
     delete_stale_login_data(env['root'],
                             env['request'],
                             args.resets_max_age,
                             args.not_active_users_max_age,
+                            chunk_size=args.chunk_size,
+                            commit=True,
                             )
     transaction.commit()
     env['closer']()
@@ -45,8 +54,18 @@ def delete_stale_login_data(root,
                             request: Request,
                             not_active_users_max_age: int,
                             resets_max_age: int,
+                            chunk_size: int=1000,
+                            commit: bool=False,
                             ):
-    """Remove expired login tokens, not active users, old password resets."""
+    """Remove expired login tokens, not active users, old password resets.
+
+    :param chunk_size: number of resources to delete per batch
+    :param commit: commit the transaction after every chunk
+    """
     request.root = root
-    delete_not_activated_users(request, not_active_users_max_age)
-    delete_password_resets(request, resets_max_age)
+    delete_not_activated_users(request, not_active_users_max_age,
+                               chunk_size=chunk_size,
+                               commit=commit)
+    delete_password_resets(request, resets_max_age,
+                           chunk_size=chunk_size,
+                           commit=commit)
@@ -0,0 +1,224 @@
+"""Script to reindex catalog indexes in chunks.
+
+Unlike :meth:`adhocracy_core.catalog.CatalogsServiceAdhocracy.reindex_all`
+this does not reindex in one big transaction: the indexed docids are
+processed in chunks, every chunk is committed and the ZODB object cache is
+minimized afterwards. The last reindexed docid of every index is written
+to a checkpoint file, so an interrupted reindex can be resumed.
+"""
+from multiprocessing import Pool
+import argparse
+import inspect
+import logging
+import os
+import time
+
+from pyramid.paster import bootstrap
+from substanced.interfaces import MODE_IMMEDIATE
+from substanced.util import find_objectmap
+from substanced.util import find_service
+from ZODB.POSException import ConflictError
+import transaction
+
+from adhocracy_core.interfaces import IResource
+
+
+logger = logging.getLogger(__name__)
+
+
+def main():  # pragma: no cover
+    """Reindex catalog indexes in chunks, resume if interrupted."""
+    docstring = inspect.getdoc(main)
+    parser = argparse.ArgumentParser(description=docstring)
+    parser.add_argument('ini_file',
+                        help='path to the adhocracy backend ini file')
+    parser.add_argument('-i',
+                        '--index',
+                        help='name of the index to reindex, can be given '
+                             'multiple times, default: all indexes',
+                        action='append',
+                        default=[])
+    parser.add_argument('-c',
+                        '--chunk_size',
+                        help='number of objects to reindex per transaction',
+                        default=1000,
+                        type=int)
+    parser.add_argument('-d',
+                        '--checkpoint_dir',
+                        help='directory to store the reindex progress, '
+                             'run again with the same directory to resume',
+                        default=None)
+    parser.add_argument('-w',
+                        '--workers',
+                        help='number of processes, every process reindexes '
+                             'one index at a time',
+                        default=1,
+                        type=int)
+    args = parser.parse_args()
+    if args.workers > 1:
+        _reindex_with_workers(args.ini_file,
+                              args.index,
+                              args.chunk_size,
+                              args.checkpoint_dir,
+                              args.workers)
+    else:
+        _reindex_worker((args.ini_file,
+                         args.index,
+                         args.chunk_size,
+                         args.checkpoint_dir))
+
+
+def _reindex_with_workers(ini_file: str,
+                          index_names: [str],
+                          chunk_size: int,
+                          checkpoint_dir: str,
+                          workers: int):  # pragma: no cover
+    env = bootstrap(ini_file)
+    catalogs = find_service(env['root'], 'catalogs')
+    if not index_names:
+        index_names = [name for name, index in _get_indexes(catalogs)]
+    env['closer']()
+    jobs = [(ini_file, [x], chunk_size, checkpoint_dir) for x in index_names]
+    with Pool(processes=workers) as pool:
+        counts = pool.map(_reindex_worker, jobs)
+    logger.info('Reindexed {0} objects'.format(sum(counts)))
+
+
+def _reindex_worker(job: tuple) -> int:  # pragma: no cover
+    ini_file, index_names, chunk_size, checkpoint_dir = job
+    env = bootstrap(ini_file)
+    count = reindex_catalogs(env['root'],
+                             index_names=index_names,
+                             chunk_size=chunk_size,
+                             checkpoint_dir=checkpoint_dir,
+                             )
+    env['closer']()
+    return count
+
+
+def reindex_catalogs(root: IResource,
+                     index_names: [str]=None,
+                     chunk_size: int=1000,
+                     checkpoint_dir: str=None,
+                     ) -> int:
+    """Reindex catalog indexes in chunks and commit after every chunk.
+
+    :param index_names: names of the indexes to reindex, default: all
+    :param chunk_size: number of objects to reindex per transaction
+    :param checkpoint_dir: directory to store the last reindexed docid
+        for every index. Finished indexes have no checkpoint file.
+    :return: number of reindexed objects
+    :raises KeyError: if an index in `index_names` does not exist
+    """
+    catalogs = find_service(root, 'catalogs')
+    indexes = _get_indexes(catalogs, index_names)
+    count = 0
+    for name, index in indexes:
+        count += _reindex_index(root, name, index, chunk_size, checkpoint_dir)
+    catalogs.increment_modification_count()
+    transaction.commit()
+    return count
+
+
+def _get_indexes(catalogs, index_names: [str]=None) -> [tuple]:
+    if not index_names:
+        return [(name, index) for catalog in catalogs.values()
+                for name, index in catalog.items()]
+    indexes = []
+    for name in index_names:
+        index = catalogs.get_index(name)
+        if index is None:
+            msg = 'catalog index {0} does not exist.'.format(name)
+            raise KeyError(msg)
+        indexes.append((name, index))
+    return indexes
+
+
+def _reindex_index(root: IResource, name: str, index, chunk_size: int,
+                   checkpoint_dir: str=None) -> int:
+    """Reindex all docids indexed by the catalog of `index` in chunks."""
+    objectmap = find_objectmap(root)
+    catalog = index.__parent__
+    checkpoint = _get_checkpoint_file(checkpoint_dir, catalog, name)
+    last_docid = _load_checkpoint(checkpoint)
+    count = 0
+    start = time.time()
+    while True:
+        docids = _get_next_docids(catalog, last_docid, chunk_size)
+        if not docids:
+            break
+        _reindex_chunk_and_commit(objectmap, index, docids)
+        last_docid = docids[-1]
+        _save_checkpoint(checkpoint, last_docid)
+        _minimize_cache(root)
+        count += len(docids)
+        rate = count / max(time.time() - start, 0.001)
+        logger.info('Reindexed {0} objects of index {1} ({2:.0f} objects/sec)'
+                    .format(count, name, rate))
+    _remove_checkpoint(checkpoint)
+    return count
+
+
+def _get_next_docids(catalog, last_docid: int, chunk_size: int) -> [int]:
+    if last_docid is None:
+        keys = catalog.objectids.keys()
+    else:
+        keys = catalog.objectids.keys(min=last_docid, excludemin=True)
+    docids = []
+    for docid in keys:
+        docids.append(docid)
+        if len(docids) >= chunk_size:
+            break
+    return docids
+
+
+def _reindex_chunk_and_commit(objectmap, index, docids: [int], attempts=3):
+    for attempt in range(attempts):
+        for docid in docids:
+            resource = objectmap.object_for(docid)
+            if resource is None:  # the catalog is not up to date
+                continue
+            index.reindex_resource(resource, oid=docid,
+                                   action_mode=MODE_IMMEDIATE)
+        try:
+            transaction.commit()
+            return
+        except ConflictError:
+            transaction.abort()
+            if attempt == attempts - 1:
+                raise
+            logger.warning('Conflict error, retry chunk')
+
+
+def _minimize_cache(root: IResource):
+    connection = getattr(root, '_p_jar', None)
+    if connection is not None:
+        connection.cacheMinimize()
+
+
+def _get_checkpoint_file(checkpoint_dir: str, catalog, name: str) -> str:
+    if checkpoint_dir is None:
+        return None
+    file_name = '{0}.{1}.checkpoint'.format(catalog.__name__, name)
+    return os.path.join(checkpoint_dir, file_name)
+
+
+def _load_checkpoint(checkpoint: str) -> int:
+    if checkpoint is None or not os.path.exists(checkpoint):
+        return None
+    with open(checkpoint) as f:
+        last_docid = int(f.read().strip())
+    logger.info('Resume reindex after docid {0}'.format(last_docid))
+    return last_docid
+
+
+def _save_checkpoint(checkpoint: str, last_docid: int):
+    if checkpoint is None:
+        return
+    with open(checkpoint, 'w') as f:
+        f.write(str(last_docid))
+
+
+def _remove_checkpoint(checkpoint: str):
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.remove(checkpoint)
@@ -0,0 +1,38 @@
+"""Script to store the users in multiple BTrees.
+
+This reduces write conflicts of concurrent registrations, see
+:mod:`adhocracy_core.resources.sharding` for more information.
+"""
+import argparse
+import inspect
+
+from pyramid.paster import bootstrap
+from substanced.util import find_service
+import transaction
+
+from adhocracy_core.interfaces import IResource
+from adhocracy_core.resources.sharding import shard_pool
+
+
+def main():  # pragma: no cover
+    """Move the users to multiple BTrees, userids do not change."""
+    docstring = inspect.getdoc(main)
+    parser = argparse.ArgumentParser(description=docstring)
+    parser.add_argument('ini_file',
+                        help='path to the adhocracy backend ini file')
+    parser.add_argument('-s',
+                        '--shards',
+                        help='number of BTrees',
+                        default=16,
+                        type=int)
+    args = parser.parse_args()
+    env = bootstrap(args.ini_file)
+    shard_users(env['root'], args.shards)
+    transaction.commit()
+    env['closer']()
+
+
+def shard_users(root: IResource, shards: int):
+    """Move the children of the users service to `shards` BTrees."""
+    users = find_service(root, 'principals', 'users')
+    shard_pool(users, shards=shards)
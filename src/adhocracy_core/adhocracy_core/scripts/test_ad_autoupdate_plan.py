@@ -0,0 +1,21 @@
+from pyramid import testing
+
+
+def test_format_plan_empty():
+    from adhocracy_core.resources.autoupdate import AutoUpdatePlan
+    from .ad_autoupdate_plan import format_plan
+    plan = AutoUpdatePlan()
+    assert format_plan(plan) == 'versions: 0, resources: 0, depth: 0'
+
+
+def test_format_plan():
+    from adhocracy_core.interfaces import ISheet
+    from adhocracy_core.resources.autoupdate import AutoUpdate
+    from adhocracy_core.resources.autoupdate import AutoUpdatePlan
+    from .ad_autoupdate_plan import format_plan
+    plan = AutoUpdatePlan()
+    resource = testing.DummyResource(__name__='resource')
+    plan.updates.append(AutoUpdate(resource, ISheet, 'elements', 1))
+    assert format_plan(plan) == \
+        '1 resource adhocracy_core.interfaces.ISheet:elements\n'\
+        'versions: 0, resources: 1, depth: 1'
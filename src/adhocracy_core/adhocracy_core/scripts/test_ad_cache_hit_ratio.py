@@ -0,0 +1,83 @@
+from pyramid import testing
+from pytest import fixture
+
+
+def test_read_records():
+    from .ad_cache_hit_ratio import read_records
+    lines = ['\t/api/\n',
+             'http://localhost/api/principals/users/1/\t/api/process/\n',
+             '\n']
+    assert list(read_records(lines)) == [
+        (None, '/'),
+        ('/principals/users/1/', '/process/'),
+    ]
+
+
+class TestGetHitRatios:
+
+    @fixture
+    def root(self, pool):
+        pool['process'] = testing.DummyResource()
+        return pool
+
+    @fixture
+    def mock_groupfinder(self, monkeypatch):
+        from . import ad_cache_hit_ratio
+        groups = {'/user1': ['group:a'],
+                  '/user2': ['group:a'],
+                  '/user3': ['group:b'],
+                  }
+        monkeypatch.setattr(ad_cache_hit_ratio, 'groups_and_roles_finder',
+                            lambda userid, request: groups.get(userid))
+
+    def call_fut(self, *args, **kwargs):
+        from .ad_cache_hit_ratio import get_hit_ratios
+        return get_hit_ratios(*args, **kwargs)
+
+    def test_no_records(self, root, request_):
+        assert self.call_fut(root, request_, []) == {'userid': 0,
+                                                     'principals': 0}
+
+    def test_share_responses_between_users_with_same_principals(
+            self, root, request_, mock_groupfinder):
+        records = [('/user1', '/process'),
+                   ('/user2', '/process'),
+                   ('/user3', '/process'),
+                   (None, '/process'),
+                   ]
+        ratios = self.call_fut(root, request_, records)
+        assert ratios == {'userid': 0, 'principals': 0.25}
+
+    def test_dont_share_responses_if_user_has_local_roles(
+            self, root, request_, mock_groupfinder):
+        root['process'].__local_roles__ = {'/user1': {'role:creator'}}
+        records = [('/user1', '/process'),
+                   ('/user2', '/process'),
+                   ]
+        ratios = self.call_fut(root, request_, records)
+        assert ratios['principals'] == 0
+
+    def test_dont_share_pool_listings_filtered_by_view_permission(
+            self, root, request_, mock_groupfinder):
+        records = [('/user1', '/'),
+                   ('/user2', '/'),
+                   ]
+        ratios = self.call_fut(root, request_, records)
+        assert ratios['principals'] == 0
+
+    def test_ignore_not_existing_resources(self, root, request_):
+        records = [(None, '/process'),
+                   (None, '/wrong'),
+                   (None, '/process'),
+                   ]
+        ratios = self.call_fut(root, request_, records)
+        assert ratios == {'userid': 0.5, 'principals': 0.5}
+
+    def test_cache_size(self, root, request_):
+        root['other'] = testing.DummyResource()
+        records = [(None, '/process'),
+                   (None, '/other'),
+                   (None, '/process'),
+                   ]
+        ratios = self.call_fut(root, request_, records, cache_size=1)
+        assert ratios == {'userid': 0, 'principals': 0}
@@ -0,0 +1,41 @@
+from pytest import fixture
+
+
+@fixture
+def lines():
+    prefix = '2016-01-01 12:00:00,000 WARNI [adhocracy_core.stats.conflicts]' \
+             '[waitress] '
+    return [
+        prefix + 'Write conflict request_type=post.IComments oid=0x2a'
+                 ' class=BTrees.OOBTree.OOBucket attempt=1 retry=True\n',
+        prefix + 'Write conflict request_type=post.batch oid=0x2a'
+                 ' class=BTrees.OOBTree.OOBucket attempt=1 retry=False\n',
+        'other log line\n',
+        prefix + 'Write conflict request_type=put.IProposal oid=0x01'
+                 ' class=BTrees.Length.Length attempt=1 retry=True\n',
+    ]
+
+
+def test_summarize_conflicts(lines):
+    from .ad_conflicts_summary import summarize_conflicts
+    hot_objects = summarize_conflicts(lines)
+    assert [x.oid for x in hot_objects] == ['0x2a', '0x01']
+    first = hot_objects[0]
+    assert first.class_name == 'BTrees.OOBTree.OOBucket'
+    assert first.conflicts == 2
+    assert first.retries == 1
+    assert first.request_types == {'post.IComments': 1, 'post.batch': 1}
+
+
+def test_summarize_conflicts_empty():
+    from .ad_conflicts_summary import summarize_conflicts
+    assert summarize_conflicts(['other log line\n']) == []
+
+
+def test_format_summary(lines):
+    from .ad_conflicts_summary import format_summary
+    from .ad_conflicts_summary import summarize_conflicts
+    text = format_summary(summarize_conflicts(lines))
+    assert text.splitlines()[0] == \
+        '0x2a BTrees.OOBTree.OOBucket: 2 conflicts, 1 retries'
+    assert '  post.batch: 1' in text
@@ -66,15 +66,15 @@ class TestDeleteNotReferencedImages:
         assert 'image' in context
 
     def test_delete_images_not_referenced_and_older_then_max_age(
-            self, context, mock_catalogs, search_result):
+            self, context, pool, mock_catalogs, search_result):
         image = testing.DummyResource()
-        context['image'] = image
+        pool.add('image', image)
         referencing = testing.DummyResource(__parent__=context)
         mock_catalogs.search.side_effect = [
             search_result._replace(elements=[image]),
             search_result._replace(elements=[referencing],
                                    count=1)]
         self.call_fut(context, 10)
-        assert 'image' not in context
+        assert 'image' not in pool
 
 
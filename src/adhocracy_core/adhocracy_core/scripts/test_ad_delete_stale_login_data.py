@@ -48,9 +48,19 @@ class TestDeleteStaleLoginData:
             self, context, request_, mock_delete_users, mock_delete_resets):
         self.call_fut(context, request_, 30, 10)
         assert request_.root == context
-        mock_delete_users.assert_called_with(request_, 30)
+        mock_delete_users.assert_called_with(request_, 30, chunk_size=1000,
+                                             commit=False)
 
     def test_delete_stale_resets(
             self, context, request_, mock_delete_resets, mock_delete_users):
         self.call_fut(context, request_, 30, 10)
-        mock_delete_resets.assert_called_with(request_, 10)
+        mock_delete_resets.assert_called_with(request_, 10, chunk_size=1000,
+                                              commit=False)
+
+    def test_delete_in_chunks_and_commit(
+            self, context, request_, mock_delete_resets, mock_delete_users):
+        self.call_fut(context, request_, 30, 10, 100, True)
+        mock_delete_users.assert_called_with(request_, 30, chunk_size=100,
+                                             commit=True)
+        mock_delete_resets.assert_called_with(request_, 10, chunk_size=100,
+                                              commit=True)
@@ -0,0 +1,95 @@
+from unittest.mock import Mock
+from pytest import fixture
+from pytest import mark
+from pytest import raises
+
+
+@mark.usefixtures('integration')
+class TestReindexCatalogs:
+
+    def call_fut(self, *args, **kwargs):
+        from .ad_reindex import reindex_catalogs
+        return reindex_catalogs(*args, **kwargs)
+
+    @fixture
+    def context(self, pool_with_catalogs):
+        return pool_with_catalogs
+
+    @fixture
+    def mock_transaction(self, monkeypatch):
+        from . import ad_reindex
+        mock = Mock()
+        monkeypatch.setattr(ad_reindex, 'transaction', mock)
+        return mock
+
+    @fixture
+    def catalog(self, context):
+        return context['catalogs']['system']
+
+    def _get_docids(self, catalog):
+        return list(catalog.objectids)
+
+    def test_reindex_index(self, context, catalog, mock_transaction):
+        index = catalog['name']
+        index.reindex_resource = Mock()
+        count = self.call_fut(context, index_names=['name'])
+        docids = self._get_docids(catalog)
+        assert count == len(docids)
+        assert index.reindex_resource.call_count == len(docids)
+
+    def test_reindex_all_indexes(self, context, mock_transaction):
+        count = self.call_fut(context)
+        assert count > 0
+
+    def test_reindex_raise_if_index_not_exists(self, context,
+                                               mock_transaction):
+        with raises(KeyError):
+            self.call_fut(context, index_names=['WRONG'])
+
+    def test_reindex_commit_per_chunk(self, context, catalog,
+                                      mock_transaction):
+        docids = self._get_docids(catalog)
+        self.call_fut(context, index_names=['name'], chunk_size=1)
+        assert mock_transaction.commit.call_count == len(docids) + 1
+
+    def test_reindex_increment_modification_count(self, context,
+                                                  mock_transaction):
+        catalogs = context['catalogs']
+        count = catalogs.modification_count
+        self.call_fut(context, index_names=['name'])
+        assert catalogs.modification_count == count + 1
+
+    def test_reindex_resume_from_checkpoint(self, context, catalog, tmpdir,
+                                            mock_transaction):
+        docids = self._get_docids(catalog)
+        checkpoint = tmpdir.join('system.name.checkpoint')
+        checkpoint.write(str(docids[0]))
+        count = self.call_fut(context, index_names=['name'],
+                              checkpoint_dir=str(tmpdir))
+        assert count == len(docids) - 1
+
+    def test_reindex_remove_checkpoint_if_finished(self, context, tmpdir,
+                                                   mock_transaction):
+        self.call_fut(context, index_names=['name'],
+                      checkpoint_dir=str(tmpdir))
+        assert tmpdir.listdir() == []
+
+    def test_reindex_keep_checkpoint_if_interrupted(self, context, catalog,
+                                                    tmpdir, mock_transaction):
+        docids = self._get_docids(catalog)
+        mock_transaction.commit.side_effect = [None, KeyboardInterrupt]
+        with raises(KeyboardInterrupt):
+            self.call_fut(context, index_names=['name'], chunk_size=1,
+                          checkpoint_dir=str(tmpdir))
+        checkpoint = tmpdir.join('system.name.checkpoint')
+        assert checkpoint.read() == str(docids[0])
+
+    def test_reindex_retry_chunk_if_conflict(self, context, catalog,
+                                             mock_transaction):
+        from ZODB.POSException import ConflictError
+        docids = self._get_docids(catalog)
+        mock_transaction.commit.side_effect = [ConflictError, None, None]
+        count = self.call_fut(context, index_names=['name'],
+                              chunk_size=len(docids))
+        assert count == len(docids)
+        assert mock_transaction.abort.called
@@ -0,0 +1,25 @@
+from pyramid import testing
+from pytest import fixture
+
+
+class TestShardUsers:
+
+    @fixture
+    def users(self, monkeypatch):
+        from adhocracy_core.resources.pool import Pool
+        from . import ad_shard_users
+        users = Pool()
+        users.add('0000000', testing.DummyResource())
+        monkeypatch.setattr(ad_shard_users, 'find_service',
+                            lambda x, y, z: users)
+        return users
+
+    def call_fut(self, *args):
+        from .ad_shard_users import shard_users
+        return shard_users(*args)
+
+    def test_shard_users(self, context, users):
+        user = users['0000000']
+        self.call_fut(context, 4)
+        assert users.data.shards == 4
+        assert users['0000000'] is user
@@ -7,7 +7,7 @@ from colander import deferred
 from colander import drop
 from colander import null
 from colander import required
-from persistent.mapping import PersistentMapping
+from persistent import Persistent
 from pyramid.decorator import reify
 from pyramid.registry import Registry
 from pyramid.interfaces import IRequest
@@ -16,6 +16,7 @@ from zope.interface import implementer
 import colander
 
 from adhocracy_core.events import ResourceSheetModified
+from adhocracy_core.interfaces import IResource
 from adhocracy_core.interfaces import IResourceSheet
 from adhocracy_core.interfaces import ISheet
 from adhocracy_core.interfaces import ResourceMetadata
@@ -30,7 +31,6 @@ from adhocracy_core.schema import Reference as ReferenceSchema
 from adhocracy_core.utils import remove_keys_from_dict
 from adhocracy_core.utils import normalize_to_tuple
 from adhocracy_core.utils import find_graph
-from adhocracy_core.utils import create_schema
 
 logger = getLogger(__name__)
 
@@ -55,13 +55,7 @@ class BaseResourceSheet:
 
     def get_schema_with_bindings(self) -> colander.MappingSchema:
         bindings = self._get_basic_bindings()
-        context = bindings.pop('context')
-        request = bindings.pop('request')
-        schema = create_schema(self.meta.schema_class,
-                               context,
-                               request,
-                               **bindings
-                               )
+        schema = self.schema.bind(**bindings)
         schema.name = self.meta.isheet.__identifier__
         is_mandatory = self.creating and self.meta.create_mandatory
         schema.missing = required if is_mandatory else drop
@@ -168,6 +162,8 @@ class BaseResourceSheet:
     def _yield_references(self, fields, query, create_ref) -> iter:
         if not self._catalogs:
             return iter([])  # ease testing
+        fields = list(fields)
+        queries = []
         for field, node in fields:
             reference = create_ref(node)
             is_references_node = isinstance(node, UniqueReferences)\
@@ -177,7 +173,15 @@ class BaseResourceSheet:
                                              sort_by='reference')
             else:  # search single reference or back references
                 query_field = query._replace(references=[reference])
-            elements = self._catalogs.search(query_field).elements
+            queries.append(query_field)
+        if not queries:
+            return iter([])
+        results = self._catalogs.search_references(queries)
+        return self._yield_elements(fields, results)
+
+    def _yield_elements(self, fields, results) -> iter:
+        for (field, node), result in zip(fields, results):
+            elements = result.elements
             if len(elements) == 0:
                 continue
             if isinstance(node, ReferenceSchema):
@@ -283,9 +287,39 @@ class BaseResourceSheet:
         raise NotImplementedError
 
 
+ANNOTATIONS_KEY = '_sheets_data'
+"""Resource attribute to store the data of all annotation sheets."""
+
+
+class SharedSheetData(Persistent):
+    """Large sheet data stored in its own database record.
+
+    The data may be shared by multiple resources, see
+    :meth:`AnnotationRessourceSheet.share_data`. Never modify the data,
+    resources copy it before modifying.
+    """
+
+    def __init__(self, data: dict):
+        """Initialize self."""
+        self.data = data
+
+
 @implementer(IResourceSheet)
 class AnnotationRessourceSheet(BaseResourceSheet):
-    """Resource Sheet that stores data in dictionary annotation."""
+    """Resource Sheet that stores data in dictionary annotation.
+
+    The data of all annotation sheets is stored in one dictionary
+    (attribute :data:`ANNOTATIONS_KEY`) that is part of the resource
+    database record, so no extra database objects have to be loaded.
+    Legacy data stored in a `_sheet_<isheet>` attribute is still read
+    and moved to this dictionary when the sheet is modified.
+    Large data (text values with at least :attr:`shared_data_min_size`
+    characters) is stored in its own :class:`SharedSheetData` record
+    instead, so item versions can share it if it does not change.
+    """
+
+    shared_data_min_size = 1000
+    """Minimal size to store the data in a :class:`SharedSheetData`."""
 
     @reify
     def _annotation_key(self):
@@ -294,29 +328,119 @@ class AnnotationRessourceSheet(BaseResourceSheet):
 
     def _get_data_appstruct(self) -> dict:
         """Get data appstruct."""
-        data = getattr(self.context, self._annotation_key, {})
+        data = self._get_annotation()
         return {k: v for k, v in data.items() if k in self._fields['data']}
 
+    def _get_annotation(self) -> dict:
+        annotations = getattr(self.context, ANNOTATIONS_KEY, None)
+        if annotations and self._annotation_key in annotations:
+            return _get_sheet_data(annotations[self._annotation_key])
+        return getattr(self.context, self._annotation_key, {})
+
+    def _get_annotations_for_update(self) -> dict:
+        annotations = getattr(self.context, ANNOTATIONS_KEY, None)
+        if annotations is None:
+            annotations = {}
+            setattr(self.context, ANNOTATIONS_KEY, annotations)
+        return annotations
+
+    def _get_annotation_for_update(self) -> dict:
+        """Return the stored data of this sheet to modify it.
+
+        The caller has to mark the resource as changed.
+        """
+        annotations = self._get_annotations_for_update()
+        key = self._annotation_key
+        if key not in annotations:
+            legacy = getattr(self.context, key, {})
+            if key in self.context.__dict__:
+                delattr(self.context, key)
+            annotations[key] = dict(legacy)
+        elif isinstance(annotations[key], SharedSheetData):  # copy on write
+            annotations[key] = dict(annotations[key].data)
+        return annotations[key]
+
     def _store_data(self, appstruct):
         """Store data appstruct."""
-        data = getattr(self.context, self._annotation_key, None)
-        if data is None:
-            data = PersistentMapping()
-            setattr(self.context, self._annotation_key, data)
-        for key in self._fields['data']:
-            if key in appstruct:
-                data[key] = appstruct[key]
+        keys = [k for k in self._fields['data'] if k in appstruct]
+        if not keys:
+            return
+        data = self._get_annotation_for_update()
+        for key in keys:
+            data[key] = appstruct[key]
+        if _get_data_size(data) >= self.shared_data_min_size:
+            annotations = self._get_annotations_for_update()
+            annotations[self._annotation_key] = SharedSheetData(data)
+        self.context._p_changed = True
+
+    def share_data(self, source: IResource, appstruct: dict) -> bool:
+        """Share the data of `source` if `appstruct` has the same data.
+
+        Only large data is shared, small data is cheaper to store in the
+        resource record. The data is stored once, the first resource that
+        modifies it gets its own copy (copy on write). This saves storage
+        space and write time for item versions that do not change the sheet
+        data. `source` is not modified, only legacy large data that is not
+        stored in a :class:`SharedSheetData` yet is moved once.
+
+        :returns: True if the data is shared.
+        """
+        key = self._annotation_key
+        source_annotations = getattr(source, ANNOTATIONS_KEY, None)
+        if not source_annotations or key not in source_annotations:
+            return False
+        shared = source_annotations[key]
+        data = _get_sheet_data(shared)
+        if _get_data_size(data) < self.shared_data_min_size:
+            return False
+        defaults = self._get_default_appstruct()
+        for field in self._fields['data']:
+            default = defaults[field]
+            if appstruct.get(field, default) != data.get(field, default):
+                return False
+        if not isinstance(shared, SharedSheetData):  # legacy data
+            shared = SharedSheetData(data)
+            source_annotations[key] = shared
+            source._p_changed = True
+        annotations = self._get_annotations_for_update()
+        if annotations.get(key) is not shared:
+            annotations[key] = shared
+            self.context._p_changed = True
+        return True
+
+    def get_stored_data(self) -> dict:
+        """Return a copy of the stored data.
+
+        Other than :meth:`get` this includes values of fields that are
+        no longer part of the schema, to migrate them in evolution steps.
+        """
+        return dict(self._get_annotation())
 
     def delete_field_values(self, fields: [str]):
         """Delete value for every field name in `fields`."""
-        if not hasattr(self.context, self._annotation_key):
+        if not self._get_annotation():
             return None
-        appstruct = getattr(self.context, self._annotation_key, {})
+        appstruct = self._get_annotation_for_update()
         for key in fields:
             if key in appstruct:
                 del appstruct[key]
         if appstruct == {}:
-            delattr(self.context, self._annotation_key)
+            annotations = getattr(self.context, ANNOTATIONS_KEY)
+            del annotations[self._annotation_key]
+            if annotations == {}:
+                delattr(self.context, ANNOTATIONS_KEY)
+        self.context._p_changed = True
+
+
+def _get_sheet_data(value) -> dict:
+    if isinstance(value, SharedSheetData):
+        return value.data
+    return value
+
+
+def _get_data_size(data: dict) -> int:
+    """Return the number of characters of all text values."""
+    return sum(len(v) for v in data.values() if isinstance(v, (str, bytes)))
 
 
 @implementer(IResourceSheet)
@@ -1,5 +1,5 @@
 """List, search and filter child resources."""
-from copy import deepcopy
+from copy import copy
 
 from colander import drop
 
@@ -124,7 +124,7 @@ class PoolSheet(AnnotationRessourceSheet):
                               params: dict):
         if params.get('serialization_form', False) == 'content':
             elements = schema['elements']
-            typ_copy = deepcopy(elements.children[0].typ)
+            typ_copy = copy(elements.children[0].typ)
             typ_copy.serialization_form = 'content'
             elements.children[0].typ = typ_copy
         if params.get('show_count', True):  # pragma: no branch
@@ -101,6 +101,25 @@ class TestBaseResourceSheet:
                                    'creating': inst.creating,
                                    }
 
+    def test_get_schema_with_bindings_registry_without_request(self, inst):
+        assert inst.request is None
+        schema = inst.get_schema_with_bindings()
+        assert schema.bindings['registry'] is inst.registry
+
+    def test_get_schema_with_bindings_registry_with_request(self, inst,
+                                                            request_):
+        inst.request = request_
+        request_.registry = object()
+        schema = inst.get_schema_with_bindings()
+        assert schema.bindings['request'] is request_
+        assert schema.bindings['registry'] is inst.registry
+
+    def test_get_schema_with_bindings_clone_schema(self, inst):
+        schema = inst.get_schema_with_bindings()
+        assert schema is not inst.schema
+        assert inst.schema.bindings is None
+        assert [x.name for x in schema] == [x.name for x in inst.schema]
+
     def test_get_schema_with_bindings_add_name(self, inst):
         schema = inst.get_schema_with_bindings()
         assert schema.name == inst.meta.isheet.__identifier__
@@ -313,6 +332,17 @@ class TestBaseResourceSheet:
                                       )
         assert sheet_catalogs.search.call_args[0][0] == query
 
+    def test_get_references_search_all_fields_at_once(
+            self, inst, sheet_catalogs, mock_node_unique_references,
+            mock_node_single_reference):
+        inst.schema.children.append(mock_node_unique_references)
+        inst.schema.children.append(mock_node_single_reference)
+        inst.get(add_back_references=False)
+        queries = sheet_catalogs.search_references.call_args[0][0]
+        assert sheet_catalogs.search_references.call_count == 1
+        assert [x.references[0].field for x in queries] ==\
+            ['references', 'reference']
+
     def test_get_back_reference(self, inst, context, sheet_catalogs,
                                 mock_node_single_reference):
         from adhocracy_core.interfaces import ISheet
@@ -447,12 +477,50 @@ class TestAnnotationRessourceSheet:
         assert IResourceSheet.providedBy(inst)
         assert verifyObject(IResourceSheet, inst)
 
+    def test_set_store_data_in_annotations_dict(self, inst):
+        from . import ANNOTATIONS_KEY
+        inst.set({'count': 2})
+        annotations = getattr(inst.context, ANNOTATIONS_KEY)
+        assert annotations == {inst._annotation_key: {'count': 2}}
+        assert not hasattr(inst.context, inst._annotation_key)
+
+    def test_get_legacy_annotation_data(self, inst):
+        setattr(inst.context, inst._annotation_key, {'count': 2})
+        assert inst.get()['count'] == 2
+
+    def test_set_move_legacy_annotation_data(self, inst):
+        from . import ANNOTATIONS_KEY
+        setattr(inst.context, inst._annotation_key, {'count': 2})
+        inst.set({'other': 3})
+        annotations = getattr(inst.context, ANNOTATIONS_KEY)
+        assert annotations[inst._annotation_key] == {'count': 2, 'other': 3}
+        assert not hasattr(inst.context, inst._annotation_key)
+
+    def test_get_stored_data(self, inst):
+        inst.set({'count': 2})
+        data = inst.get_stored_data()
+        assert data == {'count': 2}
+        data['count'] = 3
+        assert inst.get()['count'] == 2
+
+    def test_get_stored_data_include_non_schema_fields(self, inst):
+        setattr(inst.context, inst._annotation_key, {'count': 2, 'old': 1})
+        assert inst.get_stored_data() == {'count': 2, 'old': 1}
+        assert 'old' not in inst.get()
+
+    def test_get_stored_data_empty(self, inst):
+        assert inst.get_stored_data() == {}
+
     def test_delete_field_values(self, inst):
+        inst.set({'count': 2, 'other': 3})
+        inst.delete_field_values(['count'])
+        assert inst.get(omit_defaults=True) == {'other': 3}
+
+    def test_delete_field_values_legacy_annotation_data(self, inst):
         appstruct = {'count': 2, 'other': 3}
         setattr(inst.context, inst._annotation_key, appstruct)
         inst.delete_field_values(['count'])
-        assert 'other' in appstruct
-        assert 'count' not in appstruct
+        assert inst.get(omit_defaults=True) == {'other': 3}
 
     def test_delete_field_values_ignore_if_wrong_field(self, inst):
         appstruct = {'count': 2}
@@ -461,14 +529,148 @@ class TestAnnotationRessourceSheet:
         assert 'count' in appstruct
 
     def test_delete_field_values_remove_data_dict_if_empty(self, inst):
+        from . import ANNOTATIONS_KEY
         appstruct = {'count': 2}
         setattr(inst.context, inst._annotation_key, appstruct)
         inst.delete_field_values(['count'])
         assert not hasattr(inst.context, inst._annotation_key)
+        assert not hasattr(inst.context, ANNOTATIONS_KEY)
 
     def test_delete_field_values_no_delete_key_if_key_absent(self, inst):
         assert inst.delete_field_values(['count']) is None
 
+    def test_set_ignore_if_no_data_changed(self, inst):
+        from . import ANNOTATIONS_KEY
+        inst.set({'count': 0})
+        assert not hasattr(inst.context, ANNOTATIONS_KEY)
+
+    @fixture
+    def share_all(self, monkeypatch):
+        from . import AnnotationRessourceSheet
+        monkeypatch.setattr(AnnotationRessourceSheet, 'shared_data_min_size',
+                            0)
+
+    def test_set_store_small_data_inline(self, inst):
+        from . import ANNOTATIONS_KEY
+        inst.set({'count': 2})
+        annotations = getattr(inst.context, ANNOTATIONS_KEY)
+        assert annotations[inst._annotation_key] == {'count': 2}
+
+    def test_set_store_large_data_in_shared_data(self, inst, share_all):
+        from . import ANNOTATIONS_KEY
+        from . import SharedSheetData
+        inst.set({'count': 2})
+        shared = getattr(inst.context, ANNOTATIONS_KEY)[inst._annotation_key]
+        assert isinstance(shared, SharedSheetData)
+        assert shared.data == {'count': 2}
+        inst.set({'count': 3})
+        new = getattr(inst.context, ANNOTATIONS_KEY)[inst._annotation_key]
+        assert new is not shared
+        assert shared.data == {'count': 2}
+        assert new.data == {'count': 3}
+
+    def test_get_data_size(self):
+        from . import _get_data_size
+        assert _get_data_size({'a': 'text', 'b': b'12', 'c': 100}) == 6
+
+    def test_share_data_ignore_small_data(self, inst, sheet_meta, registry):
+        from pyramid import testing
+        from . import ANNOTATIONS_KEY
+        from . import AnnotationRessourceSheet
+        source = testing.DummyResource()
+        sheet = AnnotationRessourceSheet(sheet_meta, source, registry)
+        sheet.set({'count': 2})
+        assert not inst.share_data(source, {'count': 2})
+        source_data = getattr(source, ANNOTATIONS_KEY)[inst._annotation_key]
+        assert source_data == {'count': 2}
+
+    def test_share_data_not_modify_source(self, inst, source):
+        from . import ANNOTATIONS_KEY
+        source_annotations = getattr(source, ANNOTATIONS_KEY)
+        shared = source_annotations[inst._annotation_key]
+        source._p_changed = False
+        inst.share_data(source, {'count': 2})
+        assert source_annotations[inst._annotation_key] is shared
+        assert source._p_changed is False
+
+    def test_share_data_wrap_legacy_inline_data_once(self, inst, share_all):
+        from pyramid import testing
+        from . import ANNOTATIONS_KEY
+        from . import SharedSheetData
+        source = testing.DummyResource()
+        setattr(source, ANNOTATIONS_KEY, {inst._annotation_key: {'count': 2}})
+        assert inst.share_data(source, {'count': 2})
+        shared = getattr(source, ANNOTATIONS_KEY)[inst._annotation_key]
+        assert isinstance(shared, SharedSheetData)
+        assert source._p_changed is True
+
+    @fixture
+    def source(self, sheet_meta, registry, share_all):
+        from pyramid import testing
+        from . import AnnotationRessourceSheet
+        source = testing.DummyResource()
+        sheet = AnnotationRessourceSheet(sheet_meta, source, registry)
+        sheet.set({'count': 2})
+        return source
+
+    def test_share_data_if_same_data(self, inst, source):
+        from . import ANNOTATIONS_KEY
+        from . import SharedSheetData
+        assert inst.share_data(source, {'count': 2, 'other': 0})
+        shared = getattr(source, ANNOTATIONS_KEY)[inst._annotation_key]
+        assert isinstance(shared, SharedSheetData)
+        assert shared.data == {'count': 2}
+        annotations = getattr(inst.context, ANNOTATIONS_KEY)
+        assert annotations[inst._annotation_key] is shared
+        assert inst.get() == {'count': 2, 'other': 0}
+
+    def test_share_data_ignore_if_other_data(self, inst, source):
+        from . import ANNOTATIONS_KEY
+        assert not inst.share_data(source, {'count': 3})
+        assert not hasattr(inst.context, ANNOTATIONS_KEY)
+
+    def test_share_data_ignore_if_field_missing(self, inst, source):
+        assert not inst.share_data(source, {'other': 0})
+
+    def test_share_data_ignore_if_source_has_no_data(self, inst, context):
+        from pyramid import testing
+        assert not inst.share_data(testing.DummyResource(), {})
+
+    def test_share_data_already_shared_data(self, inst, source, sheet_meta,
+                                            registry):
+        from pyramid import testing
+        from . import ANNOTATIONS_KEY
+        from . import AnnotationRessourceSheet
+        other = AnnotationRessourceSheet(sheet_meta, testing.DummyResource(),
+                                         registry)
+        other.share_data(source, {'count': 2})
+        inst.share_data(other.context, {'count': 2})
+        key = inst._annotation_key
+        assert getattr(inst.context, ANNOTATIONS_KEY)[key] is\
+            getattr(source, ANNOTATIONS_KEY)[key]
+
+    def test_set_copy_shared_data(self, inst, source, sheet_meta, registry):
+        from . import AnnotationRessourceSheet
+        inst.share_data(source, {'count': 2})
+        inst.set({'other': 1})
+        source_sheet = AnnotationRessourceSheet(sheet_meta, source, registry)
+        assert inst.get() == {'count': 2, 'other': 1}
+        assert source_sheet.get() == {'count': 2, 'other': 0}
+
+    def test_set_source_copy_shared_data(self, inst, source, sheet_meta,
+                                         registry):
+        from . import AnnotationRessourceSheet
+        inst.share_data(source, {'count': 2})
+        source_sheet = AnnotationRessourceSheet(sheet_meta, source, registry)
+        source_sheet.set({'count': 3})
+        assert inst.get() == {'count': 2, 'other': 0}
+
+    def test_delete_field_values_copy_shared_data(self, inst, source):
+        inst.share_data(source, {'count': 2})
+        inst.delete_field_values(['count'])
+        assert inst.get(omit_defaults=True) == {}
+        assert source._sheets_data[inst._annotation_key].data == {'count': 2}
+
     def test_set_with_other_sheet_name_conflicts(self, inst, sheet_meta,
                                                  context, registry):
         from adhocracy_core.interfaces import ISheet
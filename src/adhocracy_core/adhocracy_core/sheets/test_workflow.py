@@ -296,8 +296,7 @@ class TestWorkflowAssignmentSheet:
         inst.schema = inst.schema.clone()
         inst.schema.add(MappingSchema(name='other'))
         inst.set({'other': {}})
-        appstruct = getattr(context, inst._annotation_key)
-        assert 'other' in appstruct
+        assert 'other' in inst._get_annotation()
 
     def tet_get_next_states(self, meta, context, registry, mock_workflow):
         registry.content.get_workflow.return_value = mock_workflow
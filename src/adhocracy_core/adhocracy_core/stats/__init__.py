@@ -5,3 +5,4 @@ def includeme(config):
     """Add statsd client."""
     config.include('substanced.stats')
     config.include('.subscriber')
+    config.include('.conflicts')
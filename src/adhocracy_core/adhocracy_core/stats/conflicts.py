@@ -0,0 +1,133 @@
+"""Record write conflicts of requests.
+
+pyramid_tm retries requests that raise a
+:class:`ZODB.POSException.ConflictError`, see the `tm.attempts` setting.
+For every conflict a warning is logged::
+
+    Write conflict request_type=post.IComments oid=0x3f12
+    class=BTrees.OOBTree.OOBucket attempt=1 retry=True
+
+and the following statsd metrics are incremented:
+
+    `conflicts.<request type>`
+        all conflicts
+    `conflicts.retries.<request type>`
+        conflicts that are retried
+    `conflicts.objects.<class name>`
+        conflicts per class of the conflicting object, dots are replaced
+        with underscores
+
+The request type is the lowercase http method, `batch` for batch requests
+and the resource type of the request context, e.g. `post.IComments`.
+Run `ad_conflicts_summary` with the log file to list the objects with the
+most conflicts.
+
+Conflicting requests that are retried at the same time tend to conflict
+again. To spread the retries set a maximal random delay in seconds, the
+delay is doubled with every retry (0 means no delay)::
+
+    adhocracy.conflicts.retry_delay = 0.05
+"""
+from random import uniform
+import logging
+import re
+import time
+
+from pyramid.registry import Registry
+from pyramid.request import Request
+from substanced.stats import statsd_incr
+from ZODB.POSException import ConflictError
+from ZODB.utils import oid_repr
+import transaction
+
+from adhocracy_core.utils import get_iresource
+
+
+logger = logging.getLogger(__name__)
+
+LOG_MESSAGE = 'Write conflict request_type={request_type} oid={oid}' \
+              ' class={class_name} attempt={attempt} retry={retry}'
+
+LOG_PATTERN = re.compile(r'Write conflict request_type=(?P<request_type>\S+)'
+                         r' oid=(?P<oid>\S+) class=(?P<class_name>\S+)'
+                         r' attempt=(?P<attempt>\d+)'
+                         r' retry=(?P<retry>True|False)')
+
+
+class ConflictTelemetryManager:
+    """Transaction manager of one request that records write conflicts.
+
+    Wraps the thread local :data:`transaction.manager`. pyramid_tm calls
+    :meth:`_retryable` for every failed attempt to handle the request.
+    """
+
+    def __init__(self, request: Request, manager=None):
+        """Initialize self."""
+        self.request = request
+        self.manager = manager or transaction.manager
+        self.attempt = 0
+
+    def __getattr__(self, name):
+        return getattr(self.manager, name)
+
+    def _retryable(self, error_type, error) -> bool:
+        self.attempt += 1
+        # transaction >= 2.1 wraps the thread local manager
+        manager = getattr(self.manager, 'manager', self.manager)
+        retryable = manager._retryable(error_type, error)
+        if issubclass(error_type, ConflictError):
+            registry = self.request.registry
+            attempts = int(registry.settings.get('tm.attempts', 1))
+            retry = retryable and self.attempt < attempts
+            record_conflict(self.request, error, self.attempt, retry)
+            if retry:
+                _delay_retry(registry, self.attempt)
+        return retryable
+
+
+def create_tm(request: Request) -> ConflictTelemetryManager:
+    """Return transaction manager for `request`, see `tm.manager_hook`."""
+    return ConflictTelemetryManager(request)
+
+
+def get_request_type(request: Request) -> str:
+    """Return http method, `batch` and context resource type of `request`."""
+    name = request.method.lower()
+    if request.path.endswith('/batch'):
+        return name + '.batch'
+    context = getattr(request, 'context', None)
+    iresource = get_iresource(context) if context is not None else None
+    if iresource is not None:
+        name += '.' + iresource.__name__
+    return name
+
+
+def record_conflict(request: Request, error: ConflictError, attempt: int,
+                    retry: bool):
+    """Log the conflicting object of `error` and send statsd metrics."""
+    request_type = get_request_type(request)
+    class_name = error.class_name or 'unknown'
+    oid = oid_repr(error.oid) if error.oid else 'unknown'
+    logger.warning(LOG_MESSAGE.format(request_type=request_type,
+                                      oid=oid,
+                                      class_name=class_name,
+                                      attempt=attempt,
+                                      retry=retry))
+    registry = request.registry
+    statsd_incr('conflicts.' + request_type, registry=registry)
+    if retry:
+        statsd_incr('conflicts.retries.' + request_type, registry=registry)
+    statsd_incr('conflicts.objects.' + class_name.replace('.', '_'),
+                registry=registry)
+
+
+def _delay_retry(registry: Registry, attempt: int):
+    max_delay = registry['config'].adhocracy.conflicts.retry_delay
+    if max_delay:
+        time.sleep(uniform(0, max_delay * 2 ** (attempt - 1)))
+
+
+def includeme(config):
+    """Record write conflicts if no other transaction manager is set."""
+    settings = config.registry.settings
+    settings.setdefault('tm.manager_hook', create_tm)
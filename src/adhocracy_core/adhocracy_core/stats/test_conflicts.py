@@ -0,0 +1,158 @@
+from unittest.mock import Mock
+
+from pyramid import testing
+from pytest import fixture
+from pytest import mark
+
+
+@fixture
+def mock_statsd_incr(mock):
+    return mock.patch('adhocracy_core.stats.conflicts.statsd_incr')
+
+
+@fixture
+def request_(request_, registry):
+    request_.registry = registry
+    request_.method = 'POST'
+    return request_
+
+
+@fixture
+def error():
+    from ZODB.POSException import ConflictError
+    from ZODB.utils import p64
+    error = ConflictError(oid=p64(42))
+    error.class_name = 'BTrees.Length.Length'
+    return error
+
+
+class TestGetRequestType:
+
+    def call_fut(self, *args):
+        from .conflicts import get_request_type
+        return get_request_type(*args)
+
+    def test_method(self, request_):
+        assert self.call_fut(request_) == 'post'
+
+    def test_batch(self, request_):
+        request_.path = '/api/batch'
+        assert self.call_fut(request_) == 'post.batch'
+
+    def test_context_resource_type(self, request_):
+        from zope.interface import alsoProvides
+        from adhocracy_core.interfaces import IResource
+        request_.context = testing.DummyResource()
+        alsoProvides(request_.context, IResource)
+        assert self.call_fut(request_) == 'post.IResource'
+
+
+class TestRecordConflict:
+
+    def call_fut(self, *args):
+        from .conflicts import record_conflict
+        return record_conflict(*args)
+
+    def test_log_conflicting_object(self, request_, error, mock_statsd_incr,
+                                    log):
+        self.call_fut(request_, error, 1, True)
+        assert 'Write conflict request_type=post oid=0x2a'\
+               ' class=BTrees.Length.Length attempt=1 retry=True'\
+               in str(log)
+
+    def test_log_matches_pattern(self, request_, error, mock_statsd_incr,
+                                 log):
+        from .conflicts import LOG_PATTERN
+        self.call_fut(request_, error, 2, False)
+        match = LOG_PATTERN.search(str(log))
+        assert match.group('oid') == '0x2a'
+        assert match.group('attempt') == '2'
+
+    def test_send_metrics(self, request_, error, mock_statsd_incr):
+        self.call_fut(request_, error, 1, True)
+        metrics = [x[0][0] for x in mock_statsd_incr.call_args_list]
+        assert metrics == ['conflicts.post',
+                           'conflicts.retries.post',
+                           'conflicts.objects.BTrees_Length_Length']
+
+    def test_send_metrics_no_retry(self, request_, error, mock_statsd_incr):
+        self.call_fut(request_, error, 5, False)
+        metrics = [x[0][0] for x in mock_statsd_incr.call_args_list]
+        assert 'conflicts.retries.post' not in metrics
+
+    def test_unknown_object(self, request_, mock_statsd_incr, log):
+        from ZODB.POSException import ConflictError
+        self.call_fut(request_, ConflictError(), 1, True)
+        assert 'oid=unknown class=unknown' in str(log)
+
+
+class TestConflictTelemetryManager:
+
+    @fixture
+    def manager(self):
+        manager = Mock()
+        manager._retryable.return_value = True
+        return manager
+
+    @fixture
+    def mock_record_conflict(self, monkeypatch):
+        from . import conflicts
+        mock = Mock(spec=conflicts.record_conflict)
+        monkeypatch.setattr(conflicts, 'record_conflict', mock)
+        return mock
+
+    @fixture
+    def inst(self, request_, manager, registry):
+        from .conflicts import ConflictTelemetryManager
+        registry.settings['tm.attempts'] = 2
+        return ConflictTelemetryManager(request_, manager=manager)
+
+    def test_create_tm(self, request_):
+        import transaction
+        from .conflicts import create_tm
+        inst = create_tm(request_)
+        assert inst.request is request_
+        assert inst.manager is transaction.manager
+
+    def test_delegate_to_manager(self, inst, manager):
+        inst.commit()
+        assert manager.commit.called
+
+    def test_ignore_other_errors(self, inst, mock_record_conflict):
+        assert inst._retryable(ValueError, ValueError())
+        assert not mock_record_conflict.called
+
+    def test_record_conflicts(self, inst, request_, error,
+                              mock_record_conflict):
+        from ZODB.POSException import ConflictError
+        assert inst._retryable(ConflictError, error)
+        mock_record_conflict.assert_called_with(request_, error, 1, True)
+        assert inst._retryable(ConflictError, error)
+        mock_record_conflict.assert_called_with(request_, error, 2, False)
+
+    def test_delay_retry(self, inst, error, registry, mock_record_conflict,
+                         monkeypatch):
+        from ZODB.POSException import ConflictError
+        from . import conflicts
+        mock_sleep = Mock()
+        monkeypatch.setattr(conflicts.time, 'sleep', mock_sleep)
+        registry['config'].adhocracy.conflicts.retry_delay = 0.1
+        inst._retryable(ConflictError, error)
+        delay = mock_sleep.call_args[0][0]
+        assert 0 <= delay <= 0.1
+
+    def test_no_delay_if_not_configured(self, inst, error,
+                                        mock_record_conflict, monkeypatch):
+        from ZODB.POSException import ConflictError
+        from . import conflicts
+        mock_sleep = Mock()
+        monkeypatch.setattr(conflicts.time, 'sleep', mock_sleep)
+        inst._retryable(ConflictError, error)
+        assert not mock_sleep.called
+
+
+@mark.usefixtures('integration')
+def test_includeme_set_manager_hook(config):
+    from .conflicts import create_tm
+    config.include('adhocracy_core.stats.conflicts')
+    assert config.registry.settings['tm.manager_hook'] is create_tm
@@ -60,7 +60,7 @@ class DummyPool(testing.DummyResource):
         resource.__parent__ = self
         resource.__name__ = name
 
-    def next_name(self, obj, prefix=''):
+    def next_name(self, obj, prefix='', concurrent=False):
         """Get the next name for the resource when using autonaming."""
         return prefix + '_0000000'
 
@@ -83,6 +83,12 @@ class DummyPool(testing.DummyResource):
         subresource.__name__ = None
         subresource.__parent__ = None
 
+    def remove_many(self, names, registry=None):
+        subresources = [self[name] for name in names]
+        for name in names:
+            self.remove(name, registry=registry)
+        return subresources
+
 
 def register_sheet(context, mock_sheet, registry, isheet=None) -> Mock:
     """Register `mock_sheet` for `context`. You can ony use this only once.
@@ -335,6 +341,11 @@ def mock_catalogs(search_result) -> Mock:
     search_mock = Mock(spec=CatalogsServiceAdhocracy.search)
     search_mock.return_value = search_result
     catalogs.search = search_mock
+    search_references_mock = Mock(
+        spec=CatalogsServiceAdhocracy.search_references)
+    search_references_mock.side_effect = lambda queries: [search_mock(x) for
+                                                          x in queries]
+    catalogs.search_references = search_references_mock
     reindex_index_mock = Mock(spec=CatalogsServiceAdhocracy.reindex_index)
     catalogs.reindex_index = reindex_index_mock
     get_index_mock = Mock(spec=CatalogsServiceAdhocracy.get_index)
@@ -390,6 +401,7 @@ def mock_workflow() -> Mock:
 def mock_content_registry() -> Mock:
     """Mock :class:`adhocracy_core.content.ResourceContentRegistry`."""
     from adhocracy_core.content import ResourceContentRegistry
+    from adhocracy_core.content import OptionsSkeleton
     mock = Mock(spec=ResourceContentRegistry)
     mock.sheets_meta = {}
     mock.resources_meta = {}
@@ -402,9 +414,12 @@ def mock_content_registry() -> Mock:
     mock.get_sheets_create.return_value = []
     mock.get_sheet.return_value = None
     mock.get_sheet_field = lambda x, y, z: mock.get_sheet(x, y).get()[z]
+    mock.resolve.side_effect = DottedNameResolver().maybe_resolve
     mock.can_add_anonymized.return_value = False
     mock.can_edit_anonymized.return_value = False
     mock.can_delete_anonymized.return_value = False
+    mock.can_add_resource.return_value = True
+    mock.get_options_skeleton.return_value = OptionsSkeleton((), (), ())
     return mock
 
 
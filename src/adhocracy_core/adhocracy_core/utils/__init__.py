@@ -22,6 +22,8 @@ from zope.interface import directlyProvidedBy
 from zope.interface import providedBy
 from zope.interface.interfaces import IInterface
 
+from adhocracy_core.changelog import get_changelog
+from adhocracy_core.changelog import get_modification_date_storage
 from adhocracy_core.interfaces import ChangelogMetadata
 from adhocracy_core.interfaces import IResource
 from adhocracy_core.interfaces import VisibilityChange
@@ -161,7 +163,7 @@ def unflatten_multipart_request(request: Request) -> dict:
 def get_changelog_metadata(resource, registry) -> ChangelogMetadata:
     """Return transaction changelog for `resource`."""
     path = resource_path(resource)
-    changelog = registry.changelog[path]
+    changelog = get_changelog(registry)[path]
     return changelog
 
 
@@ -275,11 +277,10 @@ def get_modification_date(registry: Registry) -> datetime:
     can use this as default value.
     The frontend relies on this to ease sorting.
     """
-    date = getattr(registry, '__modification_date__', None)
-    if date is None:
-        date = now()
-        registry.__modification_date__ = date
-    return date
+    storage = get_modification_date_storage(registry)
+    if storage.value is None:
+        storage.value = now()
+    return storage.value
 
 
 def create_filename(directory='.', prefix='', suffix='.csv') -> str:
@@ -306,6 +307,8 @@ def load_json(filename):
 
 def has_annotation_sheet_data(resource: IResource) -> bool:
     """Check if `resource` has no data stored in AnnotationResourceSheets."""
+    if getattr(resource, '_sheets_data', None):
+        return True
     for attribute in resource.__dict__:
         if attribute.startswith('_sheet_'):
             return True
@@ -221,17 +221,19 @@ def test_get_modification_date_not_cached():
     from . import get_modification_date
     registry = testing.DummyResource()
     result = get_modification_date(registry)
-    assert registry.__modification_date__ is result
+    assert registry.modification_date.value is result
 
 
 def test_get_modification_date_cached():
     """If the registry has the cached date, return it."""
     from . import get_modification_date
+    from adhocracy_core.changelog import ModificationDate
     from datetime import datetime
     now = datetime.now()
-    registry = testing.DummyResource(__date__=now)
+    registry = testing.DummyResource(modification_date=ModificationDate())
+    registry.modification_date.value = now
     result = get_modification_date(registry)
-    assert result is registry.__modification_date__
+    assert result is now
 
 
 def test_is_hidden_attribute_is_true(context):
@@ -356,3 +358,9 @@ def test_has_annotation_sheet_data_resource_with_data(context):
     from . import has_annotation_sheet_data
     context._sheet_xcv = {}
     assert has_annotation_sheet_data(context) is True
+
+
+def test_has_annotation_sheet_data_resource_with_packed_data(context):
+    from . import has_annotation_sheet_data
+    context._sheets_data = {'_sheet_xcv': {}}
+    assert has_annotation_sheet_data(context) is True
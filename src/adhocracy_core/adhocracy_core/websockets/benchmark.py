@@ -0,0 +1,128 @@
+"""Load test for the websocket server.
+
+Open many idle websocket connections and some active connections that
+subscribe/unsubscribe a resource in a loop. Print the percentiles of the
+time between request and status confirmation.
+"""
+from json import dumps
+from math import ceil
+from time import monotonic
+from urllib.parse import urlparse
+import argparse
+import asyncio
+import inspect
+import logging
+
+from autobahn.asyncio.websocket import WebSocketClientFactory
+from autobahn.asyncio.websocket import WebSocketClientProtocol
+
+
+logger = logging.getLogger(__name__)
+
+
+def main(args=None) -> int:  # pragma: no cover
+    """Measure websocket server latency with many idle and active clients."""
+    docstring = inspect.getdoc(main)
+    parser = argparse.ArgumentParser(description=docstring)
+    parser.add_argument('ws_url',
+                        help='url of the websocket server, '
+                             'e.g. ws://localhost:6561')
+    parser.add_argument('resource_url',
+                        help='url of the resource to subscribe, '
+                             'e.g. http://localhost:6541/')
+    parser.add_argument('-i',
+                        '--idle',
+                        help='number of idle connections',
+                        default=1000,
+                        type=int)
+    parser.add_argument('-a',
+                        '--active',
+                        help='number of active connections',
+                        default=100,
+                        type=int)
+    parser.add_argument('-d',
+                        '--duration',
+                        help='duration of the test in seconds',
+                        default=60,
+                        type=int)
+    parser.add_argument('--interval',
+                        help='seconds between two requests of one active '
+                             'connection',
+                        default=1.0,
+                        type=float)
+    args = parser.parse_args(args)
+    loop = asyncio.get_event_loop()
+    latencies = loop.run_until_complete(run_benchmark(loop, **vars(args)))
+    loop.close()
+    print(format_latencies(latencies))
+    return 0
+
+
+@asyncio.coroutine
+def run_benchmark(loop, ws_url: str, resource_url: str, idle: int=1000,
+                  active: int=100, duration: int=60,
+                  interval: float=1.0) -> [float]:  # pragma: no cover
+    """Run the load test and return the measured latencies (seconds)."""
+    latencies = []
+    url = urlparse(ws_url)
+    idle_factory = WebSocketClientFactory(ws_url)
+    idle_factory.protocol = WebSocketClientProtocol
+    active_factory = WebSocketClientFactory(ws_url)
+    active_factory.protocol = ActiveClient
+    active_factory.resource_url = resource_url
+    active_factory.interval = interval
+    active_factory.latencies = latencies
+    connections = []
+    for factory, count in ((idle_factory, idle), (active_factory, active)):
+        for x in range(count):
+            connection = yield from loop.create_connection(factory,
+                                                           url.hostname,
+                                                           url.port)
+            connections.append(connection)
+    logger.info('Opened %i idle and %i active connections', idle, active)
+    yield from asyncio.sleep(duration)
+    for transport, protocol in connections:
+        transport.close()
+    return latencies
+
+
+class ActiveClient(WebSocketClientProtocol):  # pragma: no cover
+    """Subscribe/unsubscribe a resource and measure the response latency."""
+
+    def onOpen(self):  # noqa
+        self._action = 'subscribe'
+        self._send_request()
+
+    def _send_request(self):
+        if self.state != self.STATE_OPEN:
+            return
+        self._sent = monotonic()
+        request = {'action': self._action,
+                   'resource': self.factory.resource_url}
+        self.sendMessage(dumps(request).encode())
+
+    def onMessage(self, payload: bytes, is_binary: bool):  # noqa
+        self.factory.latencies.append(monotonic() - self._sent)
+        self._action = 'unsubscribe' if self._action == 'subscribe'\
+            else 'subscribe'
+        loop = asyncio.get_event_loop()
+        loop.call_later(self.factory.interval, self._send_request)
+
+
+def percentile(values: [float], percent: float) -> float:
+    """Return the `percent` percentile of `values` (nearest rank)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = ceil(percent / 100 * len(ordered)) - 1
+    rank = min(max(rank, 0), len(ordered) - 1)
+    return ordered[rank]
+
+
+def format_latencies(latencies: [float]) -> str:
+    """Return requests count and latency percentiles in milliseconds."""
+    lines = ['requests: {}'.format(len(latencies))]
+    for percent in (50, 90, 99, 100):
+        value = percentile(latencies, percent) * 1000
+        lines.append('p{0}: {1:.1f} ms'.format(percent, value))
+    return '\n'.join(lines)
@@ -10,6 +10,7 @@ from websocket import WebSocketException
 from websocket import WebSocketConnectionClosedException
 from websocket import WebSocketTimeoutException
 
+from adhocracy_core.changelog import get_changelog
 from adhocracy_core.interfaces import IResource
 from adhocracy_core.utils import exception_to_str
 from adhocracy_core.utils import extract_events_from_changelog_metadata
@@ -168,7 +169,7 @@ def send_messages_after_commit_hook(success, registry):
     """Send transaction changelog messages to the websocket client."""
     ws_client = get_ws_client(registry)
     if success and ws_client is not None:
-        changelog_metadata = registry.changelog.values()
+        changelog_metadata = get_changelog(registry).values()
         ws_client.send_messages(changelog_metadata)
 
 
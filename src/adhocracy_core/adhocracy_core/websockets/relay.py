@@ -0,0 +1,130 @@
+"""Relay notifications between the websocket server worker processes.
+
+If the websocket server runs multiple worker processes (`processes` in
+the [websockets] section of the ini file) the backend sends its
+notifications to only one of them. This worker publishes the notification
+to the :class:`RelayHub` of the main process, that broadcasts it to all
+other workers. Every worker dispatches notifications to its own
+subscribers only.
+
+The hub listens on a unix socket, messages are separated by newlines.
+"""
+import asyncio
+import logging
+
+from adhocracy_core.websockets.server import RelayedNotificationHandler
+
+
+logger = logging.getLogger(__name__)
+
+
+SEPARATOR = b'\n'
+
+
+class LineProtocol(asyncio.Protocol):
+    """Receive newline separated messages.
+
+    :param on_message: called with every received message
+    """
+
+    def __init__(self, on_message: callable):
+        """Initialize self."""
+        self.on_message = on_message
+        self.transport = None
+        self._buffer = b''
+
+    def connection_made(self, transport: asyncio.Transport):
+        """Store `transport`."""
+        self.transport = transport
+
+    def data_received(self, data: bytes):
+        """Call :attr:`on_message` for every complete message."""
+        *messages, self._buffer = (self._buffer + data).split(SEPARATOR)
+        for message in messages:
+            if message:
+                self.on_message(message)
+
+    def send(self, message: bytes):
+        """Send `message` to the peer."""
+        self.transport.write(message + SEPARATOR)
+
+
+class RelayHub:
+    """Broadcast messages from one worker process to all other workers.
+
+    Instances are protocol factories for :meth:`loop.create_unix_server`.
+    """
+
+    def __init__(self):
+        """Initialize self."""
+        self.connections = set()
+
+    def __call__(self) -> 'RelayHubProtocol':
+        return RelayHubProtocol(self)
+
+    def broadcast(self, message: bytes, sender: LineProtocol):
+        """Send `message` to all connections but the `sender`."""
+        for connection in self.connections:
+            if connection is not sender:
+                connection.send(message)
+
+
+class RelayHubProtocol(LineProtocol):
+    """Connection of the :class:`RelayHub` to one worker process."""
+
+    def __init__(self, hub: RelayHub):
+        """Initialize self."""
+        super().__init__(self.message_received)
+        self.hub = hub
+
+    def connection_made(self, transport: asyncio.Transport):
+        """Register connection to the hub."""
+        super().connection_made(transport)
+        self.hub.connections.add(self)
+
+    def connection_lost(self, exc: Exception):
+        """Unregister connection from the hub."""
+        self.hub.connections.discard(self)
+
+    def message_received(self, message: bytes):
+        """Broadcast `message` to all other worker processes."""
+        self.hub.broadcast(message, self)
+
+
+class RelayClient(LineProtocol):
+    """Connection of a worker process to the :class:`RelayHub`.
+
+    Relayed messages are handled by a :class:`RelayedNotificationHandler`.
+    Set an instance as `relay` of the
+    :class:`adhocracy_core.websockets.server.ClientCommunicator` to
+    publish notifications.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        """Initialize self."""
+        super().__init__(self.message_received)
+        self.loop = loop
+        self.handler = RelayedNotificationHandler()
+
+    def message_received(self, message: bytes):
+        """Dispatch relayed notification to the subscribers."""
+        self.handler.onMessage(message, False)
+
+    def publish(self, message: bytes):
+        """Send `message` to all other worker processes.
+
+        This is thread safe, the message is sent by the event loop.
+        """
+        self.loop.call_soon_threadsafe(self._send_if_connected, message)
+
+    def _send_if_connected(self, message: bytes):
+        if self.transport is None or self.transport.is_closing():
+            logger.warning('Not connected to the relay hub, drop message %s',
+                           message)
+            return
+        self.send(message)
+
+    def connection_lost(self, exc: Exception):
+        """Log error, notifications are not relayed anymore."""
+        logger.error('Lost connection to the websocket relay hub')
+        self.transport = None
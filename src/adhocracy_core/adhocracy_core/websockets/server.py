@@ -3,8 +3,13 @@ import time
 from collections import defaultdict
 from collections import Hashable
 from collections import Iterable
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from json import dumps
 from json import loads
+from threading import RLock
+from threading import local
+import asyncio
 import logging
 
 from autobahn.asyncio.websocket import WebSocketServerProtocol
@@ -35,6 +40,7 @@ class ClientTracker():
         """Initialize self."""
         self._clients2resource_paths = defaultdict(set)
         self._resource_paths2clients = defaultdict(set)
+        self._lock = RLock()
 
     def is_subscribed(self, client: Hashable, resource: IResource) -> bool:
         """Check whether a client is subscribed to a resource."""
@@ -48,11 +54,12 @@ class ClientTracker():
         :return: True if the subscription was successful, False if it was
                  unnecessary (the client was already subscribed).
         """
-        if self.is_subscribed(client, resource):
-            return False
         path = resource_path(resource)
-        self._clients2resource_paths[client].add(path)
-        self._resource_paths2clients[path].add(client)
+        with self._lock:
+            if self.is_subscribed(client, resource):
+                return False
+            self._clients2resource_paths[client].add(path)
+            self._resource_paths2clients[path].add(client)
         return True
 
     def unsubscribe(self, client: Hashable, resource: IResource) -> bool:
@@ -61,15 +68,16 @@ class ClientTracker():
         :return: True if the unsubscription was successful, False if it was
                  unnecessary (the client was not subscribed).
         """
-        if not self.is_subscribed(client, resource):
-            return False
         path = resource_path(resource)
-        self._discard_from_set_valued_dict(self._clients2resource_paths,
-                                           client,
-                                           path)
-        self._discard_from_set_valued_dict(self._resource_paths2clients,
-                                           path,
-                                           client)
+        with self._lock:
+            if not self.is_subscribed(client, resource):
+                return False
+            self._discard_from_set_valued_dict(self._clients2resource_paths,
+                                               client,
+                                               path)
+            self._discard_from_set_valued_dict(self._resource_paths2clients,
+                                               path,
+                                               client)
         return True
 
     def _discard_from_set_valued_dict(self, set_valued_dict, key, value):
@@ -83,26 +91,53 @@ class ClientTracker():
 
     def delete_subscriptions_for_client(self, client: Hashable):
         """Delete all subscriptions for a client."""
-        path_set = self._clients2resource_paths.pop(client, set())
-        for path in path_set:
-            self._discard_from_set_valued_dict(self._resource_paths2clients,
-                                               path, client)
+        with self._lock:
+            path_set = self._clients2resource_paths.pop(client, set())
+            for path in path_set:
+                self._discard_from_set_valued_dict(
+                    self._resource_paths2clients, path, client)
 
     def delete_subscriptions_to_resource(self, resource: IResource):
         """Delete all subscriptions to a resource."""
         path = resource_path(resource)
-        client_set = self._resource_paths2clients.pop(path, set())
-        for client in client_set:
-            self._discard_from_set_valued_dict(self._clients2resource_paths,
-                                               client, path)
+        with self._lock:
+            client_set = self._resource_paths2clients.pop(path, set())
+            for client in client_set:
+                self._discard_from_set_valued_dict(
+                    self._clients2resource_paths, client, path)
 
     def iterate_subscribers(self, resource: IResource) -> Iterable:
         """Return an iterator over all clients subscribed to a resource."""
         path = resource_path(resource)
-        # 'if' check is necessary to avoid creating spurious empty sets
-        if path in self._resource_paths2clients:
-            for client in self._resource_paths2clients[path]:
-                yield client
+        # use 'get' to avoid creating spurious empty sets
+        with self._lock:
+            clients = list(self._resource_paths2clients.get(path, ()))
+        for client in clients:
+            yield client
+
+
+class ZODBExecutor:
+    """Run jobs that need the ZODB outside of the event loop.
+
+    Jobs are distributed by key (e.g. the client) to `workers` threads, so
+    jobs with the same key run in order. Every worker thread has its own
+    ZODB connection, see :meth:`ClientCommunicator._get_zodb_connection`.
+    """
+
+    def __init__(self, workers: int=4):
+        """Initialize self."""
+        self._executors = [ThreadPoolExecutor(max_workers=1)
+                           for x in range(workers)]
+
+    def submit(self, key: Hashable, fn: callable, *args) -> Future:
+        """Run `fn` with `args` in the worker thread for `key`."""
+        index = hash(key) % len(self._executors)
+        return self._executors[index].submit(fn, *args)
+
+    def shutdown(self, wait=True):
+        """Stop all worker threads."""
+        for executor in self._executors:
+            executor.shutdown(wait=wait)
 
 
 class DummyRequest:
@@ -131,14 +166,27 @@ class DummyRequest:
 class ClientCommunicator(WebSocketServerProtocol):
     """Communicates with a client through a WebSocket connection.
 
-    Note that the `zodb_connection` attribute **must** be set
+    Note that the `zodb_database` attribute **must** be set
     instances of this class can be used!
+
+    If the `executor` attribute is set, all messages are handled
+    by the :class:`ZODBExecutor`, the event loop only does the I/O.
+
+    If the `relay` attribute is set, notifications from our Pyramid app are
+    published to the other worker processes,
+    see :mod:`adhocracy_core.websockets.relay`.
     """
 
     # All instances of this class share the same zodb database object
     zodb_database = None
+    # All instances of this class share the same executor for ZODB jobs
+    executor = None
+    # All instances of this class share one zodb connection per thread
+    _zodb_local = local()
     # All instances of this class share the same tracker
     _tracker = ClientTracker()
+    # All instances of this class share the same relay to other processes
+    relay = None
     # All instances of this class share the same rest server url
     # This is used to generate the resource URLs. It is equal to the
     # url the adhocracy frontend is using to communicate with the rest server.
@@ -175,16 +223,17 @@ class ClientCommunicator(WebSocketServerProtocol):
                 connection.sync()
 
     def _get_zodb_connection(self) -> Connection:
-        connection = getattr(self, '_zodb_connection', None)
-        if connection is None:
-            connection = self.zodb_database.open()
-            self._zodb_connection = connection
-        connection.sync()
-        return connection
+        zodb_local = self._zodb_local
+        if getattr(zodb_local, 'database', None) is not self.zodb_database:
+            zodb_local.database = self.zodb_database
+            zodb_local.connection = self.zodb_database.open()
+        return zodb_local.connection
 
     def onConnect(self, request: ConnectionRequest):  # noqa
         self._client = request.peer
         self._client_may_send_notifications = self._client_runs_on_localhost()
+        if self.executor is not None:
+            self._loop = asyncio.get_event_loop()
         logger.debug('Client connecting: %s', self._client)
 
     def _client_runs_on_localhost(self):
@@ -197,7 +246,15 @@ class ClientCommunicator(WebSocketServerProtocol):
         logger.debug('WebSocket connection to %s open', self._client)
 
     def onMessage(self, payload: bytes, is_binary: bool):  # noqa
+        if self.executor is None:
+            self._handle_message(payload, is_binary)
+        else:
+            self.executor.submit(self, self._handle_message, payload,
+                                 is_binary)
+
+    def _handle_message(self, payload: bytes, is_binary: bool):
         try:
+            self._get_zodb_connection().sync()
             json_object = self._parse_message(payload, is_binary)
             if self._handle_if_server_notification(json_object):
                 return
@@ -234,6 +291,8 @@ class ClientCommunicator(WebSocketServerProtocol):
             notification = self._parse_json_via_schema(json_object,
                                                        ServerNotification)
             self._dispatch_event_notification_to_subscribers(notification)
+            if self.relay is not None:
+                self.relay.publish(dumps(json_object).encode())
             return True
         else:
             return False
@@ -328,10 +387,24 @@ class ClientCommunicator(WebSocketServerProtocol):
         self._send_json_message(json_message)
 
     def _send_json_message(self, json_message: dict):
-        """Send a JSON object as message to the client."""
+        """Send a JSON object as message to the client.
+
+        If called by a worker thread of the `executor` the message is sent by
+        the event loop.
+        """
         text = dumps(json_message)
         logger.debug('Sending message to client %s: %s', self._client, text)
-        self.sendMessage(text.encode())
+        loop = getattr(self, '_loop', None)
+        if loop is None:
+            self.sendMessage(text.encode())
+        else:
+            loop.call_soon_threadsafe(self._send_message_if_open,
+                                      text.encode())
+
+    def _send_message_if_open(self, payload: bytes):
+        """Send message, ignore clients that closed the connection already."""
+        if self.state == self.STATE_OPEN:
+            self.sendMessage(payload)
 
     def _dispatch_created_event(self, resource: IResource):
         if IItemVersion.providedBy(resource):
@@ -411,7 +484,33 @@ class ClientCommunicator(WebSocketServerProtocol):
         self._send_json_message(data)
 
     def onClose(self, was_clean: bool, code: int, reason: str):  # noqa
-        self._tracker.delete_subscriptions_for_client(self)
+        if self.executor is None:
+            self._tracker.delete_subscriptions_for_client(self)
+        else:  # run after pending jobs of this client
+            self.executor.submit(self,
+                                 self._tracker.delete_subscriptions_for_client,
+                                 self)
         clean_str = 'Clean' if was_clean else 'Unclean'
         logger.debug('%s close of WebSocket connection to %s; reason: %s',
                      clean_str, self._client, reason)
+
+
+class RelayedNotificationHandler(ClientCommunicator):
+    """Dispatch notifications relayed from other worker processes.
+
+    The notifications are dispatched to the subscribers of this process
+    only, they are not published to the relay again.
+    """
+
+    relay = None
+
+    def __init__(self):
+        """Initialize self."""
+        super().__init__()
+        self._client = 'relay'
+        self._client_may_send_notifications = True
+
+    def _send_json_message(self, json_message: dict):
+        """Log error messages, there is no client to send them to."""
+        logger.warning('Could not dispatch relayed notification: %s',
+                       json_message)
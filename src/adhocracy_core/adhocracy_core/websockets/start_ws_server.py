@@ -7,6 +7,7 @@ from signal import SIGTERM
 import yaml
 import logging
 import os
+import socket
 import sys
 import errno
 
@@ -15,6 +16,9 @@ from tzf.pyramid_yml import _translate_config_path
 from tzf.pyramid_yml import _env_filenames
 from ZODB import DB
 from adhocracy_core.websockets.server import ClientCommunicator
+from adhocracy_core.websockets.server import ZODBExecutor
+from adhocracy_core.websockets.relay import RelayClient
+from adhocracy_core.websockets.relay import RelayHub
 from zodburi import resolve_uri
 import asyncio
 
@@ -39,9 +43,13 @@ def main(args=[]) -> int:
     config = _read_config(config_file)
     port = _read_config_variable_or_die(config, 'port', is_int=True)
     pid_file = _read_config_variable_or_die(config, 'pid_file')
+    processes = config.getint('websockets', 'processes', fallback=1)
     _check_and_write_pid_file(pid_file)
     _register_sigterm_handler(pid_file)
-    _start_loop(config, port, pid_file)
+    if processes > 1:
+        _start_processes(config, port, pid_file, processes)
+    else:
+        _start_loop(config, port, pid_file)
 
 
 def _read_config_variable_or_die(config: ConfigParser, name: str,
@@ -92,21 +100,106 @@ def _register_sigterm_handler(pid_file: str):
 
 
 def _start_loop(config: ConfigParser, port: int, pid_file: str):
+    try:
+        loop = asyncio.get_event_loop()
+        _serve(loop, config, port)
+    finally:
+        logger.info('Stopped WebSocket server')
+        _remove_pid_file(pid_file)
+
+
+def _serve(loop, config: ConfigParser, port: int, reuse_port: bool=False):
+    executor = None
     try:
         database = _get_zodb_database(config)
         ClientCommunicator.zodb_database = database
         rest_url = _get_rest_url(config)
         ClientCommunicator.rest_url = rest_url
+        executor = _get_zodb_executor(config)
+        ClientCommunicator.executor = executor
         factory = WebSocketServerFactory('ws://localhost:{}'.format(port))
         factory.protocol = ClientCommunicator
-        loop = asyncio.get_event_loop()
-        coro = loop.create_server(factory, port=port)
+        coro = loop.create_server(factory, port=port, reuse_port=reuse_port)
         logger.debug('Started WebSocket server listening on port %i', port)
         server = loop.run_until_complete(coro)
         _run_loop_until_interrupted(loop, server)
     finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def _start_processes(config: ConfigParser, port: int, pid_file: str,
+                     processes: int):  # pragma: no cover
+    """Start worker processes sharing `port` and the relay hub.
+
+    The worker processes listen with SO_REUSEPORT, so the kernel
+    distributes the connections. The main process runs the
+    :class:`adhocracy_core.websockets.relay.RelayHub`.
+    """
+    relay_socket = config.get('websockets', 'relay_socket',
+                              fallback='var/WS_RELAY.sock')
+    hub_socket = _bind_unix_socket(relay_socket)
+    pids = []
+    try:
+        for x in range(processes):
+            pid = os.fork()
+            if pid == 0:
+                hub_socket.close()
+                _start_worker(config, port, relay_socket)
+            pids.append(pid)
+        loop = asyncio.get_event_loop()
+        coro = loop.create_unix_server(RelayHub(), sock=hub_socket)
+        server = loop.run_until_complete(coro)
+        logger.info('Started %i WebSocket worker processes', processes)
+        _run_loop_until_interrupted(loop, server)
+    finally:
+        _stop_processes(pids)
         logger.info('Stopped WebSocket server')
         _remove_pid_file(pid_file)
+        _remove_file(relay_socket)
+
+
+def _bind_unix_socket(path: str) -> socket.socket:  # pragma: no cover
+    _remove_file(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    sock.listen(100)
+    return sock
+
+
+def _start_worker(config: ConfigParser, port: int,
+                  relay_socket: str):  # pragma: no cover
+    """Run worker process, connected to the relay hub, and exit."""
+    signal(SIGTERM, lambda sig, frame: sys.exit())
+    exit_code = 0
+    try:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        coro = loop.create_unix_connection(lambda: RelayClient(loop),
+                                           relay_socket)
+        transport, relay = loop.run_until_complete(coro)
+        ClientCommunicator.relay = relay
+        _serve(loop, config, port, reuse_port=True)
+    except SystemExit:
+        pass
+    except Exception:
+        logger.exception('WebSocket worker process %i failed', os.getpid())
+        exit_code = 1
+    finally:
+        os._exit(exit_code)
+
+
+def _stop_processes(pids: list):  # pragma: no cover
+    for pid in pids:
+        try:
+            os.kill(pid, SIGTERM)
+        except ProcessLookupError:
+            pass
+    for pid in pids:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
 
 
 def _remove_pid_file(pid_file: str):
@@ -114,6 +207,11 @@ def _remove_pid_file(pid_file: str):
         os.unlink(pid_file)
 
 
+def _remove_file(path: str):
+    if os.path.exists(path):
+        os.unlink(path)
+
+
 def _run_loop_until_interrupted(loop, server):
     try:
         loop.run_forever()
@@ -170,6 +268,20 @@ def _get_rest_url(config: ConfigParser) -> dict:
     return config['websockets']['rest_url']
 
 
+def _get_zodb_executor(config: ConfigParser) -> ZODBExecutor:
+    """Return executor to access the ZODB outside of the event loop.
+
+    The number of worker threads (and ZODB connections) is set with the
+    `zodb_workers` variable in the [websockets] section, default 4.
+    Return None (access ZODB in the event loop) if 0.
+    """
+    workers = config.getint('websockets', 'zodb_workers', fallback=4)
+    if workers < 1:
+        return None
+    logger.info('Access ZODB with {} worker threads'.format(workers))
+    return ZODBExecutor(workers=workers)
+
+
 def _inject_here_variable(config: ConfigParser, config_file: str):
     """Inject the %(here) variable into a config."""
     dir_containing_config_file = path.dirname(config_file)
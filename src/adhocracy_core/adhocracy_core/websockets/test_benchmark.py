@@ -0,0 +1,22 @@
+def test_percentile_empty():
+    from .benchmark import percentile
+    assert percentile([], 50) == 0
+
+
+def test_percentile():
+    from .benchmark import percentile
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 90) == 5
+    assert percentile(values, 100) == 5
+    assert percentile(values, 0) == 1
+
+
+def test_format_latencies():
+    from .benchmark import format_latencies
+    result = format_latencies([0.001, 0.002])
+    assert result == 'requests: 2\n'\
+                     'p50: 1.0 ms\n'\
+                     'p90: 2.0 ms\n'\
+                     'p99: 2.0 ms\n'\
+                     'p100: 2.0 ms'
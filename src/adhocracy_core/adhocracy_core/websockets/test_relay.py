@@ -0,0 +1,123 @@
+from unittest.mock import Mock
+
+from pytest import fixture
+
+
+class DummyLineProtocol:
+
+    def __init__(self):
+        self.messages = []
+
+    def send(self, message):
+        self.messages.append(message)
+
+
+class TestLineProtocol:
+
+    @fixture
+    def inst(self):
+        from .relay import LineProtocol
+        inst = LineProtocol(Mock())
+        inst.connection_made(Mock())
+        return inst
+
+    def test_data_received_complete_messages(self, inst):
+        inst.data_received(b'{"a": 1}\n{"b": 2}\n')
+        assert [x[0][0] for x in inst.on_message.call_args_list] ==\
+            [b'{"a": 1}', b'{"b": 2}']
+
+    def test_data_received_buffer_incomplete_message(self, inst):
+        inst.data_received(b'{"a"')
+        assert not inst.on_message.called
+        inst.data_received(b': 1}\n')
+        inst.on_message.assert_called_with(b'{"a": 1}')
+
+    def test_send(self, inst):
+        inst.send(b'{}')
+        inst.transport.write.assert_called_with(b'{}\n')
+
+
+class TestRelayHub:
+
+    @fixture
+    def inst(self):
+        from .relay import RelayHub
+        return RelayHub()
+
+    def test_create_protocol(self, inst):
+        from .relay import RelayHubProtocol
+        protocol = inst()
+        assert isinstance(protocol, RelayHubProtocol)
+        assert protocol.hub is inst
+
+    def test_broadcast_to_all_but_sender(self, inst):
+        sender = DummyLineProtocol()
+        other = DummyLineProtocol()
+        inst.connections.update([sender, other])
+        inst.broadcast(b'{}', sender)
+        assert sender.messages == []
+        assert other.messages == [b'{}']
+
+
+class TestRelayHubProtocol:
+
+    @fixture
+    def hub(self):
+        from .relay import RelayHub
+        return RelayHub()
+
+    def test_connection_made_register_to_hub(self, hub):
+        protocol = hub()
+        protocol.connection_made(Mock())
+        assert protocol in hub.connections
+
+    def test_connection_lost_unregister_from_hub(self, hub):
+        protocol = hub()
+        protocol.connection_made(Mock())
+        protocol.connection_lost(None)
+        assert protocol not in hub.connections
+
+    def test_message_received_broadcast(self, hub):
+        sender = hub()
+        sender.connection_made(Mock())
+        other = hub()
+        other.connection_made(Mock())
+        sender.data_received(b'{}\n')
+        other.transport.write.assert_called_with(b'{}\n')
+        assert not sender.transport.write.called
+
+
+class TestRelayClient:
+
+    @fixture
+    def loop(self):
+        loop = Mock()
+        loop.call_soon_threadsafe = lambda callback, *args: callback(*args)
+        return loop
+
+    @fixture
+    def inst(self, loop):
+        from .relay import RelayClient
+        inst = RelayClient(loop)
+        inst.connection_made(Mock())
+        inst.transport.is_closing.return_value = False
+        return inst
+
+    def test_create(self, inst):
+        from adhocracy_core.websockets.server import RelayedNotificationHandler
+        assert isinstance(inst.handler, RelayedNotificationHandler)
+
+    def test_message_received_handle_notification(self, inst):
+        inst.handler = Mock()
+        inst.data_received(b'{}\n')
+        inst.handler.onMessage.assert_called_with(b'{}', False)
+
+    def test_publish(self, inst):
+        inst.publish(b'{}')
+        inst.transport.write.assert_called_with(b'{}\n')
+
+    def test_publish_ignore_if_not_connected(self, inst):
+        transport = inst.transport
+        inst.connection_lost(None)
+        inst.publish(b'{}')
+        assert not transport.write.called
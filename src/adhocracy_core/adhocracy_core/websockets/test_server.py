@@ -261,6 +261,100 @@ class ClientCommunicatorUnitTests(unittest.TestCase):
         assert self._comm._client_may_send_notifications is False
 
 
+class DummyLoop:
+
+    def __init__(self):
+        self.thread_names = []
+
+    def call_soon_threadsafe(self, callback, *args):
+        from threading import current_thread
+        self.thread_names.append(current_thread().name)
+        callback(*args)
+
+
+class ClientCommunicatorExecutorUnitTests(unittest.TestCase):
+
+    def setUp(self):
+        from adhocracy_core.websockets.server import ZODBExecutor
+        app_root = testing.DummyResource()
+        app_root['child'] = testing.DummyResource()
+        zodb_root = testing.DummyResource()
+        zodb_root['app_root'] = app_root
+        app_root.__name__ = app_root.__parent__ = None
+        self.rest_url = rest_url()
+        QueueingClientCommunicator.zodb_database = DummyZODBDatabase(
+            zodb_root=zodb_root)
+        QueueingClientCommunicator.rest_url = self.rest_url
+        self._executor = ZODBExecutor(workers=2)
+        QueueingClientCommunicator.executor = self._executor
+        self._comm = QueueingClientCommunicator()
+        self._comm.onConnect(DummyConnectionRequest('websocket peer'))
+        self._comm.state = self._comm.STATE_OPEN
+        self._loop = DummyLoop()
+        self._comm._loop = self._loop
+
+    def tearDown(self):
+        QueueingClientCommunicator.executor = None
+        self._executor.shutdown()
+
+    def test_onMessage_handled_by_worker_thread(self):
+        from threading import current_thread
+        msg = build_message({'action': 'subscribe',
+                             'resource': self.rest_url + '/child/'})
+        self._comm.onMessage(msg, False)
+        self._executor.shutdown()
+        assert self._comm.queue == [{'status': 'ok',
+                                     'action': 'subscribe',
+                                     'resource': self.rest_url + '/child/'}]
+        assert self._loop.thread_names[0] != current_thread().name
+
+    def test_onMessage_keep_message_order_per_client(self):
+        for action in ['subscribe', 'unsubscribe'] * 10:
+            msg = build_message({'action': action,
+                                 'resource': self.rest_url + '/child/'})
+            self._comm.onMessage(msg, False)
+        self._executor.shutdown()
+        assert [x['status'] for x in self._comm.queue] == ['ok'] * 20
+
+    def test_onClose_delete_subscriptions_after_pending_messages(self):
+        msg = build_message({'action': 'subscribe',
+                             'resource': self.rest_url + '/child/'})
+        self._comm.onMessage(msg, False)
+        self._comm.onClose(True, 0, 'closed')
+        self._executor.shutdown()
+        assert self._comm._tracker._clients2resource_paths == {}
+
+    def test_dont_send_message_if_closed(self):
+        self._comm.state = self._comm.STATE_CLOSED
+        msg = build_message({'action': 'subscribe',
+                             'resource': self.rest_url + '/child/'})
+        self._comm.onMessage(msg, False)
+        self._comm.onClose(True, 0, 'closed')
+        self._executor.shutdown()
+        assert self._comm.queue == []
+
+
+class ZODBExecutorUnitTests(unittest.TestCase):
+
+    def setUp(self):
+        from adhocracy_core.websockets.server import ZODBExecutor
+        self._executor = ZODBExecutor(workers=4)
+
+    def tearDown(self):
+        self._executor.shutdown()
+
+    def test_submit(self):
+        future = self._executor.submit('key', lambda x: x + 1, 1)
+        assert future.result() == 2
+
+    def test_submit_same_key_same_thread(self):
+        from threading import current_thread
+        get_thread = lambda: current_thread().name
+        futures = [self._executor.submit('key', get_thread)
+                   for x in range(10)]
+        assert len(set(f.result() for f in futures)) == 1
+
+
 class EventDispatchUnitTests(unittest.TestCase):
 
     """Test event dispatch from one ClientCommunicator to others."""
@@ -367,6 +461,36 @@ class EventDispatchUnitTests(unittest.TestCase):
         assert self._dispatcher.queue[0]['error'] == 'invalid_json'
         assert 'event' in self._dispatcher.queue[0]['details']
 
+    def test_dispatch_notification_publish_to_relay(self):
+        from unittest.mock import Mock
+        relay = Mock()
+        self._dispatcher.relay = relay
+        msg = build_message({'event': 'modified', 'resource': '/child'})
+        self._dispatcher.onMessage(msg, False)
+        relay.publish.assert_called_with(
+            build_message({'event': 'modified', 'resource': '/child'}))
+
+    def _make_relayed_notification_handler(self):
+        from adhocracy_core.websockets.server import RelayedNotificationHandler
+        handler = RelayedNotificationHandler()
+        handler.zodb_database = QueueingClientCommunicator.zodb_database
+        handler.rest_url = self.rest_url
+        return handler
+
+    def test_dispatch_relayed_notification(self):
+        handler = self._make_relayed_notification_handler()
+        msg = build_message({'event': 'modified', 'resource': '/child'})
+        handler.onMessage(msg, False)
+        assert self._subscriber.queue[-1] == {'event': 'modified',
+                                              'resource': self.rest_url + '/child/'}
+
+    def test_dispatch_relayed_notification_invalid(self):
+        handler = self._make_relayed_notification_handler()
+        msg = build_message({'event': 'new_child',
+                             'resource': '/child/grandchild'})
+        handler.onMessage(msg, False)
+        assert len(self._subscriber.queue) == 1
+
 
 class ClientTrackerUnitTests(unittest.TestCase):
 
@@ -97,6 +97,7 @@ setup(name='adhocracy_core',
       adhocracy_core = adhocracy_core.testing
       [console_scripts]
       ad_start_ws_server = adhocracy_core.websockets.start_ws_server:main
+      ad_ws_benchmark = adhocracy_core.websockets.benchmark:main
       ad_import_users = adhocracy_core.scripts.ad_import_users:main
       ad_import_groups = adhocracy_core.scripts.ad_import_groups:main
       ad_import_resources = adhocracy_core.scripts.ad_import_resources:main
@@ -112,6 +113,18 @@ setup(name='adhocracy_core',
        adhocracy_core.scripts.ad_auto_transition_process_workflow:main
       ad_fixtures = adhocracy_core.scripts.ad_fixtures:main
       ad_auditlog = adhocracy_core.scripts.ad_auditlog:main
+      ad_reindex = adhocracy_core.scripts.ad_reindex:main
+      ad_cache_hit_ratio = adhocracy_core.scripts.ad_cache_hit_ratio:main
+      ad_autoupdate_benchmark = adhocracy_core.resources.benchmark:main
+      ad_autoupdate_plan = adhocracy_core.scripts.ad_autoupdate_plan:main
+      ad_shard_users = adhocracy_core.scripts.ad_shard_users:main
+      ad_conflicts_summary =\
+          adhocracy_core.scripts.ad_conflicts_summary:main
+      ad_registration_benchmark =\
+          adhocracy_core.resources.registration_benchmark:main
+      ad_sheet_storage_benchmark =\
+          adhocracy_core.resources.sheet_storage_benchmark:main
+      ad_dotted_names_benchmark = adhocracy_core.content.benchmark:main
       [pyramid.scaffold]
       adhocracy=adhocracy_core.scaffolds:main
       """,
@@ -137,16 +137,15 @@ def use_workflow_state_for_participation_time_range(root, registry):
     catalogs = find_service(root, 'catalogs')
     bplaene = _search_for_interfaces(catalogs, IProcess)
     for bplan in bplaene:
-        process_settings_sheet = bplan.\
-            _sheet_adhocracy_meinberlin_sheets_bplan_IProcessSettings
+        process_settings = registry.content.get_sheet(bplan, IProcessSettings)
+        # the participation dates are no schema fields, read the stored data
+        process_settings_sheet = process_settings.get_stored_data()
         if ('participation_start_date' in process_settings_sheet
                 and 'participation_end_date' in process_settings_sheet):
             participation_start_date = \
                 process_settings_sheet['participation_start_date']
             participation_end_date = \
                 process_settings_sheet['participation_end_date']
-            process_settings = registry.content.get_sheet(bplan,
-                                                          IProcessSettings)
             process_settings.delete_field_values(['participation_start_date'])
             process_settings.delete_field_values(['participation_end_date'])
             workflow_assignment = registry.content.get_sheet(